@@ -0,0 +1,347 @@
+"""
+Asynchronous, batched blockchain anchoring.
+
+POST /api/blockchain/store no longer signs and waits for a transaction inside
+the request. It queues an anchor job and returns 202 with the job id. A
+background worker then:
+
+  1. claims up to ANCHOR_BATCH_SIZE pending jobs (FOR UPDATE SKIP LOCKED)
+  2. builds a Merkle tree over their build_verification_hash() leaves
+  3. stores each job's inclusion proof and commits the single root on-chain
+  4. marks the jobs anchored and copies the tx hash onto the verification
+
+One transaction per batch instead of one per verification. Any verification
+can be checked later with merkle.verify_proof(leaf, proof, root) against the
+root stored under ROOT_ID_OFFSET + batch_id.
+
+Only one process sends transactions at a time: the worker holds a Postgres
+session advisory lock while it runs, so extra gunicorn workers (or an extra
+`python anchoring.py worker`) wait as standbys.
+
+CLI:
+  python anchoring.py worker   # run the loop
+  python anchoring.py once     # process one batch and exit
+"""
+
+import json
+import threading
+
+from psycopg2.extras import Json
+
+from database import execute_query, execute_values, transaction, get_connection
+from blockchain import build_verification_hash, store_root_on_chain, ROOT_ID_OFFSET
+from merkle import build_levels, merkle_proof, verify_proof
+from config import ANCHOR_BATCH_SIZE, ANCHOR_INTERVAL, ANCHOR_MAX_ATTEMPTS, ANCHOR_WORKER_ENABLED
+
+WORKER_LOCK_KEY = 0x616e6368   # 'anch'
+
+# Batches left 'committing' longer than this are assumed orphaned by a crash
+STALE_BATCH_SECONDS = 600
+
+
+def _hex(b: bytes) -> str:
+    return '0x' + b.hex()
+
+def _unhex(h: str) -> bytes:
+    return bytes.fromhex(h[2:] if h.startswith('0x') else h)
+
+
+# ── Queue ──────────────────────────────────────────────────────────────────────
+
+def enqueue(verification_id):
+    """
+    Queue a verification for anchoring. Re-queues a failed job; otherwise
+    returns the existing job unchanged. Returns (job, error).
+    """
+    with transaction() as tx:
+        verification, error = execute_query(
+            """
+            SELECT verification_id, anchor_id, platform_name, profile_url
+            FROM platform_verifications WHERE verification_id = %s
+            """,
+            (verification_id,),
+            fetchone=True
+        )
+        if error or not verification:
+            return None, error or "Verification not found"
+
+        leaf = build_verification_hash(
+            verification['verification_id'], verification['anchor_id'],
+            verification['platform_name'], verification['profile_url']
+        )
+        job, error = execute_query(
+            """
+            INSERT INTO anchor_jobs (verification_id, leaf_hash)
+            VALUES (%s, %s)
+            ON CONFLICT (verification_id) DO UPDATE SET
+                status     = CASE WHEN anchor_jobs.status = 'failed' THEN 'pending' ELSE anchor_jobs.status END,
+                attempts   = CASE WHEN anchor_jobs.status = 'failed' THEN 0 ELSE anchor_jobs.attempts END,
+                error      = CASE WHEN anchor_jobs.status = 'failed' THEN NULL ELSE anchor_jobs.error END,
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING job_id, verification_id, leaf_hash, status, created_at
+            """,
+            (verification_id, _hex(leaf)),
+            fetchone=True,
+            commit=True
+        )
+        if error:
+            return None, error
+
+    if tx.error:
+        return None, tx.error
+    return job, None
+
+
+def get_job(job_id):
+    """Job status with its batch, tx hash and inclusion proof once batched"""
+    job, error = execute_query(
+        """
+        SELECT j.job_id, j.verification_id, j.leaf_hash, j.status, j.leaf_index,
+               j.merkle_proof, j.attempts, j.error, j.created_at, j.updated_at,
+               b.batch_id, b.merkle_root, b.tx_hash, b.block_number, b.status AS batch_status
+        FROM anchor_jobs j
+        LEFT JOIN anchor_batches b ON b.batch_id = j.batch_id
+        WHERE j.job_id = %s
+        """,
+        (job_id,),
+        fetchone=True
+    )
+    if error or not job:
+        return None, error or "Anchor job not found"
+
+    if job['merkle_root'] and job['merkle_proof'] is not None:
+        job['proof_valid'] = verify_proof(
+            _unhex(job['leaf_hash']), [_unhex(h) for h in job['merkle_proof']], _unhex(job['merkle_root'])
+        )
+        job['root_slot'] = str(ROOT_ID_OFFSET + job['batch_id'])
+    return job, None
+
+
+# ── Batching ───────────────────────────────────────────────────────────────────
+
+def claim_batch(limit=ANCHOR_BATCH_SIZE):
+    """
+    Claim pending jobs, build their Merkle tree and record the batch and proofs.
+    Returns (batch, error); batch is None when nothing is pending.
+    """
+    with transaction() as tx:
+        jobs, error = execute_query(
+            """
+            SELECT job_id, leaf_hash FROM anchor_jobs
+            WHERE status = 'pending'
+            ORDER BY job_id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+            """,
+            (limit,)
+        )
+        if error or not jobs:
+            return None, error
+
+        leaves = [_unhex(job['leaf_hash']) for job in jobs]
+        levels = build_levels(leaves)
+        root   = levels[-1][0]
+
+        batch, error = execute_query(
+            """
+            INSERT INTO anchor_batches (merkle_root, leaf_count)
+            VALUES (%s, %s)
+            RETURNING batch_id, merkle_root, leaf_count
+            """,
+            (_hex(root), len(jobs)),
+            fetchone=True,
+            commit=True
+        )
+        if error:
+            return None, error
+
+        rows = [
+            (job['job_id'], batch['batch_id'], index,
+             Json([_hex(h) for h in merkle_proof(levels, index)], dumps=json.dumps))
+            for index, job in enumerate(jobs)
+        ]
+        execute_values(
+            """
+            UPDATE anchor_jobs j SET
+                status       = 'batched',
+                batch_id     = v.batch_id,
+                leaf_index   = v.leaf_index,
+                merkle_proof = v.proof,
+                updated_at   = CURRENT_TIMESTAMP
+            FROM (VALUES %s) AS v(job_id, batch_id, leaf_index, proof)
+            WHERE j.job_id = v.job_id
+            """,
+            rows,
+            template='(%s, %s, %s, %s::jsonb)'
+        )
+
+    if tx.error:
+        return None, tx.error
+    return batch, None
+
+
+def _mark_committed(batch_id, result):
+    with transaction() as tx:
+        execute_query(
+            """
+            UPDATE anchor_batches
+            SET status = 'committed', tx_hash = %s, block_number = %s, committed_at = CURRENT_TIMESTAMP
+            WHERE batch_id = %s
+            """,
+            (result.get('tx_hash'), result.get('block'), batch_id),
+            commit=True
+        )
+        execute_query(
+            "UPDATE anchor_jobs SET status = 'anchored', updated_at = CURRENT_TIMESTAMP WHERE batch_id = %s",
+            (batch_id,),
+            commit=True
+        )
+        if result.get('tx_hash'):
+            execute_query(
+                """
+                UPDATE platform_verifications v SET tx_hash = %s
+                FROM anchor_jobs j
+                WHERE j.batch_id = %s AND j.verification_id = v.verification_id
+                """,
+                (result['tx_hash'], batch_id),
+                commit=True
+            )
+    return tx.error
+
+
+def _mark_failed(batch_id, error):
+    """Fail the batch and put its jobs back in the queue (or fail them after too many attempts)"""
+    with transaction() as tx:
+        execute_query(
+            "UPDATE anchor_batches SET status = 'failed', error = %s WHERE batch_id = %s",
+            (error, batch_id),
+            commit=True
+        )
+        execute_query(
+            """
+            UPDATE anchor_jobs SET
+                attempts     = attempts + 1,
+                status       = CASE WHEN attempts + 1 >= %s THEN 'failed' ELSE 'pending' END,
+                error        = %s,
+                batch_id     = NULL,
+                leaf_index   = NULL,
+                merkle_proof = NULL,
+                updated_at   = CURRENT_TIMESTAMP
+            WHERE batch_id = %s
+            """,
+            (ANCHOR_MAX_ATTEMPTS, error, batch_id),
+            commit=True
+        )
+    return tx.error
+
+
+def commit_batch(batch, w3=None, contract=None) -> dict:
+    """Send one batch's root on-chain and record the outcome"""
+    result = store_root_on_chain(batch['batch_id'], _unhex(batch['merkle_root']), w3=w3, contract=contract)
+    if result['success']:
+        _mark_committed(batch['batch_id'], result)
+    else:
+        _mark_failed(batch['batch_id'], result.get('error', 'Blockchain error'))
+    return {**result, 'batch_id': batch['batch_id'], 'leaf_count': batch['leaf_count']}
+
+
+def recover_stale_batches(w3=None, contract=None):
+    """
+    Settle batches a crashed worker left in 'committing': if the root made it
+    on-chain the batch is marked committed, otherwise its jobs are re-queued.
+    """
+    from blockchain import get_web3, get_contract
+
+    stale, error = execute_query(
+        """
+        SELECT batch_id, merkle_root, leaf_count FROM anchor_batches
+        WHERE status = 'committing' AND created_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+        """,
+        (STALE_BATCH_SECONDS,)
+    )
+    if error or not stale:
+        return
+
+    w3       = w3 or get_web3()
+    contract = contract or get_contract(w3)
+    for batch in stale:
+        stored, _ = contract.functions.getVerification(ROOT_ID_OFFSET + batch['batch_id']).call()
+        if stored == _unhex(batch['merkle_root']):
+            _mark_committed(batch['batch_id'], {})
+        else:
+            _mark_failed(batch['batch_id'], 'Worker stopped before the batch was committed')
+
+
+def process_once(w3=None, contract=None, limit=ANCHOR_BATCH_SIZE):
+    """Claim and commit one batch. Returns the commit result, or None if idle."""
+    batch, error = claim_batch(limit)
+    if error:
+        print(f"Anchoring: claim failed: {error}")
+        return None
+    if batch is None:
+        return None
+    return commit_batch(batch, w3=w3, contract=contract)
+
+
+# ── Worker ─────────────────────────────────────────────────────────────────────
+
+def run_worker(interval=ANCHOR_INTERVAL, stop_event=None):
+    """
+    Anchor batches forever. Holds a session advisory lock on a dedicated
+    connection so only one worker sends transactions; others wait as standbys.
+    """
+    stop_event = stop_event or threading.Event()
+    lock_conn  = None
+
+    while not stop_event.is_set():
+        try:
+            if lock_conn is None or lock_conn.closed:
+                lock_conn = get_connection()
+                if lock_conn is None:
+                    stop_event.wait(interval)
+                    continue
+                lock_conn.autocommit = True
+                with lock_conn.cursor() as cur:
+                    cur.execute("SELECT pg_try_advisory_lock(%s) AS locked", (WORKER_LOCK_KEY,))
+                    if not cur.fetchone()['locked']:
+                        lock_conn.close()
+                        lock_conn = None
+                        stop_event.wait(interval)
+                        continue
+
+            # Every tick, not only on taking the lock: a batch this worker left
+            # in 'committing' (e.g. its send raised) only goes stale later on
+            recover_stale_batches()
+
+            # Drain the queue, then sleep until the next interval
+            while not stop_event.is_set() and process_once() is not None:
+                pass
+        except Exception as e:
+            print(f"Anchoring worker error: {e}")
+        stop_event.wait(interval)
+
+    if lock_conn is not None and not lock_conn.closed:
+        lock_conn.close()
+
+
+def start_worker():
+    """Run the worker in a daemon thread when ANCHOR_WORKER_ENABLED is set"""
+    if not ANCHOR_WORKER_ENABLED:
+        return None
+    thread = threading.Thread(target=run_worker, name='anchoring-worker', daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == '__main__':
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+    if command == 'worker':
+        run_worker()
+    elif command == 'once':
+        result = process_once()
+        print(json.dumps(result, indent=2, default=str) if result else "No pending anchor jobs")
+    else:
+        print("Usage: python anchoring.py worker|once")
+        sys.exit(1)
@@ -18,15 +18,23 @@ CORS(app, resources={r"/api/*": {
     "allow_headers": ["Content-Type", "Authorization"]
 }})
 
+# ── Request tracing (spans, traceparent, Server-Timing in debug) ──────────────
+import tracing
+tracing.init_app(app)
+
+# ── Compression, ETags and static caching ─────────────────────────────────────
+import response_layer
+response_layer.init_app(app)
+
 # ── Serve frontend files ───────────────────────────────────────────────────────
 
 @app.route('/')
 def serve_index():
-    return send_from_directory(FRONTEND_DIR, 'index.html')
+    return response_layer.send_html(FRONTEND_DIR, 'index.html')
 
 @app.route('/login')
 def serve_login():
-    return send_from_directory(FRONTEND_DIR, 'login.html')
+    return response_layer.send_html(FRONTEND_DIR, 'login.html')
 
 @app.route('/<path:path>')
 def serve_static(path):
@@ -37,6 +45,10 @@ app.add_url_rule('/api/register', 'register', routes.register,    methods=['POST
 app.add_url_rule('/api/login',    'login',    routes.login,        methods=['POST'])
 app.add_url_rule('/api/health',   'health',   routes.health_check, methods=['GET'])
 
+# ── Metrics (METRICS_ENABLED; public, or METRICS_TOKEN as a Bearer token) ─────
+import metrics
+metrics.init_app(app)
+
 # ── OAuth routes (public) ──────────────────────────────────────────────────────
 app.add_url_rule('/api/oauth/github',          'github_login',    oauth.github_login,    methods=['GET'])
 app.add_url_rule('/api/oauth/github/callback', 'github_callback', oauth.github_callback, methods=['GET'])
@@ -46,25 +58,66 @@ app.add_url_rule('/api/oauth/google/callback', 'google_callback', oauth.google_c
 # ── Protected routes (JWT required) ───────────────────────────────────────────
 from auth import token_required
 
+app.add_url_rule('/api/logout',                                     'logout',              token_required(routes.logout),                  methods=['POST'])
 app.add_url_rule('/api/oauth/verifications',                        'oauth_verifications', token_required(oauth.get_oauth_verifications), methods=['GET'])
 app.add_url_rule('/api/statistics',                                 'statistics',          token_required(routes.get_statistics),          methods=['GET'])
 app.add_url_rule('/api/identity',                                   'create_identity',     token_required(routes.create_identity),         methods=['POST'])
 app.add_url_rule('/api/identities',                                 'identities',          token_required(routes.get_identities),          methods=['GET'])
 app.add_url_rule('/api/identities/search',                          'search',              token_required(routes.search_identities),        methods=['GET'])
+app.add_url_rule('/api/identities/lookalikes',                      'lookalikes',          token_required(routes.find_lookalikes),          methods=['GET'])
 app.add_url_rule('/api/identity/<int:anchor_id>',                   'identity_details',    token_required(routes.get_identity_details),     methods=['GET'])
+app.add_url_rule('/api/identities/export',                          'export_identities',   token_required(routes.export_identities),        methods=['GET'])
 app.add_url_rule('/api/identity/<int:anchor_id>/export',            'export',              token_required(routes.export_identity),          methods=['GET'])
 app.add_url_rule('/api/identity/<int:anchor_id>/history',           'history',             token_required(routes.get_trust_history),        methods=['GET'])
+app.add_url_rule('/api/identity/<int:anchor_id>/cluster',           'identity_cluster',    token_required(routes.get_identity_cluster),     methods=['GET'])
 app.add_url_rule('/api/identity/<int:anchor_id>/qr',                'qr_code',             token_required(routes.get_qr_code),             methods=['GET'])
+app.add_url_rule('/api/verify-claims/batch',                        'verify_claims_batch', token_required(routes.verify_claims_batch),      methods=['POST'])
 app.add_url_rule('/api/verify-claim',                               'verify_claim',        token_required(routes.verify_claim),             methods=['POST'])
 app.add_url_rule('/api/verification',                               'add_verification',    token_required(routes.add_verification),         methods=['POST'])
 app.add_url_rule('/api/verifications',                              'verifications',       token_required(routes.get_verifications),        methods=['GET'])
 app.add_url_rule('/api/consistency-check',                          'consistency_check',   token_required(routes.run_consistency_check),    methods=['POST'])
 app.add_url_rule('/api/consistency-checks',                         'consistency_checks',  token_required(routes.get_consistency_checks),  methods=['GET'])
+app.add_url_rule('/api/consistency-checks/batch',                   'consistency_batch',   token_required(routes.run_batch_consistency_check), methods=['POST'])
 app.add_url_rule('/api/consistency-check/<int:check_id>/report',    'consistency_report',  token_required(routes.get_consistency_report),  methods=['GET'])
 app.add_url_rule('/api/reputation-event',                           'reputation_event',    token_required(routes.log_reputation_event),     methods=['POST'])
+app.add_url_rule('/api/reputation-events/batch',                    'reputation_batch',    token_required(routes.log_reputation_events_batch), methods=['POST'])
 app.add_url_rule('/api/reputation-events',                          'reputation_events',   token_required(routes.get_reputation_events),    methods=['GET'])
 app.add_url_rule('/api/blockchain/store',  'blockchain_store',  token_required(routes.store_on_blockchain), methods=['POST'])
 app.add_url_rule('/api/blockchain/status', 'blockchain_status', token_required(routes.blockchain_status),   methods=['GET'])
+app.add_url_rule('/api/blockchain/jobs/<int:job_id>', 'blockchain_job', token_required(routes.get_anchor_job), methods=['GET'])
+
+# ── Request-scoped database unit of work ───────────────────────────────────────
+from database import end_request_transaction
+app.teardown_request(end_request_transaction)
+
+# ── Bio similarity model — load once, refit/reload in the background ──────────
+import bio_vectorizer
+bio_vectorizer.load()
+bio_vectorizer.start_refresher()
+
+# ── Batched blockchain anchoring worker (opt-in per process) ──────────────────
+import anchoring
+anchoring.start_worker()
+
+# ── Trust score history rollups ───────────────────────────────────────────────
+import trust_history
+trust_history.start_worker()
+
+# ── bcrypt cost calibration (also warms the hashing pool) ─────────────────────
+import passwords
+passwords.calibrate()
+
+# ── Identity keypair reservoir ─────────────────────────────────────────────────
+import keypool
+keypool.start()
+
+# ── Lookalike-username index (loads in the background) ────────────────────────
+import lookalikes
+lookalikes.start()
+
+# ── JWT revocation denylist sync ──────────────────────────────────────────────
+from auth import start_revocation_poller
+start_revocation_poller()
 
 # ── Error handlers ─────────────────────────────────────────────────────────────
 @app.errorhandler(404)
@@ -1,16 +1,17 @@
 import jwt
-import bcrypt
+import time
+import hashlib
 import datetime
+import threading
 from functools import wraps
 from flask import request, jsonify
 from database import execute_query
-from config import SECRET_KEY
+from memory_cache import LRUCache
+from metrics import register_cache
+from config import SECRET_KEY, JWT_CACHE_SIZE, JWT_REVOCATION_ENABLED, JWT_REVOCATION_POLL_INTERVAL
 
-def hash_password(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-def check_password(password, hashed):
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+# bcrypt runs in a bounded process pool — both raise passwords.HasherBusy when saturated
+from passwords import hash_password, check_password, needs_rehash, HasherBusy
 
 def generate_token(user_id, username):
     payload = {
@@ -23,18 +24,98 @@ def generate_token(user_id, username):
 def decode_token(token):
     return jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
 
+def token_digest(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+# ── Verified-claims cache ──────────────────────────────────────────────────────
+# The dashboard sends the same token on every call of a page load, so verified
+# claims are kept (keyed by token digest) until the token's own exp.
+
+_token_cache = LRUCache(JWT_CACHE_SIZE)   # digest -> claims, until the token's exp
+register_cache('jwt', _token_cache)
+
+# ── Revocation ─────────────────────────────────────────────────────────────────
+# Revoked token digests live in the revoked_tokens table and an in-memory
+# denylist. A logout always lands in the denylist of the worker that served it;
+# with JWT_REVOCATION_ENABLED a background poller also syncs every worker's
+# denylist from the table, so the token is refused everywhere.
+
+_revoked = frozenset()
+
+def sync_revocations():
+    """Reload the denylist from revoked_tokens and prune expired entries"""
+    global _revoked
+    execute_query("DELETE FROM revoked_tokens WHERE expires_at < now()", commit=True)
+    rows, error = execute_query("SELECT token_digest FROM revoked_tokens")
+    if error:
+        return error
+    _revoked = frozenset(row['token_digest'] for row in rows)
+    return None
+
+def revoke_token(token):
+    """Add a token to the denylist until it would have expired anyway"""
+    global _revoked
+    digest = token_digest(token)
+    claims = jwt.decode(token, options={'verify_signature': False, 'verify_exp': False})
+    _, error = execute_query(
+        """
+        INSERT INTO revoked_tokens (token_digest, expires_at)
+        VALUES (%s, to_timestamp(%s))
+        ON CONFLICT (token_digest) DO NOTHING
+        """,
+        (digest, claims.get('exp', time.time())),
+        commit=True
+    )
+    if error:
+        return error
+    _revoked = _revoked | {digest}
+    _token_cache.discard(digest)
+    return None
+
+def start_revocation_poller(interval=JWT_REVOCATION_POLL_INTERVAL):
+    if not JWT_REVOCATION_ENABLED:
+        return None
+    sync_revocations()
+    if interval <= 0:
+        return None
+
+    def run():
+        while True:
+            time.sleep(interval)
+            error = sync_revocations()
+            if error:
+                print(f"Revocation sync failed: {error}")
+
+    thread = threading.Thread(target=run, name='jwt-revocation-sync', daemon=True)
+    thread.start()
+    return thread
+
+# ── Decorator ──────────────────────────────────────────────────────────────────
+
+def bearer_token():
+    header = request.headers.get('Authorization', '')
+    return header[7:] if header.startswith('Bearer ') else header
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization', '').replace('Bearer ', '')
+        token = bearer_token()
         if not token:
             return jsonify({'success': False, 'error': 'Token missing'}), 401
-        try:
-            data = decode_token(token)
-            request.user = data
-        except jwt.ExpiredSignatureError:
-            return jsonify({'success': False, 'error': 'Token expired'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'success': False, 'error': 'Invalid token'}), 401
+
+        digest = token_digest(token)
+        if digest in _revoked:
+            return jsonify({'success': False, 'error': 'Token revoked'}), 401
+
+        data = _token_cache.get(digest)
+        if data is None:
+            try:
+                data = decode_token(token)
+            except jwt.ExpiredSignatureError:
+                return jsonify({'success': False, 'error': 'Token expired'}), 401
+            except jwt.InvalidTokenError:
+                return jsonify({'success': False, 'error': 'Invalid token'}), 401
+            _token_cache.put(digest, data, expires_at=data.get('exp', 0))
+        request.user = data
         return f(*args, **kwargs)
-    return decorated
\ No newline at end of file
+    return decorated
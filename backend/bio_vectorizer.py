@@ -0,0 +1,286 @@
+"""
+Corpus-level TF-IDF model for bio similarity.
+
+bio_similarity() used to fit a fresh TfidfVectorizer on the two bios being
+compared, so every call paid sklearn's fit overhead and the IDF weights came
+from just two documents. This module fits the vocabulary and document
+frequencies once over every stored bio, saves them with joblib, and serves
+transform-only vectors from then on.
+
+  - load()        — read the saved model at startup (no-op if none exists yet)
+  - similarity()  — cosine similarity of two bios under the corpus model
+  - transform()   — sparse TF-IDF rows, cached per bio by content hash
+  - refit()       — full fit (incremental=False) or fold in bios stored since
+                    the last fit (incremental=True); saves atomically
+  - start_refresher() — background thread that periodically runs an
+                    incremental refit (one worker at a time, via an advisory
+                    lock) and reloads the file when another worker replaced it
+
+CLI:
+  python bio_vectorizer.py fit      # full refit over all stored bios
+  python bio_vectorizer.py update   # incremental refit
+"""
+
+import os
+import hashlib
+import threading
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+from config import BIO_MODEL_PATH, BIO_VECTOR_CACHE_SIZE, BIO_MODEL_REFRESH_INTERVAL
+from memory_cache import LRUCache
+from metrics import register_cache
+
+# Advisory lock key so only one gunicorn worker refits at a time
+REFIT_LOCK_KEY = 0x62696f74   # 'biot'
+
+_lock       = threading.Lock()
+_model      = None   # {'vectorizer', 'vocabulary', 'df', 'n_docs', 'watermark', 'fitted_at'}
+_model_mtime = None
+_cache      = LRUCache(BIO_VECTOR_CACHE_SIZE)   # sha256(text) -> 1 x V sparse row
+register_cache('bio_vector', _cache)
+
+
+# ── Model building ─────────────────────────────────────────────────────────────
+
+def _vectorizer_from_counts(vocabulary: dict, df: np.ndarray, n_docs: int) -> TfidfVectorizer:
+    """Build a transform-ready vectorizer from vocabulary + document frequencies"""
+    vectorizer = TfidfVectorizer(min_df=1, stop_words='english', vocabulary=vocabulary)
+    vectorizer.fit([''])   # initialise internals for the fixed vocabulary
+    # Same smoothed IDF sklearn computes: ln((1 + n) / (1 + df)) + 1
+    vectorizer.idf_ = np.log((1 + n_docs) / (1 + df)) + 1
+    return vectorizer
+
+
+def _fetch_bios(after_id=0):
+    """Return (bios, max_id) for stored bios with source id > after_id"""
+    from database import execute_query
+    from consistency import clean_text
+
+    rows, error = execute_query(
+        """
+        SELECT id, bio FROM oauth_verifications
+        WHERE id > %s AND bio IS NOT NULL AND bio <> ''
+        ORDER BY id
+        """,
+        (after_id,)
+    )
+    if error:
+        raise RuntimeError(error)
+    bios = [clean_text(row['bio']) for row in rows]
+    return [b for b in bios if b], (rows[-1]['id'] if rows else after_id)
+
+
+def fit(bios: list, watermark=0) -> dict:
+    """Fit a model bundle from scratch over `bios` (already cleaned)"""
+    counter = CountVectorizer(stop_words='english', binary=True)
+    try:
+        counts = counter.fit_transform(bios)
+        vocabulary = {term: int(i) for term, i in counter.vocabulary_.items()}
+        df = np.asarray(counts.sum(axis=0)).ravel().astype(np.int64)
+    except ValueError:
+        vocabulary, df = {}, np.zeros(0, dtype=np.int64)   # empty corpus / all stopwords
+
+    return _bundle(vocabulary, df, len(bios), watermark)
+
+
+def fit_incremental(bundle: dict, bios: list, watermark) -> dict:
+    """Fold new documents into an existing bundle's vocabulary and document frequencies"""
+    vocabulary = dict(bundle['vocabulary'])
+    df         = list(bundle['df'])
+    analyzer   = CountVectorizer(stop_words='english').build_analyzer()
+
+    for bio in bios:
+        for term in set(analyzer(bio)):
+            index = vocabulary.get(term)
+            if index is None:
+                vocabulary[term] = len(df)
+                df.append(1)
+            else:
+                df[index] += 1
+
+    return _bundle(vocabulary, np.asarray(df, dtype=np.int64), bundle['n_docs'] + len(bios), watermark)
+
+
+def _bundle(vocabulary, df, n_docs, watermark):
+    return {
+        'vectorizer': _vectorizer_from_counts(vocabulary, df, n_docs) if vocabulary else None,
+        'vocabulary': vocabulary,
+        'df':         df,
+        'n_docs':     n_docs,
+        'watermark':  watermark,
+        'fitted_at':  datetime.utcnow().isoformat(),
+    }
+
+
+# ── Persistence ────────────────────────────────────────────────────────────────
+
+def save(bundle: dict, path=BIO_MODEL_PATH):
+    """Write the bundle atomically so readers never see a half-written file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(bundle, tmp)
+    os.replace(tmp, path)
+
+
+def _install(bundle, mtime):
+    global _model, _model_mtime
+    with _lock:
+        _model       = bundle
+        _model_mtime = mtime
+        _cache.clear()
+
+
+def load(path=BIO_MODEL_PATH) -> bool:
+    """Load the saved model if present. Returns True when a model is in use."""
+    try:
+        mtime  = os.path.getmtime(path)
+        bundle = joblib.load(path)
+    except (OSError, EOFError):
+        return False
+    except Exception as e:
+        print(f"Bio model load failed: {e}")
+        return False
+    _install(bundle, mtime)
+    return bundle.get('vectorizer') is not None
+
+
+def reload_if_changed(path=BIO_MODEL_PATH):
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return
+    if mtime != _model_mtime:
+        load(path)
+
+
+def is_loaded() -> bool:
+    model = _model
+    return model is not None and model.get('vectorizer') is not None
+
+
+def info() -> dict:
+    model = _model
+    if model is None:
+        return {'loaded': False}
+    return {
+        'loaded':     model.get('vectorizer') is not None,
+        'vocabulary': len(model['vocabulary']),
+        'documents':  model['n_docs'],
+        'fitted_at':  model['fitted_at'],
+        'cached_vectors': len(_cache),
+    }
+
+
+# ── Refitting ──────────────────────────────────────────────────────────────────
+
+def refit(incremental=True, path=BIO_MODEL_PATH) -> dict:
+    """Refit from the database, save, and swap the new model in. Returns info()."""
+    current = _model
+    if incremental and current is not None:
+        bios, watermark = _fetch_bios(current['watermark'])
+        if not bios and watermark == current['watermark']:
+            return info()
+        bundle = fit_incremental(current, bios, watermark)
+    else:
+        bios, watermark = _fetch_bios(0)
+        bundle = fit(bios, watermark)
+
+    save(bundle, path)
+    _install(bundle, os.path.getmtime(path))
+    return info()
+
+
+def _refresh_once():
+    """Incremental refit under an advisory lock; other workers just pick up the new file"""
+    from database import execute_query, transaction
+
+    reload_if_changed()
+    with transaction():
+        locked, _ = execute_query("SELECT pg_try_advisory_xact_lock(%s) AS locked", (REFIT_LOCK_KEY,), fetchone=True)
+        if locked and locked['locked']:
+            refit(incremental=True)
+
+
+def start_refresher(interval=BIO_MODEL_REFRESH_INTERVAL):
+    """Start the periodic refit/reload thread (interval <= 0 disables it)"""
+    if interval <= 0:
+        return None
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                _refresh_once()
+            except Exception as e:
+                print(f"Bio model refresh failed: {e}")
+
+    thread = threading.Thread(target=run, name='bio-model-refresh', daemon=True)
+    thread.start()
+    return thread
+
+
+# ── Scoring ────────────────────────────────────────────────────────────────────
+
+def transform(texts: list):
+    """
+    TF-IDF rows (L2-normalized, CSR) for already-cleaned texts, or None without a model.
+    Rows are cached by the text's SHA-256 so repeat bios skip the vectorizer.
+    """
+    from scipy.sparse import vstack
+
+    model = _model
+    if model is None or model.get('vectorizer') is None:
+        return None
+
+    keys = [hashlib.sha256(t.encode()).hexdigest() for t in texts]
+    rows, missing = {}, []
+    with _lock:
+        for key, text in zip(keys, texts):
+            row = _cache.get(key)
+            if row is None:
+                missing.append((key, text))
+            else:
+                rows[key] = row
+
+    if missing:
+        unique  = dict(missing)
+        matrix  = model['vectorizer'].transform(list(unique.values()))
+        with _lock:
+            for i, key in enumerate(unique):
+                row = matrix[i]
+                rows[key] = row
+                if _model is model:
+                    _cache.put(key, row)
+
+    return vstack([rows[key] for key in keys], format='csr')
+
+
+def similarity(a: str, b: str):
+    """
+    Cosine similarity (0-100) of two cleaned bios under the corpus model.
+    Returns None when there is no model or either bio has no in-vocabulary
+    terms — the caller then falls back to its pairwise scoring.
+    """
+    matrix = transform([a, b])
+    if matrix is None or matrix[0].nnz == 0 or matrix[1].nnz == 0:
+        return None
+    return round(float(matrix[0].multiply(matrix[1]).sum()) * 100, 2)
+
+
+if __name__ == '__main__':
+    import sys
+
+    if sys.argv[1:] not in (['fit'], ['update']):
+        print("Usage: python bio_vectorizer.py fit|update")
+        sys.exit(1)
+
+    load()
+    stats = refit(incremental=sys.argv[1] == 'update')
+    print(f"Bio model saved to {BIO_MODEL_PATH}")
+    for key, value in stats.items():
+        print(f"  {key:<15} {value}")
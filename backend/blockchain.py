@@ -7,8 +7,8 @@ Network:  Polygon Amoy (Chain ID: 80002)
 """
 
 import hashlib
-from web3 import Web3
-from config import CONTRACT_ADDRESS, WALLET_ADDRESS, WALLET_PRIVATE_KEY, AMOY_RPC_URL
+from config import CONTRACT_ADDRESS, WALLET_PRIVATE_KEY, CHAIN_ID
+from tracing import traced
 
 # ── ABI — only the functions we need ──────────────────────────────────────────
 CONTRACT_ABI = [
@@ -67,19 +67,15 @@ CONTRACT_ABI = [
 # ── Web3 connection ────────────────────────────────────────────────────────────
 
 def get_web3():
-    """Connect to Polygon Amoy RPC"""
-    w3 = Web3(Web3.HTTPProvider(AMOY_RPC_URL))
-    if not w3.is_connected():
-        raise ConnectionError(f"Could not connect to Amoy RPC: {AMOY_RPC_URL}")
-    return w3
+    """Shared Web3 instance for this process (pooled HTTP session, no per-call connect check)"""
+    from chain_client import get_client
+    return get_client().w3
 
 
 def get_contract(w3):
-    """Get contract instance"""
-    return w3.eth.contract(
-        address=Web3.to_checksum_address(CONTRACT_ADDRESS),
-        abi=CONTRACT_ABI
-    )
+    """Get contract instance — cached per Web3 instance"""
+    from chain_client import client_for
+    return client_for(w3).contract
 
 
 # ── Hash builder ───────────────────────────────────────────────────────────────
@@ -93,11 +89,90 @@ def build_verification_hash(verification_id: int, anchor_id: int, platform: str,
     return hashlib.sha256(raw.encode()).digest()  # 32 bytes
 
 
+# ── Transactions ───────────────────────────────────────────────────────────────
+
+# Batch Merkle roots share the contract's storeVerification(id, hash) slot space
+# with single verifications, so they are stored under ids offset by 2**128.
+ROOT_ID_OFFSET = 1 << 128
+
+
+@traced('blockchain.send_transaction')
+def send_contract_transaction(w3, fn_call, gas=100000, receipt_timeout=60) -> dict:
+    """
+    Sign and send a contract call from the service wallet, then wait for the receipt.
+    Nonces come from the client's local allocator and gas price from its cached oracle.
+    Returns {'tx_hash', 'status', 'block'}.
+    """
+    from chain_client import client_for
+    client = client_for(w3)
+
+    private_key = WALLET_PRIVATE_KEY
+    if not private_key.startswith('0x'):
+        private_key = '0x' + private_key
+
+    try:
+        txn = fn_call.build_transaction({
+            'chainId':  CHAIN_ID,
+            'from':     client.wallet,
+            'nonce':    client.nonces.allocate(),
+            'gasPrice': client.gas.get(),
+            'gas':      gas,
+        })
+        signed  = w3.eth.account.sign_transaction(txn, private_key=private_key)
+        raw     = getattr(signed, 'raw_transaction', None) or signed.rawTransaction
+        tx_hash = w3.eth.send_raw_transaction(raw)
+    except Exception:
+        # The allocated nonce may be unused or already taken — re-read it from the node
+        client.nonces.resync()
+        raise
+
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=receipt_timeout)
+    return {
+        'tx_hash': tx_hash.hex(),
+        'status':  receipt['status'],
+        'block':   receipt['blockNumber'],
+    }
+
+
+@traced('blockchain.store_root')
+def store_root_on_chain(batch_id: int, root: bytes, w3=None, contract=None) -> dict:
+    """
+    Commit one batch's Merkle root. Same result shape as store_verification_on_chain.
+    Pass w3/contract to target another chain (e.g. a local dev chain in tests).
+    """
+    try:
+        w3       = w3 or get_web3()
+        contract = contract or get_contract(w3)
+        slot     = ROOT_ID_OFFSET + batch_id
+        root_hex = '0x' + root.hex()
+
+        existing_hash, _ = contract.functions.getVerification(slot).call()
+        if existing_hash == root:
+            return {'success': True, 'tx_hash': None, 'hash_stored': root_hex, 'note': 'Already stored on-chain'}
+        if existing_hash != b'\x00' * 32:
+            return {'success': False, 'error': f'Root slot for batch {batch_id} already holds a different hash'}
+
+        sent = send_contract_transaction(w3, contract.functions.storeVerification(slot, root))
+        if sent['status'] != 1:
+            return {'success': False, 'error': 'Transaction failed on-chain', 'tx_hash': sent['tx_hash']}
+        return {
+            'success':     True,
+            'tx_hash':     sent['tx_hash'],
+            'polygonscan': f"https://amoy.polygonscan.com/tx/{sent['tx_hash']}",
+            'hash_stored': root_hex,
+            'block':       sent['block'],
+        }
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
 # ── Main functions ─────────────────────────────────────────────────────────────
 
+@traced('blockchain.store_verification')
 def store_verification_on_chain(verification_id: int, anchor_id: int, platform: str, profile_url: str) -> dict:
     """
-    Store a verification hash on the Polygon Amoy blockchain.
+    Store a single verification hash on the Polygon Amoy blockchain, synchronously.
+    The API now queues verifications for batched anchoring (anchoring.py) instead.
 
     Returns a dict with:
         success      (bool)
@@ -125,41 +200,17 @@ def store_verification_on_chain(verification_id: int, anchor_id: int, platform:
                 'note':        'Already stored on-chain'
             }
 
-        # Build transaction
-        wallet   = Web3.to_checksum_address(WALLET_ADDRESS)
-        nonce    = w3.eth.get_transaction_count(wallet)
-        gas_price = w3.eth.gas_price
-
-        txn = contract.functions.storeVerification(
-            verification_id,
-            hash_bytes
-        ).build_transaction({
-            'chainId':  80002,
-            'from':     wallet,
-            'nonce':    nonce,
-            'gasPrice': gas_price,
-            'gas':      100000,
-        })
-
-        # Sign and send
-        private_key = WALLET_PRIVATE_KEY
-        if not private_key.startswith('0x'):
-            private_key = '0x' + private_key
-
-        signed  = w3.eth.account.sign_transaction(txn, private_key=private_key)
-        tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-        tx_hex  = tx_hash.hex()
-
-        # Wait for receipt (up to 60 seconds)
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=60)
+        # Sign, send and wait for the receipt (up to 60 seconds)
+        sent   = send_contract_transaction(w3, contract.functions.storeVerification(verification_id, hash_bytes))
+        tx_hex = sent['tx_hash']
 
-        if receipt['status'] == 1:
+        if sent['status'] == 1:
             return {
                 'success':     True,
                 'tx_hash':     tx_hex,
                 'polygonscan': f"https://amoy.polygonscan.com/tx/{tx_hex}",
                 'hash_stored': hash_hex,
-                'block':       receipt['blockNumber']
+                'block':       sent['block']
             }
         else:
             return {
@@ -175,6 +226,7 @@ def store_verification_on_chain(verification_id: int, anchor_id: int, platform:
         }
 
 
+@traced('blockchain.get_verification')
 def get_verification_from_chain(verification_id: int) -> dict:
     """
     Fetch a stored verification hash from the blockchain.
@@ -202,24 +254,26 @@ def get_verification_from_chain(verification_id: int) -> dict:
 
 
 def check_connection() -> dict:
-    """Health check for blockchain connection"""
+    """Health check for blockchain connection — served from the client's cached status"""
     try:
-        w3       = get_web3()
-        contract = get_contract(w3)
-        total    = contract.functions.totalVerifications().call()
-        block    = w3.eth.block_number
-        return {
-            'success':             True,
-            'connected':           True,
-            'network':             'Polygon Amoy',
-            'chain_id':            80002,
-            'current_block':       block,
-            'total_verifications': total,
-            'contract':            CONTRACT_ADDRESS
-        }
+        from chain_client import get_client
+        status = get_client().status()
     except Exception as e:
+        status = {'connected': False, 'error': str(e)}
+
+    if not status['connected']:
         return {
             'success':   False,
             'connected': False,
-            'error':     str(e)
-        }
\ No newline at end of file
+            'error':     status.get('error')
+        }
+    return {
+        'success':             True,
+        'connected':           True,
+        'network':             'Polygon Amoy',
+        'chain_id':            CHAIN_ID,
+        'current_block':       status['current_block'],
+        'total_verifications': status['total_verifications'],
+        'contract':            CONTRACT_ADDRESS,
+        'checked_seconds_ago': status['checked_seconds_ago']
+    }
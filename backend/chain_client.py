@@ -0,0 +1,139 @@
+"""
+Long-lived Web3 client for the verification contract.
+
+get_web3() used to build a new HTTPProvider and call is_connected() on every
+use, get_contract() rebuilt the contract each time, and every send fetched the
+nonce from the node, so concurrent stores raced for the same nonce. One
+ChainClient per process now holds:
+
+  - a Web3 instance on a pooled, keep-alive requests.Session
+  - the contract instance, built once
+  - NonceManager   — hands out nonces locally under a lock, resyncs from the
+                     node ('pending' count) after any send error
+  - GasPriceOracle — caches eth.gas_price for GAS_PRICE_TTL seconds
+  - a cached status snapshot (block, total verifications) refreshed at most
+    every CHAIN_STATUS_TTL seconds for /api/blockchain/status
+"""
+
+import os
+import threading
+import time
+
+import requests
+from web3 import Web3
+
+from tracing import TracedAdapter
+from config import AMOY_RPC_URL, CONTRACT_ADDRESS, WALLET_ADDRESS, GAS_PRICE_TTL, CHAIN_STATUS_TTL
+
+RPC_TIMEOUT   = 30
+RPC_POOL_SIZE = 10
+
+
+class NonceManager:
+    """Thread-safe local nonce allocator for one sending address"""
+
+    def __init__(self, w3, address):
+        self.w3      = w3
+        self.address = address
+        self._next   = None
+        self._lock   = threading.Lock()
+
+    def allocate(self) -> int:
+        with self._lock:
+            if self._next is None:
+                self._next = self.w3.eth.get_transaction_count(self.address, 'pending')
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def resync(self):
+        """Forget local state; the next allocate() re-reads the pending count from the node"""
+        with self._lock:
+            self._next = None
+
+
+class GasPriceOracle:
+    """eth.gas_price cached for a short TTL"""
+
+    def __init__(self, w3, ttl):
+        self.w3       = w3
+        self.ttl      = ttl
+        self._price   = None
+        self._fetched = 0.0
+        self._lock    = threading.Lock()
+
+    def get(self) -> int:
+        with self._lock:
+            if self._price is None or time.monotonic() - self._fetched > self.ttl:
+                self._price   = self.w3.eth.gas_price
+                self._fetched = time.monotonic()
+            return self._price
+
+
+class ChainClient:
+    """Everything needed to read from and send to the verification contract"""
+
+    def __init__(self, w3=None, contract_abi=None):
+        if w3 is None:
+            session = requests.Session()
+            adapter = TracedAdapter(pool_connections=1, pool_maxsize=RPC_POOL_SIZE, kind='chain')
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            w3 = Web3(Web3.HTTPProvider(AMOY_RPC_URL, request_kwargs={'timeout': RPC_TIMEOUT}, session=session))
+
+        if contract_abi is None:
+            from blockchain import CONTRACT_ABI as contract_abi
+
+        self.w3       = w3
+        self.pid      = os.getpid()
+        self.contract = w3.eth.contract(address=Web3.to_checksum_address(CONTRACT_ADDRESS), abi=contract_abi)
+        self.wallet   = Web3.to_checksum_address(WALLET_ADDRESS) if WALLET_ADDRESS else None
+        self.nonces   = NonceManager(w3, self.wallet) if self.wallet else None
+        self.gas      = GasPriceOracle(w3, GAS_PRICE_TTL)
+
+        self._status         = None
+        self._status_fetched = 0.0
+        self._status_lock    = threading.Lock()
+
+    def status(self) -> dict:
+        """Connection snapshot, refreshed at most every CHAIN_STATUS_TTL seconds"""
+        with self._status_lock:
+            if self._status is None or time.monotonic() - self._status_fetched > CHAIN_STATUS_TTL:
+                try:
+                    self._status = {
+                        'connected':           True,
+                        'current_block':       self.w3.eth.block_number,
+                        'total_verifications': self.contract.functions.totalVerifications().call(),
+                    }
+                except Exception as e:
+                    self._status = {'connected': False, 'error': str(e)}
+                self._status_fetched = time.monotonic()
+            return {**self._status, 'checked_seconds_ago': round(time.monotonic() - self._status_fetched, 1)}
+
+
+_client       = None
+_client_lock  = threading.Lock()
+_wrapped      = {}   # id(w3) -> ChainClient, for injected Web3 instances (tests / dev chains)
+
+def get_client() -> ChainClient:
+    """This process's client, created lazily (and again after a gunicorn fork)"""
+    global _client
+    client = _client
+    if client is not None and client.pid == os.getpid():
+        return client
+    with _client_lock:
+        if _client is None or _client.pid != os.getpid():
+            _client = ChainClient()
+        return _client
+
+def client_for(w3=None) -> ChainClient:
+    """The process client, or a cached client wrapping an injected Web3 instance"""
+    if w3 is None:
+        return get_client()
+    if _client is not None and w3 is _client.w3:
+        return _client
+    with _client_lock:
+        entry = _wrapped.get(id(w3))
+        if entry is None or entry.w3 is not w3:
+            entry = _wrapped[id(w3)] = ChainClient(w3)
+        return entry
@@ -0,0 +1,278 @@
+"""
+Duplicate / sock-puppet identity clustering.
+
+consistency.py scores two profiles someone already paired up; comparing every
+profile with every other is O(n²). This offline job finds identities that look
+like the same person without doing that:
+
+  1. profiles   one per oauth_verifications row — username, display name and
+                bio, filled in from the stored GitHub profile (profile_cache)
+                where the row itself has none
+  2. shingles   character 3-grams of the normalised username and name, words of
+                the bio, each tagged by field and hashed to 32 bits
+  3. MinHash    CLUSTER_NUM_PERM universal hashes (a·x + b mod p) in numpy
+  4. LSH        signatures cut into CLUSTER_BANDS bands; profiles of different
+                anchors that share any band bucket become candidate pairs
+  5. scoring    candidates only, with calc_real_consistency_score, fanned out
+                over a process pool; pairs >= CLUSTER_MIN_SCORE are links
+  6. clusters   union-find over linked anchors, written to identity_clusters
+                (membership) and identity_cluster_links (the evidence)
+
+With 32 bands of 4 rows, pairs at Jaccard similarity ~0.42 have a 50% chance
+to become candidates, and ~0.7 almost always do.
+
+CLI:
+  python clustering.py run
+"""
+
+import os
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from psycopg2.extras import Json
+
+from database import execute_query, execute_values, transaction
+from consistency import clean_text, calc_real_consistency_score
+from config import CLUSTER_NUM_PERM, CLUSTER_BANDS, CLUSTER_MIN_SCORE, CLUSTER_WORKERS, CLUSTER_MAX_BUCKET
+
+MERSENNE_PRIME = np.uint64(4294967311)   # smallest prime above 2**32
+SEED           = 1729
+SCORE_CHUNK    = 256
+
+
+# ── Profiles ───────────────────────────────────────────────────────────────────
+
+def load_profiles():
+    rows, error = execute_query(
+        """
+        SELECT o.id, o.anchor_id, o.platform,
+               o.platform_username                                       AS username,
+               COALESCE(NULLIF(o.display_name, ''), pc.profile->>'name') AS name,
+               COALESCE(NULLIF(o.bio, ''),          pc.profile->>'bio')  AS bio
+        FROM oauth_verifications o
+        LEFT JOIN profile_cache pc
+               ON o.platform = 'GitHub' AND pc.cache_key = 'github:' || lower(o.platform_username)
+        WHERE o.anchor_id IS NOT NULL
+        ORDER BY o.id
+        """
+    )
+    return rows or [], error
+
+
+def shingles(profile) -> np.ndarray:
+    """32-bit hashes of the profile's field-tagged shingles"""
+    tokens = set()
+    for field in ('username', 'name'):
+        text = clean_text(profile.get(field) or '').replace(' ', '')
+        if len(text) < 3:
+            if text:
+                tokens.add(f'{field[0]}:{text}')
+            continue
+        tokens.update(f'{field[0]}:{text[i:i + 3]}' for i in range(len(text) - 2))
+    tokens.update(f'b:{word}' for word in clean_text(profile.get('bio') or '').split())
+    return np.fromiter((zlib.crc32(t.encode('utf-8')) for t in tokens), dtype=np.uint64, count=len(tokens))
+
+
+# ── MinHash / LSH ──────────────────────────────────────────────────────────────
+
+def hash_params(num_perm=CLUSTER_NUM_PERM, seed=SEED):
+    rng = np.random.default_rng(seed)
+    a   = rng.integers(1, 2 ** 32, size=num_perm, dtype=np.uint64)
+    b   = rng.integers(0, 2 ** 32, size=num_perm, dtype=np.uint64)
+    return a, b
+
+def minhash(hashes: np.ndarray, a, b) -> np.ndarray:
+    """(num_perm,) signature — a·x + b stays below 2**64 because a, x < 2**32"""
+    return ((np.outer(a, hashes) + b[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+
+def candidate_pairs(signatures: np.ndarray, anchors: list, bands=CLUSTER_BANDS, max_bucket=CLUSTER_MAX_BUCKET):
+    """Index pairs (i, j), i < j, of different anchors that share an LSH band bucket"""
+    rows_per_band = signatures.shape[1] // bands
+    pairs, skipped = set(), 0
+    for band in range(bands):
+        buckets = defaultdict(list)
+        chunk   = np.ascontiguousarray(signatures[:, band * rows_per_band:(band + 1) * rows_per_band])
+        for i, row in enumerate(chunk):
+            buckets[row.tobytes()].append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) > max_bucket:   # degenerate bucket (e.g. a very common name) — not evidence
+                skipped += 1
+                continue
+            for x, i in enumerate(members):
+                for j in members[x + 1:]:
+                    if anchors[i] != anchors[j]:
+                        pairs.add((i, j))
+    return sorted(pairs), skipped
+
+
+# ── Scoring ────────────────────────────────────────────────────────────────────
+
+def _score_chunk(chunk):
+    """Runs in the pool: [(i, j, profile_a, profile_b)] -> [(i, j, score, breakdown)]"""
+    out = []
+    for i, j, profile_a, profile_b in chunk:
+        result = calc_real_consistency_score(profile_a, profile_b)
+        out.append((i, j, result['total_score'], result['breakdown']))
+    return out
+
+def score_pairs(pairs, profiles, workers=CLUSTER_WORKERS):
+    def text(p):
+        return {key: p.get(key) or '' for key in ('username', 'name', 'bio', 'platform')}
+
+    work   = [(i, j, text(profiles[i]), text(profiles[j])) for i, j in pairs]
+    chunks = [work[k:k + SCORE_CHUNK] for k in range(0, len(work), SCORE_CHUNK)]
+    if workers <= 1 or len(chunks) <= 1:
+        return [scored for chunk in chunks for scored in _score_chunk(chunk)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [scored for result in pool.map(_score_chunk, chunks) for scored in result]
+
+
+# ── Union-find ─────────────────────────────────────────────────────────────────
+
+class DisjointSet:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:   # path compression
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, x, y):
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            # Smallest anchor id becomes the root, so cluster ids are stable between runs
+            self.parent[max(rx, ry)] = min(rx, ry)
+
+    def groups(self):
+        groups = defaultdict(list)
+        for x in self.parent:
+            groups[self.find(x)].append(x)
+        return groups
+
+
+# ── Job ────────────────────────────────────────────────────────────────────────
+
+def run(min_score=CLUSTER_MIN_SCORE):
+    """Rebuild identity_clusters from scratch. Returns (summary, error)."""
+    started = time.perf_counter()
+    profiles, error = load_profiles()
+    if error:
+        return None, error
+
+    a, b = hash_params()
+    usable, signatures = [], []
+    for profile in profiles:
+        hashes = shingles(profile)
+        if hashes.size:
+            usable.append(profile)
+            signatures.append(minhash(hashes, a, b))
+    if len(usable) < 2:
+        signatures = np.empty((0, CLUSTER_NUM_PERM), dtype=np.uint64)
+    else:
+        signatures = np.vstack(signatures)
+
+    anchors         = [p['anchor_id'] for p in usable]
+    pairs, skipped  = candidate_pairs(signatures, anchors) if len(usable) >= 2 else ([], 0)
+    scored          = score_pairs(pairs, usable)
+
+    # Keep the best-scoring link per anchor pair
+    links = {}
+    for i, j, score, breakdown in scored:
+        if score < min_score:
+            continue
+        key = tuple(sorted((anchors[i], anchors[j])))
+        if key not in links or score > links[key][0]:
+            links[key] = (score, {'profile_ids': [usable[i]['id'], usable[j]['id']], **breakdown})
+
+    sets = DisjointSet()
+    for anchor_a, anchor_b in links:
+        sets.union(anchor_a, anchor_b)
+    clusters = {root: sorted(members) for root, members in sets.groups().items()}
+
+    with transaction() as tx:
+        execute_query("DELETE FROM identity_cluster_links", commit=True)
+        execute_query("DELETE FROM identity_clusters", commit=True)
+        execute_values(
+            "INSERT INTO identity_clusters (anchor_id, cluster_id, cluster_size) VALUES %s",
+            [(anchor, root, len(members)) for root, members in clusters.items() for anchor in members]
+        )
+        execute_values(
+            "INSERT INTO identity_cluster_links (anchor_a, anchor_b, score, evidence) VALUES %s",
+            [(anchor_a, anchor_b, score, Json(evidence)) for (anchor_a, anchor_b), (score, evidence) in links.items()]
+        )
+    if tx.error:
+        return None, tx.error
+
+    return {
+        'profiles':         len(profiles),
+        'hashed_profiles':  len(usable),
+        'candidate_pairs':  len(pairs),
+        'skipped_buckets':  skipped,
+        'links':            len(links),
+        'clusters':         len(clusters),
+        'clustered_anchors': sum(len(m) for m in clusters.values()),
+        'seconds':          round(time.perf_counter() - started, 2),
+    }, None
+
+
+def get_cluster(anchor_id):
+    """The anchor's cluster — members with trust scores and the links between them"""
+    cluster, error = execute_query(
+        "SELECT cluster_id, cluster_size, clustered_at FROM identity_clusters WHERE anchor_id = %s",
+        (anchor_id,),
+        fetchone=True
+    )
+    if error:
+        return None, error
+    if not cluster:
+        return {'anchor_id': anchor_id, 'cluster_id': None, 'members': [], 'links': []}, None
+
+    members, error = execute_query(
+        """
+        SELECT c.anchor_id, i.trust_score, i.created_at
+        FROM identity_clusters c JOIN identity_anchors i ON i.anchor_id = c.anchor_id
+        WHERE c.cluster_id = %s
+        ORDER BY c.anchor_id
+        """,
+        (cluster['cluster_id'],)
+    )
+    if error:
+        return None, error
+    links, error = execute_query(
+        """
+        SELECT l.anchor_a, l.anchor_b, l.score, l.evidence
+        FROM identity_cluster_links l
+        JOIN identity_clusters c ON c.anchor_id = l.anchor_a
+        WHERE c.cluster_id = %s
+        ORDER BY l.score DESC
+        """,
+        (cluster['cluster_id'],)
+    )
+    if error:
+        return None, error
+    return {'anchor_id': anchor_id, **cluster, 'members': members, 'links': links}, None
+
+
+if __name__ == '__main__':
+    import json
+    import sys
+
+    if sys.argv[1:] != ['run']:
+        print("Usage: python clustering.py run")
+        sys.exit(1)
+    summary, error = run()
+    if error:
+        print(f"Clustering failed: {error}")
+        sys.exit(1)
+    print(json.dumps(summary, indent=2))
@@ -15,6 +15,16 @@ CONTRACT_ADDRESS    = os.getenv('CONTRACT_ADDRESS')
 WALLET_ADDRESS      = os.getenv('WALLET_ADDRESS')
 WALLET_PRIVATE_KEY  = os.getenv('WALLET_PRIVATE_KEY')
 AMOY_RPC_URL        = os.getenv('AMOY_RPC_URL', 'https://rpc-amoy.polygon.technology')
+CHAIN_ID            = int(os.getenv('CHAIN_ID', 80002))   # override for a local dev chain (anvil: 31337)
+
+GAS_PRICE_TTL       = float(os.getenv('GAS_PRICE_TTL', 10))       # seconds a fetched gas price is reused
+CHAIN_STATUS_TTL    = float(os.getenv('CHAIN_STATUS_TTL', 15))    # seconds /api/blockchain/status serves cached state
+
+# Batched Merkle anchoring (see anchoring.py)
+ANCHOR_BATCH_SIZE     = int(os.getenv('ANCHOR_BATCH_SIZE', 256))
+ANCHOR_INTERVAL       = float(os.getenv('ANCHOR_INTERVAL', 30))       # seconds between batches
+ANCHOR_MAX_ATTEMPTS   = int(os.getenv('ANCHOR_MAX_ATTEMPTS', 5))
+ANCHOR_WORKER_ENABLED = os.getenv('ANCHOR_WORKER_ENABLED', 'False') == 'True'
 
 
 # Render provides DATABASE_URL — use it if available, otherwise fall back to local config
@@ -34,6 +44,106 @@ else:
         'port':     '5432'
     }
 
+# Connection pool — one pool per gunicorn worker process
+DB_POOL_MIN        = int(os.getenv('DB_POOL_MIN', 1))
+DB_POOL_MAX        = int(os.getenv('DB_POOL_MAX', 10))
+DB_POOL_TIMEOUT    = float(os.getenv('DB_POOL_TIMEOUT', 5))        # seconds to wait for a free connection
+DB_POOL_MAX_USES   = int(os.getenv('DB_POOL_MAX_USES', 1000))      # recycle a connection after N checkouts
+DB_POOL_PING_AFTER = float(os.getenv('DB_POOL_PING_AFTER', 30))    # ping on borrow if idle longer than this
+
+# Corpus-level TF-IDF model for bio similarity (see bio_vectorizer.py)
+BIO_MODEL_PATH             = os.getenv('BIO_MODEL_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'bio_tfidf.joblib'))
+BIO_VECTOR_CACHE_SIZE      = int(os.getenv('BIO_VECTOR_CACHE_SIZE', 10000))
+BIO_MODEL_REFRESH_INTERVAL = float(os.getenv('BIO_MODEL_REFRESH_INTERVAL', 3600))   # seconds, 0 disables
+
+# GitHub profile cache (see profile_cache.py) — point GITHUB_API_URL at a stub server in tests
+GITHUB_API_URL     = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+PROFILE_CACHE_TTL  = float(os.getenv('PROFILE_CACHE_TTL', 3600))
+PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', 5000))
+PROFILE_CACHE_DB   = os.getenv('PROFILE_CACHE_DB', 'False') == 'True'
+
+# Password hashing pool (see passwords.py)
+BCRYPT_ROUNDS     = int(os.getenv('BCRYPT_ROUNDS', 0))        # 0 = calibrate at startup to BCRYPT_TARGET_MS
+BCRYPT_TARGET_MS  = float(os.getenv('BCRYPT_TARGET_MS', 250))
+BCRYPT_MIN_ROUNDS = int(os.getenv('BCRYPT_MIN_ROUNDS', 12))   # calibration never goes below bcrypt's default of 12
+BCRYPT_MAX_ROUNDS = int(os.getenv('BCRYPT_MAX_ROUNDS', 14))
+BCRYPT_WORKERS    = int(os.getenv('BCRYPT_WORKERS', 2))
+BCRYPT_MAX_QUEUE  = int(os.getenv('BCRYPT_MAX_QUEUE', 16))    # running + waiting before 503
+BCRYPT_TIMEOUT    = float(os.getenv('BCRYPT_TIMEOUT', 10))
+
+# JWT verification cache and revocation denylist sync across workers (see backend/auth.py)
+JWT_CACHE_SIZE                = int(os.getenv('JWT_CACHE_SIZE', 4096))
+JWT_REVOCATION_ENABLED        = os.getenv('JWT_REVOCATION_ENABLED', 'False') == 'True'
+JWT_REVOCATION_POLL_INTERVAL  = float(os.getenv('JWT_REVOCATION_POLL_INTERVAL', 30))   # seconds
+
+# Pre-generated identity keypairs (see backend/keypool.py)
+KEYPOOL_ENABLED          = os.getenv('KEYPOOL_ENABLED', 'False') == 'True'
+KEYPOOL_SIZE             = int(os.getenv('KEYPOOL_SIZE', 64))
+KEYPOOL_LOW_WATER        = int(os.getenv('KEYPOOL_LOW_WATER', 16))       # wake the refiller below this depth
+KEYPOOL_REFILL_INTERVAL  = float(os.getenv('KEYPOOL_REFILL_INTERVAL', 30))
+
+# Decrypted signing keys kept in memory briefly (see backend/signing.py)
+SIGNING_KEY_CACHE_SIZE  = int(os.getenv('SIGNING_KEY_CACHE_SIZE', 128))
+SIGNING_KEY_TTL         = float(os.getenv('SIGNING_KEY_TTL', 60))   # seconds since decryption
+VERIFY_KEY_CACHE_SIZE   = int(os.getenv('VERIFY_KEY_CACHE_SIZE', 4096))
+VERIFY_WORKERS          = int(os.getenv('VERIFY_WORKERS', 4))      # threads for large batch verifications
+
+# Rendered QR codes (see backend/qr_cache.py) — QR_CACHE_DIR='' keeps them in memory only
+QR_CACHE_SIZE  = int(os.getenv('QR_CACHE_SIZE', 512))
+QR_CACHE_DIR   = os.getenv('QR_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'qr'))
+
+# Streaming exports (see backend/exporter.py) — rows fetched per server-side cursor round trip
+EXPORT_FETCH_SIZE = int(os.getenv('EXPORT_FETCH_SIZE', 2000))
+
+# Trust score history rollups (see backend/trust_history.py)
+TRUST_ROLLUP_WORKER_ENABLED = os.getenv('TRUST_ROLLUP_WORKER_ENABLED', 'False') == 'True'
+TRUST_ROLLUP_INTERVAL       = float(os.getenv('TRUST_ROLLUP_INTERVAL', 300))   # seconds between rollup runs
+TRUST_ROLLUP_LAG            = int(os.getenv('TRUST_ROLLUP_LAG', 300))          # seconds a bucket stays open after it ends
+TRUST_HISTORY_MAX_POINTS    = int(os.getenv('TRUST_HISTORY_MAX_POINTS', 2000))
+
+# Response compression / caching (see backend/response_layer.py)
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))   # bytes
+COMPRESS_LEVEL    = int(os.getenv('COMPRESS_LEVEL', 6))         # gzip 1-9
+BROTLI_QUALITY    = int(os.getenv('BROTLI_QUALITY', 5))         # brotli 0-11, if installed
+STATIC_MAX_AGE    = int(os.getenv('STATIC_MAX_AGE', 3600))      # seconds, versioned (?v=) frontend assets
+
+# Batched reputation event ingestion (see backend/event_ingest.py)
+EVENT_INGEST_DURABILITY = os.getenv('EVENT_INGEST_DURABILITY', 'group')     # sync | group | async
+EVENT_FLUSH_INTERVAL    = float(os.getenv('EVENT_FLUSH_INTERVAL', 0.2))     # seconds
+EVENT_FLUSH_MAX         = int(os.getenv('EVENT_FLUSH_MAX', 2000))           # flush early at this many queued events
+EVENT_FLUSH_TIMEOUT     = float(os.getenv('EVENT_FLUSH_TIMEOUT', 10))       # group mode: max wait for the commit
+
+# Duplicate identity clustering job (see backend/clustering.py)
+CLUSTER_NUM_PERM   = int(os.getenv('CLUSTER_NUM_PERM', 128))      # MinHash permutations
+CLUSTER_BANDS      = int(os.getenv('CLUSTER_BANDS', 32))          # LSH bands (rows per band = perms / bands)
+CLUSTER_MIN_SCORE  = float(os.getenv('CLUSTER_MIN_SCORE', 70))    # consistency score that links two identities
+CLUSTER_WORKERS    = int(os.getenv('CLUSTER_WORKERS', os.cpu_count() or 1))
+CLUSTER_MAX_BUCKET = int(os.getenv('CLUSTER_MAX_BUCKET', 200))    # larger LSH buckets are ignored
+
+# Lookalike-username index (see backend/lookalikes.py)
+LOOKALIKE_ENABLED       = os.getenv('LOOKALIKE_ENABLED', 'False') == 'True'
+LOOKALIKE_MAX_DISTANCE  = int(os.getenv('LOOKALIKE_MAX_DISTANCE', 2))       # largest k a query may ask for
+LOOKALIKE_FLAG_DISTANCE = int(os.getenv('LOOKALIKE_FLAG_DISTANCE', 1))      # new accounts this close to another anchor's are flagged
+LOOKALIKE_POLL_INTERVAL = float(os.getenv('LOOKALIKE_POLL_INTERVAL', 30))   # seconds between picking up other workers' inserts
+
+# Request tracing (see backend/tracing.py)
+TRACING_EXPORTER       = os.getenv('TRACING_EXPORTER', 'none')            # none | file | otlp
+TRACING_FILE           = os.getenv('TRACING_FILE', 'traces.jsonl')
+TRACING_OTLP_ENDPOINT  = os.getenv('TRACING_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+TRACING_SAMPLE_RATE    = float(os.getenv('TRACING_SAMPLE_RATE', 1.0))     # share of new traces exported
+TRACING_SERVICE_NAME   = os.getenv('TRACING_SERVICE_NAME', 'identity-verifier')
+TRACING_FLUSH_INTERVAL = float(os.getenv('TRACING_FLUSH_INTERVAL', 2))    # seconds
+TRACING_QUEUE_MAX      = int(os.getenv('TRACING_QUEUE_MAX', 10000))       # spans held for export; oldest dropped
+
+# Prometheus-style metrics (see backend/metrics.py)
+METRICS_ENABLED        = os.getenv('METRICS_ENABLED', 'False') == 'True'
+METRICS_DIR            = os.getenv('METRICS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'metrics'))
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 1))   # seconds between per-worker snapshots
+METRICS_TOKEN          = os.getenv('METRICS_TOKEN', '')                  # if set, scrapers send it as a Bearer token
+
+# Statistics counters (see backend/stats_counters.py) — rows per counter that writers spread over
+STATS_COUNTER_SHARDS = int(os.getenv('STATS_COUNTER_SHARDS', 16))
+
 API_HOST = '0.0.0.0'
 API_PORT = int(os.getenv('PORT', 5000))
 DEBUG    = os.getenv('DEBUG', 'False') == 'True'
\ No newline at end of file
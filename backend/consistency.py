@@ -8,11 +8,15 @@ Scoring breakdown:
   25% — Name similarity        (Levenshtein distance)
 """
 
-import requests
 import Levenshtein
 import re
+import numpy as np
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein as RFLevenshtein
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+import bio_vectorizer
+from tracing import traced
 
 
 # ── Text Cleaning ──────────────────────────────────────────────────────────────
@@ -97,6 +101,11 @@ def bio_similarity(bio_a: str, bio_b: str) -> float:
     if a == b:
         return 100.0
 
+    # Corpus-level model (transform only) when one has been fitted
+    score = bio_vectorizer.similarity(a, b)
+    if score is not None:
+        return score
+
     try:
         vectorizer = TfidfVectorizer(min_df=1, stop_words='english')
         tfidf      = vectorizer.fit_transform([a, b])
@@ -111,27 +120,14 @@ def bio_similarity(bio_a: str, bio_b: str) -> float:
 
 # ── Profile Fetchers ───────────────────────────────────────────────────────────
 
+@traced('consistency.fetch_github_profile', 'consistency')
 def fetch_github_profile(username: str) -> dict:
-    """Fetch GitHub profile data via public API — no auth needed"""
-    try:
-        res  = requests.get(
-            f'https://api.github.com/users/{username}',
-            headers={'Accept': 'application/json'},
-            timeout=5
-        )
-        if res.status_code == 200:
-            data = res.json()
-            return {
-                'username': data.get('login', ''),
-                'name':     data.get('name', ''),
-                'bio':      data.get('bio', ''),
-                'platform': 'GitHub'
-            }
-    except Exception:
-        pass
-    return {}
+    """Fetch GitHub profile data via public API — cached and revalidated with ETags"""
+    from profile_cache import get_github_profile
+    return get_github_profile(username)
 
 
+@traced('consistency.fetch_google_profile', 'consistency')
 def fetch_google_profile(name: str, email: str = '') -> dict:
     """
     Google doesn't have a public profile API.
@@ -147,6 +143,7 @@ def fetch_google_profile(name: str, email: str = '') -> dict:
 
 # ── Main Consistency Engine ────────────────────────────────────────────────────
 
+@traced('consistency.score', 'consistency')
 def calc_real_consistency_score(
     profile_a: dict,
     profile_b: dict
@@ -169,6 +166,12 @@ def calc_real_consistency_score(
     n_score = name_similarity(profile_a.get('name', ''),     profile_b.get('name', ''))
     b_score = bio_similarity(profile_a.get('bio', ''),       profile_b.get('bio', ''))
 
+    return _build_result(profile_a, profile_b, u_score, n_score, b_score)
+
+
+def _build_result(profile_a, profile_b, u_score, n_score, b_score):
+    """Weight the component scores and assemble the report dict"""
+
     # Weighted total
     total = round(
         (u_score * 0.40) +
@@ -199,6 +202,159 @@ def calc_real_consistency_score(
     }
 
 
+# ── Batch Scoring ──────────────────────────────────────────────────────────────
+#
+# Same scores as the single-pair functions above, computed for N pairs at once:
+# RapidFuzz cpdist gives all pairwise edit distances in one C++ call, and bios
+# are scored with the corpus model (bio_vectorizer) when one is loaded, else
+# with one sparse TF-IDF matrix fitted over the whole batch.
+
+def _batch_edit_scores(left: list, right: list) -> list:
+    """Normalized Levenshtein score (0-100) for each (left[i], right[i]) pair"""
+    if not left:
+        return []
+    distances = process.cpdist(left, right, scorer=RFLevenshtein.distance, workers=-1)
+    max_lens  = np.maximum([len(a) for a in left], [len(b) for b in right])
+    scores    = []
+    for a, b, distance, max_len in zip(left, right, distances.tolist(), max_lens.tolist()):
+        if a == b:
+            scores.append(100.0)
+        else:
+            scores.append(round(max(0.0, (1 - distance / max_len) * 100), 2))
+    return scores
+
+
+def batch_username_similarity(usernames_a: list, usernames_b: list) -> list:
+    """Vectorized username_similarity()"""
+    scores = [0.0] * len(usernames_a)
+    idx, left, right = [], [], []
+    for i, (a, b) in enumerate(zip(usernames_a, usernames_b)):
+        if a and b:
+            idx.append(i)
+            left.append(clean_text(a).replace(' ', ''))
+            right.append(clean_text(b).replace(' ', ''))
+    for i, score in zip(idx, _batch_edit_scores(left, right)):
+        scores[i] = score
+    return scores
+
+
+def batch_name_similarity(names_a: list, names_b: list) -> list:
+    """Vectorized name_similarity()"""
+    scores = [50.0] * len(names_a)
+    idx, left, right = [], [], []
+    for i, (a, b) in enumerate(zip(names_a, names_b)):
+        if a and b:
+            idx.append(i)
+            left.append(clean_text(a))
+            right.append(clean_text(b))
+    for i, score in zip(idx, _batch_edit_scores(left, right)):
+        scores[i] = score
+    return scores
+
+
+def _bio_matrix(texts: list):
+    """One L2-normalized TF-IDF row per text — None if the batch has no usable vocabulary"""
+    try:
+        vectorizer = TfidfVectorizer(min_df=1, stop_words='english')
+        return vectorizer.fit_transform(texts)
+    except ValueError:
+        return None
+
+
+def _score_with_corpus_model(pending: list, scores: list) -> list:
+    """
+    Score pairs with the pre-fitted corpus model; returns the pairs it could not
+    score (a bio with no in-vocabulary terms) for the batch-local TF-IDF fit.
+    """
+    matrix = bio_vectorizer.transform([t for _, a, b in pending for t in (a, b)])
+    if matrix is None:
+        return pending
+    rows_a, rows_b = matrix[0::2], matrix[1::2]
+    cosines = np.asarray(rows_a.multiply(rows_b).sum(axis=1)).ravel()
+    usable  = (rows_a.getnnz(axis=1) > 0) & (rows_b.getnnz(axis=1) > 0)
+
+    leftover = []
+    for k, (i, a, b) in enumerate(pending):
+        if usable[k]:
+            scores[i] = round(float(cosines[k]) * 100, 2)
+        else:
+            leftover.append((i, a, b))
+    return leftover
+
+
+def batch_bio_similarity(bios_a: list, bios_b: list) -> list:
+    """Vectorized bio_similarity() — one TF-IDF matrix for every bio in the batch"""
+    scores = []
+    pending = []   # (index, a, b) pairs that need TF-IDF
+    for i, (bio_a, bio_b) in enumerate(zip(bios_a, bios_b)):
+        a, b = clean_text(bio_a), clean_text(bio_b)
+        if not a and not b:
+            scores.append(75.0)
+        elif not a or not b:
+            scores.append(30.0)
+        elif a == b:
+            scores.append(100.0)
+        else:
+            scores.append(None)
+            pending.append((i, a, b))
+
+    if pending and bio_vectorizer.is_loaded():
+        pending = _score_with_corpus_model(pending, scores)
+
+    if not pending:
+        return scores
+
+    texts  = list(dict.fromkeys(t for _, a, b in pending for t in (a, b)))
+    row_of = {text: row for row, text in enumerate(texts)}
+    matrix = _bio_matrix(texts)
+
+    fallback = []
+    if matrix is None:
+        fallback = pending
+    else:
+        rows_a = matrix[[row_of[a] for _, a, _ in pending]]
+        rows_b = matrix[[row_of[b] for _, _, b in pending]]
+        # Rows are L2-normalized, so the row-wise dot product is the cosine similarity
+        cosines = np.asarray(rows_a.multiply(rows_b).sum(axis=1)).ravel()
+        empty_a = rows_a.getnnz(axis=1) == 0
+        empty_b = rows_b.getnnz(axis=1) == 0
+        for k, (i, a, b) in enumerate(pending):
+            if empty_a[k] and empty_b[k]:
+                fallback.append((i, a, b))   # both all stopwords — same fallback as bio_similarity
+            else:
+                scores[i] = round(float(cosines[k]) * 100, 2)
+
+    # Fallback to Levenshtein when TF-IDF has nothing to compare
+    if fallback:
+        idx, left, right = zip(*fallback)
+        for i, score in zip(idx, _batch_edit_scores(list(left), list(right))):
+            scores[i] = score
+    return scores
+
+
+@traced('consistency.score_batch', 'consistency')
+def calc_batch_consistency_scores(pairs: list) -> list:
+    """
+    Score many (profile_a, profile_b) pairs in one pass.
+    Returns one calc_real_consistency_score()-shaped dict per pair, in order.
+    """
+    if not pairs:
+        return []
+
+    def column(side, key):
+        return [str(pair[side].get(key) or '') for pair in pairs]
+
+    u_scores = batch_username_similarity(column(0, 'username'), column(1, 'username'))
+    n_scores = batch_name_similarity(column(0, 'name'), column(1, 'name'))
+    b_scores = batch_bio_similarity(column(0, 'bio'), column(1, 'bio'))
+
+    return [
+        _build_result(profile_a, profile_b, u, n, b)
+        for (profile_a, profile_b), u, n, b in zip(pairs, u_scores, n_scores, b_scores)
+    ]
+
+
+@traced('consistency.check', 'consistency')
 def run_consistency_check(identity_anchor, platform_a, platform_b, profile_data_a=None, profile_data_b=None):
     """
     Main entry point called from routes.
@@ -1,36 +1,426 @@
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from config import DB_CONFIG, DATABASE_URL
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor, execute_values as _execute_values
+from flask import g, has_request_context
+import tracing
+from config import (
+    DB_CONFIG, DATABASE_URL,
+    DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT, DB_POOL_MAX_USES, DB_POOL_PING_AFTER
+)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within the pool timeout"""
+
 
 def get_connection():
+    """Open a new, unpooled connection — prefer execute_query() for normal use"""
+    with tracing.span('db.connect', 'db') as span:
+        try:
+            if DATABASE_URL:
+                return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+            return psycopg2.connect(cursor_factory=RealDictCursor, **DB_CONFIG)
+        except Exception as e:
+            span.fail(e)
+            print(f"DB Error: {e}")
+            return None
+
+
+# ── Connection pool ────────────────────────────────────────────────────────────
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections.
+
+    - Keeps between `minconn` and `maxconn` connections open
+    - Blocks up to `timeout` seconds when every connection is checked out
+    - Health-checks a connection on borrow (cheap status check, plus a
+      SELECT 1 ping if it sat idle longer than `ping_after` seconds)
+    - Recycles a connection after `max_uses` checkouts
+    """
+
+    def __init__(self, minconn, maxconn, timeout, max_uses, ping_after):
+        self.minconn    = minconn
+        self.maxconn    = maxconn
+        self.timeout    = timeout
+        self.max_uses   = max_uses
+        self.ping_after = ping_after
+        self.pid        = os.getpid()
+
+        self._idle   = deque()   # (conn, uses, returned_at)
+        self._in_use = {}        # id(conn) -> uses
+        self._size   = 0
+        self._cond   = threading.Condition()
+
+        self._stats = {
+            'checkouts':      0,
+            'created':        0,
+            'recycled':       0,
+            'discarded':      0,
+            'timeouts':       0,
+            'wait_time_total': 0.0,
+            'wait_time_max':   0.0,
+        }
+
+        for _ in range(minconn):
+            conn = get_connection()
+            if conn:
+                self._size += 1
+                self._stats['created'] += 1
+                self._idle.append((conn, 0, time.monotonic()))
+
+    # ── Checkout / return ─────────────────────────────────────────────────────
+
+    def getconn(self):
+        """Borrow a healthy connection, opening a new one if below maxconn"""
+        started  = time.monotonic()
+        deadline = started + self.timeout
+
+        while True:
+            conn, uses, idle_since = None, 0, None
+            with self._cond:
+                while not self._idle and self._size >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeout(f"No database connection available within {self.timeout}s")
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    conn, uses, idle_since = self._idle.pop()
+                else:
+                    self._size += 1   # reserve the slot, connect outside the lock
+
+            if conn is None:
+                conn = get_connection()
+                if conn is None:
+                    self._release_slot()
+                    return None
+                with self._cond:
+                    self._stats['created'] += 1
+            elif not self._is_healthy(conn, idle_since):
+                self._close(conn)
+                self._release_slot(discarded=True)
+                continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._in_use[id(conn)] = uses
+                self._stats['checkouts']       += 1
+                self._stats['wait_time_total'] += waited
+                self._stats['wait_time_max']    = max(self._stats['wait_time_max'], waited)
+            return conn
+
+    def putconn(self, conn, discard=False):
+        """Return a connection to the pool, closing it if broken or worn out"""
+        with self._cond:
+            uses = self._in_use.pop(id(conn), 0) + 1
+
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard or conn.closed:
+            self._close(conn)
+            self._release_slot(discarded=True)
+            return
+
+        if uses >= self.max_uses:
+            self._close(conn)
+            with self._cond:
+                self._stats['recycled'] += 1
+            self._release_slot()
+            return
+
+        with self._cond:
+            self._idle.append((conn, uses, time.monotonic()))
+            self._cond.notify()
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _is_healthy(self, conn, idle_since):
+        if conn.closed:
+            return False
+        try:
+            if conn.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if idle_since is not None and time.monotonic() - idle_since > self.ping_after:
+                with conn.cursor() as cur:
+                    cur.execute('SELECT 1')
+                conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _release_slot(self, discarded=False):
+        with self._cond:
+            self._size -= 1
+            if discarded:
+                self._stats['discarded'] += 1
+            self._cond.notify()
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close on return)"""
+        with self._cond:
+            while self._idle:
+                conn, _, _ = self._idle.pop()
+                self._close(conn)
+                self._size -= 1
+
+    def metrics(self):
+        """Snapshot of pool state for health checks and dashboards"""
+        with self._cond:
+            checkouts = self._stats['checkouts']
+            return {
+                'size':              self._size,
+                'in_use':            len(self._in_use),
+                'idle':              len(self._idle),
+                'min_size':          self.minconn,
+                'max_size':          self.maxconn,
+                'checkouts':         checkouts,
+                'created':           self._stats['created'],
+                'recycled':          self._stats['recycled'],
+                'discarded':         self._stats['discarded'],
+                'timeouts':          self._stats['timeouts'],
+                'wait_time_avg_ms':  round(self._stats['wait_time_total'] / checkouts * 1000, 3) if checkouts else 0.0,
+                'wait_time_max_ms':  round(self._stats['wait_time_max'] * 1000, 3),
+            }
+
+
+_pool      = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return this process's pool, creating it lazily (and again after a gunicorn fork)"""
+    global _pool
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = ConnectionPool(DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT, DB_POOL_MAX_USES, DB_POOL_PING_AFTER)
+        return _pool
+
+def pool_metrics():
+    return get_pool().metrics()
+
+
+# ── Unit of work ───────────────────────────────────────────────────────────────
+
+class UnitOfWork:
+    """One connection and one transaction shared by every statement inside transaction()"""
+
+    def __init__(self, conn):
+        self.conn   = conn
+        self.failed = conn is None
+        self.error  = None if conn else "Database connection failed"
+
+    def abort(self, error=None):
+        """Mark the unit of work for rollback without raising"""
+        self.failed = True
+        self.error  = self.error or error
+
+
+_local = threading.local()
+
+def current_transaction():
+    """The active unit of work — bound to the Flask request, or the thread outside one"""
+    if has_request_context():
+        return g.get('_db_uow')
+    return getattr(_local, 'uow', None)
+
+def _set_transaction(uow):
+    if has_request_context():
+        g._db_uow = uow
+    else:
+        _local.uow = uow
+
+@contextmanager
+def transaction():
+    """
+    Run every execute_query() in the block on one pooled connection and commit
+    once on exit. Nested calls join the outer unit of work. A failed statement
+    (or tx.abort()) rolls the whole block back; check tx.error afterwards.
+    """
+    outer = current_transaction()
+    if outer is not None:
+        yield outer
+        return
+
+    pool = get_pool()
     try:
-        if DATABASE_URL:
-            return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
-        return psycopg2.connect(**DB_CONFIG)
-    except Exception as e:
-        print(f"DB Error: {e}")
-        return None
+        conn = pool.getconn()
+    except PoolTimeout as e:
+        conn = None
+        uow  = UnitOfWork(None)
+        uow.error = str(e)
+    else:
+        uow = UnitOfWork(conn)
 
-def execute_query(query, params=None, fetchone=False, commit=False):
-    conn = get_connection()
+    _set_transaction(uow)
+    broken = False
+    try:
+        yield uow
+        if conn is not None:
+            if uow.failed:
+                conn.rollback()
+            else:
+                try:
+                    conn.commit()
+                except Exception as e:
+                    uow.abort(str(e))
+                    conn.rollback()
+    except Exception:
+        if conn is not None:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+        raise
+    finally:
+        _set_transaction(None)
+        if conn is not None:
+            broken = broken or conn.closed != 0
+            pool.putconn(conn, discard=broken)
+
+def end_request_transaction(exc=None):
+    """Flask teardown hook — roll back a unit of work left open by a failed request"""
+    uow = g.pop('_db_uow', None)
+    if uow is not None and uow.conn is not None:
+        try:
+            uow.conn.rollback()
+        except Exception:
+            pass
+        get_pool().putconn(uow.conn, discard=uow.conn.closed != 0)
+
+
+# ── Query helpers ──────────────────────────────────────────────────────────────
+
+def _run(conn, query, params, fetchone, commit):
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute(query, params)
+    result = None
+    if fetchone:
+        result = cur.fetchone()
+    elif not commit:
+        result = cur.fetchall()
+    elif 'RETURNING' in query:
+        result = cur.fetchone()
+    tracing.annotate(**{'db.rows': cur.rowcount})
+    cur.close()
+    return result
+
+def _execute(runner, commit):
+    """Run runner(conn) inside the active unit of work, or on its own pooled connection"""
+    uow = current_transaction()
+    if uow is not None:
+        # Inside transaction(): share its connection, let it commit once on exit
+        if uow.failed:
+            return None, uow.error or "Transaction aborted"
+        try:
+            return runner(uow.conn), None
+        except Exception as e:
+            uow.abort(str(e))
+            return None, str(e)
+
+    pool = get_pool()
+    try:
+        conn = pool.getconn()
+    except PoolTimeout as e:
+        return None, str(e)
     if not conn:
         return None, "Database connection failed"
+    broken = False
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(query, params)
-        result = None
-        if fetchone:
-            result = cur.fetchone()
-        elif not commit:
-            result = cur.fetchall()
+        result = runner(conn)
         if commit:
             conn.commit()
-            if not result:
-                result = cur.fetchone() if 'RETURNING' in query else None
-        cur.close()
-        conn.close()
         return result, None
     except Exception as e:
-        if conn:
+        broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
+        return None, str(e)
+    finally:
+        pool.putconn(conn, discard=broken)
+
+def execute_query(query, params=None, fetchone=False, commit=False):
+    with tracing.sql_span(query) as span:
+        result, error = _execute(lambda conn: _run(conn, query, params, fetchone, commit), commit)
+        if error:
+            span.fail(error)
+        return result, error
+
+def execute_values(query, rows, template=None, fetch=False):
+    """
+    Multi-row INSERT in a single statement — query has one VALUES %s placeholder.
+    Returns (rows, error); with fetch=True the RETURNING rows are returned.
+    """
+    def runner(conn):
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        result = _execute_values(cur, query, rows, template=template, page_size=max(len(rows), 1), fetch=fetch)
+        tracing.annotate(**{'db.rows': cur.rowcount})
+        cur.close()
+        return result
+    if not rows:
+        return [], None
+    with tracing.sql_span(query, 'db.execute_values') as span:
+        result, error = _execute(runner, commit=True)
+        if error:
+            span.fail(error)
+        return result, error
+
+def stream_query(query, params=None, batch_size=1000, name=None, dict_rows=True):
+    """
+    Yield result rows in batches (lists) from a server-side named cursor, so
+    only `batch_size` rows are ever held in memory. Holds one pooled connection
+    (in a read-only transaction) until the generator is exhausted or closed.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    broken = False
+    try:
+        conn.set_session(readonly=True)
+        cur = conn.cursor(name=name or f'stream_{os.getpid()}_{threading.get_ident()}_{id(conn)}',
+                          cursor_factory=RealDictCursor if dict_rows else extensions.cursor)
+        cur.itersize = batch_size
+        with tracing.sql_span(query, 'db.stream'):
+            cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+        cur.close()
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        try:
             conn.rollback()
-        return None, str(e)
\ No newline at end of file
+            conn.set_session(readonly=False)
+        except Exception:
+            broken = True
+        pool.putconn(conn, discard=broken)
+
+def health_check():
+    """Borrow a pooled connection and ping it — returns (ok, pool metrics)"""
+    result, error = execute_query('SELECT 1 AS ok', fetchone=True)
+    return bool(result) and not error, pool_metrics()
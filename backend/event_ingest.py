@@ -0,0 +1,254 @@
+"""
+High-volume reputation event ingestion.
+
+ReputationEvent.create() inserts one event and runs one trust-score UPDATE per
+event, so a partner replaying a burst for one anchor serialises every event on
+that anchor's row lock and pays a commit each. write_batch() instead handles
+many events in one transaction:
+
+  1. the anchors with a score impact are locked FOR NO KEY UPDATE once, in
+     anchor order, before anything else (the event INSERT takes KEY SHARE on
+     them; taking the row lock afterwards would deadlock concurrent batches)
+  2. one multi-row INSERT for all the events (execute_values)
+  3. the score deltas are replayed per anchor in memory, clamping to [0, 100]
+     and rounding half away from zero to 2 places after every event, as
+     Postgres does when one-by-one updates store into NUMERIC(5,2)
+  4. one UPDATE sets every touched anchor's final score, and the changes go
+     to trust_score_history and the stats counters in bulk
+
+EVENT_INGEST_DURABILITY chooses when a request's events are committed:
+
+  sync   the request writes its own batch before responding
+  group  events join a shared buffer; the request waits until the flush that
+         contains them commits (group commit — many requests, one transaction)
+  async  events join the buffer and the request returns 202 straight away;
+         up to EVENT_FLUSH_INTERVAL seconds of events can be lost on a crash
+
+The buffer is flushed every EVENT_FLUSH_INTERVAL seconds, or as soon as it
+holds EVENT_FLUSH_MAX events.
+"""
+
+import atexit
+import os
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from decimal import Decimal, ROUND_HALF_UP
+
+from database import execute_query, execute_values, transaction
+import stats_counters
+from config import EVENT_INGEST_DURABILITY, EVENT_FLUSH_INTERVAL, EVENT_FLUSH_MAX, EVENT_FLUSH_TIMEOUT
+
+DURABILITY_MODES = ('sync', 'group', 'async')
+
+# A failed async flush is retried this many times before its events are dropped
+MAX_FLUSH_ATTEMPTS = 3
+
+CENT = Decimal('0.01')
+
+
+def _clamp(score):
+    return min(max(score, Decimal(0)), Decimal(100))
+
+
+# ── Batch writer ───────────────────────────────────────────────────────────────
+
+def write_batch(events):
+    """
+    Insert events and apply their score impacts in one transaction. Each event
+    is a dict with anchor_id, event_type, platform and score_impact.
+    Returns (inserted event rows, error).
+    """
+    if not events:
+        return [], None
+
+    impacts = [e for e in events if e.get('score_impact')]
+    anchors = sorted({e['anchor_id'] for e in impacts})
+
+    with transaction() as tx:
+        locked = []
+        if anchors:
+            locked, error = execute_query(
+                """
+                SELECT anchor_id, trust_score FROM identity_anchors
+                WHERE anchor_id = ANY(%s)
+                ORDER BY anchor_id
+                FOR NO KEY UPDATE
+                """,
+                (anchors,)
+            )
+            if error:
+                return None, error
+
+        rows, error = execute_values(
+            """
+            INSERT INTO reputation_events (anchor_id, event_type, platform)
+            VALUES %s
+            RETURNING event_id, anchor_id, event_type, platform, time_stamp
+            """,
+            [(e['anchor_id'], e['event_type'], e.get('platform') or None) for e in events],
+            fetch=True
+        )
+        if error:
+            return None, error
+
+        if anchors:
+            before  = {row['anchor_id']: row['trust_score'] for row in locked}
+            scores  = dict(before)
+            history = []
+            for event in impacts:
+                old = scores[event['anchor_id']]
+                new = _clamp(old + Decimal(str(event['score_impact']))).quantize(CENT, rounding=ROUND_HALF_UP)
+                if new != old:
+                    history.append((event['anchor_id'], old, new, event['event_type']))
+                scores[event['anchor_id']] = new
+
+            changed = [(anchor_id, score) for anchor_id, score in sorted(scores.items()) if score != before[anchor_id]]
+            if changed:
+                execute_values(
+                    """
+                    UPDATE identity_anchors a SET trust_score = v.trust_score
+                    FROM (VALUES %s) AS v(anchor_id, trust_score)
+                    WHERE a.anchor_id = v.anchor_id
+                    """,
+                    changed,
+                    template='(%s, %s::numeric)'
+                )
+                execute_values(
+                    "INSERT INTO trust_score_history (anchor_id, old_score, new_score, reason) VALUES %s",
+                    history
+                )
+                stats_counters.bump(trust_score_sum=sum(score - before[anchor_id] for anchor_id, score in changed))
+
+    if tx.error:
+        return None, tx.error
+    return rows, None
+
+
+# ── Buffered writer ────────────────────────────────────────────────────────────
+
+class EventBuffer:
+    """Per-process queue of events, flushed by a background thread"""
+
+    def __init__(self, interval, max_events):
+        self.interval   = interval
+        self.max_events = max_events
+        self.pid        = os.getpid()
+        self._pending   = []      # (event, future or None, attempts)
+        self._cond      = threading.Condition()
+        self._flush     = threading.Lock()   # one flush at a time
+        self._thread    = None
+        self.stats      = {'flushes': 0, 'events': 0, 'failures': 0, 'dropped': 0}
+
+    def submit(self, events, wait=False):
+        """Queue events; with wait=True returns a Future resolved when they are committed"""
+        future = Future() if wait else None
+        with self._cond:
+            self._pending.extend((event, future, 0) for event in events)
+            if len(self._pending) >= self.max_events:
+                self._cond.notify()
+        self._ensure_thread()
+        return future
+
+    def flush(self):
+        """Write everything queued so far in one batch"""
+        with self._flush:
+            with self._cond:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            rows, error = write_batch([event for event, _, _ in batch])
+            futures = {id(f): f for _, f, _ in batch if f is not None}
+            if error:
+                self.stats['failures'] += 1
+                retry = [(event, None, attempts + 1) for event, f, attempts in batch
+                         if f is None and attempts + 1 < MAX_FLUSH_ATTEMPTS]
+                self.stats['dropped'] += sum(1 for _, f, _ in batch if f is None) - len(retry)
+                with self._cond:
+                    self._pending[:0] = retry
+                for future in futures.values():
+                    future.set_exception(RuntimeError(error))
+                print(f"Event flush failed ({len(batch)} events): {error}")
+                return 0
+
+            self.stats['flushes'] += 1
+            self.stats['events']  += len(rows)
+            for future in futures.values():
+                future.set_result(len(rows))
+            return len(rows)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._pending) < self.max_events:
+                    self._cond.wait(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Event flusher error: {e}")
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._cond:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='event-flusher', daemon=True)
+                    self._thread.start()
+
+    def depth(self):
+        with self._cond:
+            return len(self._pending)
+
+
+_buffer      = None
+_buffer_lock = threading.Lock()
+
+def get_buffer() -> EventBuffer:
+    """This process's buffer — recreated after a gunicorn fork"""
+    global _buffer
+    buffer = _buffer
+    if buffer is not None and buffer.pid == os.getpid():
+        return buffer
+    with _buffer_lock:
+        if _buffer is None or _buffer.pid != os.getpid():
+            _buffer = EventBuffer(EVENT_FLUSH_INTERVAL, EVENT_FLUSH_MAX)
+        return _buffer
+
+
+@atexit.register
+def _flush_on_exit():
+    if _buffer is not None and _buffer.pid == os.getpid():
+        _buffer.flush()
+
+
+# ── Entry point ────────────────────────────────────────────────────────────────
+
+def ingest(events, durability=None):
+    """
+    Ingest validated events under a durability mode (default EVENT_INGEST_DURABILITY).
+    Returns (result, error): result has 'committed' plus the event rows in sync mode.
+    """
+    durability = durability or EVENT_INGEST_DURABILITY
+    if durability not in DURABILITY_MODES:
+        return None, f"Unknown durability mode: {durability}"
+
+    if durability == 'sync':
+        rows, error = write_batch(events)
+        if error:
+            return None, error
+        return {'committed': True, 'events': rows, 'count': len(rows)}, None
+
+    future = get_buffer().submit(events, wait=durability == 'group')
+    if future is None:
+        return {'committed': False, 'count': len(events)}, None
+    try:
+        future.result(timeout=EVENT_FLUSH_TIMEOUT)
+    except FutureTimeout:
+        return None, "Timed out waiting for the event flush"
+    except RuntimeError as e:
+        return None, str(e)
+    return {'committed': True, 'count': len(events)}, None
+
+
+def stats() -> dict:
+    buffer = get_buffer()
+    return {'durability': EVENT_INGEST_DURABILITY, 'pending': buffer.depth(), **buffer.stats}
@@ -0,0 +1,163 @@
+"""
+Streaming identity exports.
+
+export_identity() builds one JSON blob in memory, and there was no way to
+export more than one identity per request. This module streams exports of:
+
+  scope='anchor'  one identity            (anchor_id)
+  scope='user'    every identity of a user (user_id)
+  scope='all'     the whole table
+
+Rows come from a server-side named cursor (database.stream_query) fetched
+EXPORT_FETCH_SIZE at a time, so memory stays flat whatever the size. Each
+identity is followed by its verifications and events:
+
+  ndjson  one JSON object per line, tagged with "record": identity |
+          verification | event — built by Postgres, written out as-is
+  csv     one header row, then the same records flattened into CSV_COLUMNS
+
+With gzip=True the stream is compressed on the fly (one zlib stream, gzip
+framing), flushed once per fetched batch.
+"""
+
+import csv
+import io
+import zlib
+
+from database import stream_query
+from config import EXPORT_FETCH_SIZE
+from utils import CLAIM_TIMESTAMP_SQL
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv':    'text/csv',
+}
+
+SCOPES = ('anchor', 'user', 'all')
+
+CSV_COLUMNS = (
+    'record', 'anchor_id', 'record_id', 'user_id', 'public_key', 'trust_score',
+    'platform', 'profile_url', 'event_type', 'signature', 'tx_hash', 'timestamp',
+)
+
+# One UNION ALL, ordered so every identity is followed by its own records.
+# {where_i} / {where_r} filter identity_anchors / the child tables by scope.
+_NDJSON_QUERY = f"""
+    SELECT anchor_id, 0 AS kind, anchor_id AS record_id,
+           json_build_object(
+               'record', 'identity', 'anchor_id', anchor_id, 'user_id', user_id,
+               'user_pub_key', user_pub_key, 'public_key_b64', public_key_b64,
+               'trust_score', trust_score, 'created_at', to_char(created_at, '{CLAIM_TIMESTAMP_SQL}')
+           )::text AS line
+    FROM identity_anchors i WHERE {{where_i}}
+    UNION ALL
+    SELECT v.anchor_id, 1, v.verification_id,
+           json_build_object(
+               'record', 'verification', 'anchor_id', v.anchor_id, 'verification_id', v.verification_id,
+               'platform_name', v.platform_name, 'profile_url', v.profile_url,
+               'signature', v.signature, 'signed_at', to_char(v.signed_at, '{CLAIM_TIMESTAMP_SQL}'),
+               'verified_at', to_char(v.verified_at, '{CLAIM_TIMESTAMP_SQL}'), 'tx_hash', v.tx_hash
+           )::text
+    FROM platform_verifications v JOIN identity_anchors i ON i.anchor_id = v.anchor_id WHERE {{where_i}}
+    UNION ALL
+    SELECT e.anchor_id, 2, e.event_id,
+           json_build_object(
+               'record', 'event', 'anchor_id', e.anchor_id, 'event_id', e.event_id,
+               'event_type', e.event_type, 'platform', e.platform,
+               'time_stamp', to_char(e.time_stamp, '{CLAIM_TIMESTAMP_SQL}')
+           )::text
+    FROM reputation_events e JOIN identity_anchors i ON i.anchor_id = e.anchor_id WHERE {{where_i}}
+    ORDER BY anchor_id, kind, record_id
+"""
+
+_CSV_QUERY = f"""
+    SELECT 'identity' AS record, anchor_id, anchor_id AS record_id, user_id, user_pub_key AS public_key,
+           trust_score, NULL AS platform, NULL AS profile_url, NULL AS event_type,
+           NULL AS signature, NULL AS tx_hash, to_char(created_at, '{CLAIM_TIMESTAMP_SQL}') AS timestamp, 0 AS kind
+    FROM identity_anchors i WHERE {{where_i}}
+    UNION ALL
+    SELECT 'verification', v.anchor_id, v.verification_id, NULL, NULL, NULL, v.platform_name, v.profile_url,
+           NULL, v.signature, v.tx_hash, to_char(v.verified_at, '{CLAIM_TIMESTAMP_SQL}'), 1
+    FROM platform_verifications v JOIN identity_anchors i ON i.anchor_id = v.anchor_id WHERE {{where_i}}
+    UNION ALL
+    SELECT 'event', e.anchor_id, e.event_id, NULL, NULL, NULL, e.platform, NULL,
+           e.event_type, NULL, NULL, to_char(e.time_stamp, '{CLAIM_TIMESTAMP_SQL}'), 2
+    FROM reputation_events e JOIN identity_anchors i ON i.anchor_id = e.anchor_id WHERE {{where_i}}
+    ORDER BY anchor_id, kind, record_id
+"""
+
+
+def _scope_filter(scope, anchor_id=None, user_id=None):
+    """(WHERE clause on identity_anchors i, params for one use of it)"""
+    if scope == 'anchor':
+        return 'i.anchor_id = %s', [anchor_id]
+    if scope == 'user':
+        return 'i.user_id = %s', [user_id]
+    return 'TRUE', []
+
+
+def _query(fmt, scope, anchor_id, user_id):
+    where, params = _scope_filter(scope, anchor_id, user_id)
+    template = _NDJSON_QUERY if fmt == 'ndjson' else _CSV_QUERY
+    return template.format(where_i=where), params * 3   # the filter appears once per UNION branch
+
+
+def _ndjson_chunks(batches):
+    for rows in batches:
+        yield ''.join(row[3] + '\n' for row in rows).encode('utf-8')
+
+
+def _csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for rows in batches:
+        writer.writerows(row[:len(CSV_COLUMNS)] for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a byte-chunk stream into one gzip member as it goes"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)   # wbits 31 = gzip header/trailer
+    for chunk in chunks:
+        out = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def prefetch(chunks):
+    """
+    Run a chunk generator up to its first chunk now, so the query executes
+    (and a PoolTimeout or SQL error is raised) while an error response can
+    still be sent. Returns a generator of every chunk.
+    """
+    try:
+        first = next(chunks)
+    except StopIteration:
+        return iter(())
+
+    def resume():
+        try:
+            yield first
+            yield from chunks
+        finally:
+            chunks.close()   # client went away — give the connection back now
+    return resume()
+
+
+def stream_export(fmt, scope, anchor_id=None, user_id=None, gzip=False, batch_size=EXPORT_FETCH_SIZE):
+    """Generator of encoded export bytes; nothing is fetched until it is iterated"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if scope not in SCOPES:
+        raise ValueError(f"Unsupported export scope: {scope}")
+
+    query, params = _query(fmt, scope, anchor_id, user_id)
+    batches = stream_query(query, params, batch_size=batch_size, name=f'export_{scope}', dict_rows=False)
+    chunks  = _ndjson_chunks(batches) if fmt == 'ndjson' else _csv_chunks(batches)
+    return gzip_chunks(chunks) if gzip else chunks
@@ -0,0 +1,151 @@
+"""
+Reservoir of ready-made identity keypairs.
+
+Identity.create used to run utils.generate_keypair() inline on every
+POST /api/identity — Ed25519 key generation plus a Fernet encrypt before the
+insert. A background thread now keeps up to KEYPOOL_SIZE keypairs generated
+ahead of time, and the request path just pops one:
+
+  - entries are exactly what generate_keypair() returns (hex, base64, Fernet
+    token); the private key only exists in plaintext inside that call, so the
+    pool never holds unencrypted key material
+  - the refiller wakes when depth drops below KEYPOOL_LOW_WATER (or every
+    KEYPOOL_REFILL_INTERVAL seconds) and tops the pool back up
+  - an empty pool is never an error: take() falls back to generating inline
+    and counts a miss
+  - refill() tops up synchronously, e.g. before a bulk import
+
+stats() reports depth, hits/misses and the recent refill rate for /api/health.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from config import KEYPOOL_ENABLED, KEYPOOL_SIZE, KEYPOOL_LOW_WATER, KEYPOOL_REFILL_INTERVAL
+
+
+class KeyPool:
+    """Bounded FIFO of encrypted keypairs with a background refiller"""
+
+    def __init__(self, size, low_water):
+        self.size      = size
+        self.low_water = low_water
+        self.pid       = os.getpid()
+        self._keys     = deque()
+        self._lock     = threading.Lock()
+        self._wake     = threading.Event()
+        self._thread   = None
+        self._times    = deque(maxlen=256)   # generation timestamps, for the refill rate
+        self.hits      = 0
+        self.misses    = 0
+        self.generated = 0
+
+    def _generate(self):
+        from utils import generate_keypair
+        keypair = generate_keypair()
+        with self._lock:
+            self.generated += 1
+            self._times.append(time.monotonic())
+        return keypair
+
+    def take(self):
+        """(public_key_hex, public_key_b64, private_key_enc) — pooled if available"""
+        with self._lock:
+            keypair = self._keys.popleft() if self._keys else None
+            if keypair is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            low = len(self._keys) < self.low_water
+        if low:
+            self._wake.set()
+        return keypair if keypair is not None else self._generate()
+
+    def refill(self, target=None) -> int:
+        """Generate keypairs until the pool holds `target` (default: full). Returns how many were added."""
+        target = min(target or self.size, self.size)
+        added  = 0
+        while True:
+            with self._lock:
+                if len(self._keys) >= target:
+                    return added
+            keypair = self._generate()
+            with self._lock:
+                if len(self._keys) >= self.size:
+                    return added
+                self._keys.append(keypair)
+            added += 1
+
+    def _run(self, interval):
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            try:
+                self.refill()
+            except Exception as e:
+                print(f"Keypool refill failed: {e}")
+
+    def start(self, interval=KEYPOOL_REFILL_INTERVAL):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(interval,), name='keypool-refill', daemon=True)
+            self._thread.start()
+            self._wake.set()   # fill straight away
+        return self._thread
+
+    def refill_rate(self) -> float:
+        """Keypairs generated per second over the recent generation window"""
+        with self._lock:
+            if len(self._times) < 2:
+                return 0.0
+            span = self._times[-1] - self._times[0]
+            return round((len(self._times) - 1) / span, 1) if span > 0 else 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            depth = len(self._keys)
+        return {
+            'enabled':     True,
+            'depth':       depth,
+            'capacity':    self.size,
+            'low_water':   self.low_water,
+            'hits':        self.hits,
+            'misses':      self.misses,
+            'generated':   self.generated,
+            'refill_rate': self.refill_rate(),
+        }
+
+
+_pool      = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> KeyPool:
+    """This process's pool — recreated after a gunicorn fork so keys are never shared between workers"""
+    global _pool
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = KeyPool(KEYPOOL_SIZE, KEYPOOL_LOW_WATER)
+            if KEYPOOL_ENABLED:
+                _pool.start()
+        return _pool
+
+
+def take_keypair():
+    if not KEYPOOL_ENABLED:
+        from utils import generate_keypair
+        return generate_keypair()
+    return get_pool().take()
+
+def refill(target=None) -> int:
+    return get_pool().refill(target) if KEYPOOL_ENABLED else 0
+
+def start():
+    """Create this process's pool and start its refiller"""
+    return get_pool() if KEYPOOL_ENABLED else None
+
+def stats() -> dict:
+    return get_pool().stats() if KEYPOOL_ENABLED else {'enabled': False}
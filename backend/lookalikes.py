@@ -0,0 +1,257 @@
+"""
+Lookalike-username index.
+
+username_similarity() compares two usernames someone already has in hand; to
+ask "which connected accounts are within k edits of this name?" it would have
+to be run against every oauth_verifications row. This module keeps an
+in-memory index over every normalised username (clean_text, spaces removed —
+the same normalisation username_similarity uses) that answers that in a few
+dictionary lookups.
+
+The index is a PassJoin-style segment index. With K = LOOKALIKE_MAX_DISTANCE,
+every name of length L is cut into K + 1 fixed segments, and each
+(L, segment number, segment text) key maps to the names containing it. K edits
+can break at most K segments, so any name within k <= K edits of a query
+shares at least one segment with it, at a position shifted by at most k. A
+query looks up those few keys for the lengths |q| - k .. |q| + k, then checks
+the candidates with RapidFuzz's Levenshtein distance (score_cutoff stops early).
+Names shorter than K + 1 characters have empty segments. They are kept in
+per-length lists and compared directly.
+
+The index is loaded in a background thread at startup. Accounts connected in
+this process are added straight away. Accounts connected by other workers are
+picked up by a poller every LOOKALIKE_POLL_INTERVAL seconds.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+from rapidfuzz.distance import Levenshtein
+
+from database import execute_query, stream_query
+from consistency import clean_text
+from config import LOOKALIKE_ENABLED, LOOKALIKE_MAX_DISTANCE, LOOKALIKE_POLL_INTERVAL
+
+# The poller re-reads this many ids below its high-water mark, so rows whose
+# sequence value was taken before a later row's but committed after it are not
+# missed (re-adding a known row is a no-op)
+POLL_OVERLAP = 1000
+POLL_BATCH   = 10000
+
+ACCOUNTS_QUERY = """
+    SELECT id, anchor_id, platform, platform_username
+    FROM oauth_verifications
+    WHERE platform_username IS NOT NULL AND id > %s
+    ORDER BY id
+"""
+
+
+def normalise(username) -> str:
+    return clean_text(username or '').replace(' ', '')
+
+
+@lru_cache(maxsize=256)
+def _segments(length, parts):
+    """(number, start, size) of the `parts` segments of a name of `length` — the last ones are one longer"""
+    base, extra = divmod(length, parts)
+    out, start = [], 0
+    for number in range(parts):
+        size = base + (1 if number >= parts - extra else 0)
+        out.append((number, start, size))
+        start += size
+    return tuple(out)
+
+
+class LookalikeIndex:
+    def __init__(self, max_distance=LOOKALIKE_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.parts        = max_distance + 1
+        self.pid          = os.getpid()
+        self.ready        = False
+        self.last_id      = 0
+        self._segments    = defaultdict(set)    # (length, number, text) -> names
+        self._short       = defaultdict(set)    # length -> names shorter than `parts`
+        self._accounts    = {}                  # name -> {oauth id: account}
+        self._lock        = threading.Lock()
+        self._thread      = None
+
+    def __len__(self):
+        return len(self._accounts)
+
+    # ── Updates ────────────────────────────────────────────────────────────────
+
+    def add(self, account):
+        """Index one account (a dict with id, anchor_id, platform and platform_username)"""
+        name = normalise(account.get('platform_username'))
+        if not name:
+            return
+        with self._lock:
+            accounts = self._accounts.get(name)
+            if accounts is None:
+                accounts = self._accounts[name] = {}
+                self._insert(name)
+            accounts[account['id']] = {
+                'id':                account['id'],
+                'anchor_id':         account.get('anchor_id'),
+                'platform':          account.get('platform'),
+                'platform_username': account.get('platform_username'),
+            }
+
+    def _insert(self, name):
+        length = len(name)
+        if length < self.parts:
+            self._short[length].add(name)
+            return
+        for number, start, size in _segments(length, self.parts):
+            self._segments[(length, number, name[start:start + size])].add(name)
+
+    def add_many(self, accounts):
+        count = 0
+        for account in accounts:
+            self.add(account)
+            self.last_id = max(self.last_id, account['id'])
+            count += 1
+        return count
+
+    # ── Queries ────────────────────────────────────────────────────────────────
+
+    def candidates(self, name, k):
+        """Names that may be within k edits of `name` — a superset of the matches"""
+        n, found = len(name), set()
+        for length in range(max(0, n - k), n + k + 1):
+            if length < self.parts:
+                found |= self._short.get(length, set())
+                continue
+            for number, start, size in _segments(length, self.parts):
+                for pos in range(max(0, start - k), min(n - size, start + k) + 1):
+                    names = self._segments.get((length, number, name[pos:pos + size]))
+                    if names:
+                        found |= names
+        return found
+
+    def query(self, username, k=None, limit=50):
+        """
+        Indexed usernames within k edits of `username` (k defaults to, and may
+        not exceed, max_distance), closest first, each with its accounts.
+        """
+        k    = self.max_distance if k is None else k
+        name = normalise(username)
+        if k < 0 or k > self.max_distance:
+            raise ValueError(f'max_distance must be between 0 and {self.max_distance}')
+        if not name:
+            return []
+
+        with self._lock:
+            matches = []
+            for candidate in self.candidates(name, k):
+                distance = Levenshtein.distance(name, candidate, score_cutoff=k)
+                if distance <= k:
+                    matches.append((distance, candidate, list(self._accounts[candidate].values())))
+        matches.sort(key=lambda m: (m[0], m[1]))
+        return [{'username': candidate, 'distance': distance, 'accounts': accounts}
+                for distance, candidate, accounts in matches[:limit]]
+
+    # ── Loading ────────────────────────────────────────────────────────────────
+
+    def load(self):
+        """Index every connected account. Returns the number of rows read."""
+        started = time.perf_counter()
+        count   = 0
+        for rows in stream_query(ACCOUNTS_QUERY, (0,), batch_size=POLL_BATCH, name=f'lookalikes_{os.getpid()}'):
+            count += self.add_many(rows)
+        self.ready = True
+        print(f"Lookalike index: {len(self)} usernames from {count} accounts "
+              f"in {time.perf_counter() - started:.1f}s")
+        return count
+
+    def poll(self):
+        """Index accounts connected since the last load/poll (e.g. by other workers)"""
+        count = 0
+        while True:
+            rows, error = execute_query(
+                ACCOUNTS_QUERY + f" LIMIT {POLL_BATCH}",
+                (max(0, self.last_id - POLL_OVERLAP) if count == 0 else self.last_id,)
+            )
+            if error:
+                print(f"Lookalike index poll failed: {error}")
+                return count
+            count += self.add_many(rows or [])
+            if not rows or len(rows) < POLL_BATCH:
+                return count
+
+    def start(self, interval=LOOKALIKE_POLL_INTERVAL):
+        """Load in the background, then poll every `interval` seconds (interval <= 0: load only)"""
+        if self._thread is not None:
+            return self._thread
+
+        def run():
+            while not self.ready:
+                try:
+                    self.load()
+                except Exception as e:
+                    print(f"Lookalike index load failed: {e}")
+                    time.sleep(max(interval, 5))
+            while interval > 0:
+                time.sleep(interval)
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"Lookalike index poll failed: {e}")
+
+        self._thread = threading.Thread(target=run, name='lookalike-index', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stats(self):
+        return {
+            'ready':        self.ready,
+            'usernames':    len(self),
+            'keys':         len(self._segments),
+            'max_distance': self.max_distance,
+            'last_id':      self.last_id,
+        }
+
+
+_index      = None
+_index_lock = threading.Lock()
+
+def get_index() -> LookalikeIndex:
+    """This process's index — a forked worker keeps the inherited names but gets its own lock and poller"""
+    global _index
+    index = _index
+    if index is not None and index.pid == os.getpid():
+        return index
+    with _index_lock:
+        if _index is None:
+            _index = LookalikeIndex()
+        elif _index.pid != os.getpid():
+            _index.pid, _index._lock, _index._thread = os.getpid(), threading.Lock(), None
+            if LOOKALIKE_ENABLED:
+                _index.start()
+        return _index
+
+
+def start():
+    if not LOOKALIKE_ENABLED:
+        return None
+    return get_index().start()
+
+
+def add(account):
+    if LOOKALIKE_ENABLED:
+        get_index().add(account)
+
+
+def find(username, k=None, limit=50):
+    """Matches for `username`, or None while the index is disabled or still loading"""
+    index = get_index()
+    if not LOOKALIKE_ENABLED or not index.ready:
+        return None
+    return index.query(username, k, limit)
+
+
+def stats() -> dict:
+    return {'enabled': LOOKALIKE_ENABLED, **get_index().stats()}
@@ -0,0 +1,75 @@
+"""
+Size-bounded, thread-safe LRU shared by the in-process caches (JWT claims,
+signing keys, QR renderings, GitHub profiles, bio TF-IDF vectors).
+
+Entries can expire in two ways, both optional:
+
+  - ttl: every entry expires `ttl` seconds after it was put
+  - put(key, value, expires_at=t): that entry expires at Unix time t (e.g. a
+    JWT's exp)
+
+Expired entries count as misses and are dropped when looked up, or all at
+once by prune(). hits and misses are read by metrics.register_cache.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl     = ttl
+        self._data   = OrderedDict()   # key -> (value, monotonic deadline or None)
+        self._lock   = threading.Lock()
+        self.hits    = 0
+        self.misses  = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, expires_at=None):
+        now      = time.monotonic()
+        deadline = None if self.ttl is None else now + self.ttl
+        if expires_at is not None:
+            # Wall-clock deadline -> monotonic, so clock steps don't matter afterwards
+            expiry   = now + (expires_at - time.time())
+            deadline = expiry if deadline is None else min(deadline, expiry)
+        with self._lock:
+            self._data[key] = (value, deadline)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def prune(self):
+        """Drop every expired entry, not just the ones that get looked up again"""
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, (_, deadline) in self._data.items() if deadline is not None and deadline <= now]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses}
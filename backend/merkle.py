@@ -0,0 +1,49 @@
+"""
+Merkle trees over 32-byte verification hashes.
+
+Pairs are hashed in sorted order — sha256(min(a, b) + max(a, b)) — so an
+inclusion proof is just the list of sibling hashes, with no left/right flags.
+A node without a sibling is promoted to the next level unchanged.
+"""
+
+import hashlib
+
+
+def _hash_pair(a: bytes, b: bytes) -> bytes:
+    return hashlib.sha256(a + b if a <= b else b + a).digest()
+
+
+def build_levels(leaves: list) -> list:
+    """All tree levels, leaves first and the root level ([root]) last"""
+    if not leaves:
+        raise ValueError('Cannot build a Merkle tree with no leaves')
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [_hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(leaves: list) -> bytes:
+    return build_levels(leaves)[-1][0]
+
+
+def merkle_proof(levels: list, index: int) -> list:
+    """Sibling hashes from leaf `index` up to (not including) the root"""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: bytes, proof: list, root: bytes) -> bool:
+    node = leaf
+    for sibling in proof:
+        node = _hash_pair(node, sibling)
+    return node == root
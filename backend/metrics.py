@@ -0,0 +1,313 @@
+"""
+Prometheus-style metrics, served as text at /api/metrics when METRICS_ENABLED is on.
+
+Each gunicorn worker counts into its own in-memory registry:
+
+  http_request_duration_seconds      histogram  endpoint, method, status
+  http_requests_in_flight            gauge
+  db_statements_total                counter    endpoint, operation
+  db_connections_opened_total        counter    endpoint
+  db_statements_per_request          histogram  endpoint
+  db_statement_duration_seconds      histogram  operation
+  crypto_operation_duration_seconds  histogram  operation (bcrypt, Fernet, Ed25519)
+  cache_hits_total                   counter    cache
+  cache_misses_total                 counter    cache
+
+Request, SQL and crypto numbers come from tracing's span listener, so nothing
+extra sits on those hot paths. Cache numbers are read from the caches' own
+hits/misses counters. Caches opt in with register_cache().
+
+Multi-process: a worker only sees its own registry, and a scrape lands on one
+arbitrary worker. Every worker therefore writes a snapshot to
+METRICS_DIR/<parent pid>_<pid>.json every METRICS_FLUSH_INTERVAL seconds. The
+worker answering a scrape writes its own snapshot first, then sums the files
+of every worker under the same master (the same parent pid):
+
+  - counters and histograms of workers that have exited are kept, so totals
+    never go backwards while the master lives
+  - the in-flight gauge only counts workers that are still alive
+  - files left by an earlier master (a previous deploy) are deleted on startup
+
+Other workers' numbers can be up to METRICS_FLUSH_INTERVAL seconds old.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+import tracing
+from config import METRICS_ENABLED, METRICS_DIR, METRICS_FLUSH_INTERVAL, METRICS_TOKEN
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SQL_BUCKETS     = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+CRYPTO_BUCKETS  = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1)
+COUNT_BUCKETS   = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'http_request_duration_seconds':     ('histogram', 'Request latency by endpoint, method and status.', LATENCY_BUCKETS),
+    'http_requests_in_flight':           ('gauge',     'Requests currently being handled.', None),
+    'db_statements_total':               ('counter',   'SQL statements executed, by endpoint and operation.', None),
+    'db_connections_opened_total':       ('counter',   'Database connections opened, by endpoint.', None),
+    'db_statements_per_request':         ('histogram', 'SQL statements executed per request, by endpoint.', COUNT_BUCKETS),
+    'db_statement_duration_seconds':     ('histogram', 'SQL statement time including pool checkout, by operation.', SQL_BUCKETS),
+    'crypto_operation_duration_seconds': ('histogram', 'bcrypt, Fernet and Ed25519 operation time.', CRYPTO_BUCKETS),
+    'cache_hits_total':                  ('counter',   'Cache hits, by cache.', None),
+    'cache_misses_total':                ('counter',   'Cache misses, by cache.', None),
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_caches = {}   # name -> object with .hits and .misses
+
+
+def register_cache(name, cache):
+    """Report cache.hits / cache.misses as cache_hits_total / cache_misses_total{cache=name}"""
+    _caches[name] = cache
+
+
+# ── Per-process registry ───────────────────────────────────────────────────────
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Registry:
+    def __init__(self):
+        self.pid        = os.getpid()
+        self.path       = os.path.join(METRICS_DIR, f'{os.getppid()}_{self.pid}.json')
+        self.counters   = defaultdict(float)
+        self.gauges     = defaultdict(float)
+        self.histograms = {}   # key -> per-bucket counts (last is +Inf), then the sum
+        self._lock      = threading.Lock()
+        self._thread    = None
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self.counters[_key(name, labels)] += value
+
+    def add(self, name, value, **labels):
+        with self._lock:
+            self.gauges[_key(name, labels)] += value
+
+    def observe(self, name, value, **labels):
+        buckets = METRICS[name][2]
+        key     = _key(name, labels)
+        with self._lock:
+            counts = self.histograms.get(key)
+            if counts is None:
+                counts = self.histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            counts[bisect_left(buckets, value)] += 1
+            counts[-1] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters   = dict(self.counters)
+            gauges     = dict(self.gauges)
+            histograms = {key: list(counts) for key, counts in self.histograms.items()}
+        for name, cache in _caches.items():
+            counters[_key('cache_hits_total', {'cache': name})]   = cache.hits
+            counters[_key('cache_misses_total', {'cache': name})] = cache.misses
+        return {
+            'pid':        self.pid,
+            'counters':   [[n, list(l), v] for (n, l), v in counters.items()],
+            'gauges':     [[n, list(l), v] for (n, l), v in gauges.items()],
+            'histograms': [[n, list(l), c] for (n, l), c in histograms.items()],
+        }
+
+    def write(self):
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        tmp = f'{self.path}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, self.path)
+
+    def start(self, interval=METRICS_FLUSH_INTERVAL):
+        if self._thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write()
+                except Exception as e:
+                    print(f"Metrics snapshot failed: {e}")
+
+        self._thread = threading.Thread(target=run, name='metrics-writer', daemon=True)
+        self._thread.start()
+
+
+_registry      = None
+_registry_lock = threading.Lock()
+
+def get_registry() -> Registry:
+    """This process's registry — recreated (empty) after a gunicorn fork"""
+    global _registry
+    registry = _registry
+    if registry is not None and registry.pid == os.getpid():
+        return registry
+    with _registry_lock:
+        if _registry is None or _registry.pid != os.getpid():
+            _registry = Registry()
+            _registry.start()
+        return _registry
+
+
+# ── Span listener ──────────────────────────────────────────────────────────────
+
+def _on_span(span):
+    registry = get_registry()
+    root     = span.root
+    endpoint = root.attributes.get('http.route', 'unmatched')
+
+    if span is root:
+        if span.kind != 'request':
+            return
+        registry.observe('http_request_duration_seconds', span.duration_ms / 1000, endpoint=endpoint,
+                         method=span.attributes.get('http.method', ''),
+                         status=span.attributes.get('http.status_code', 500))
+        registry.observe('db_statements_per_request', span.attributes.get('db.statements', 0), endpoint=endpoint)
+    elif span.kind == 'db':
+        if span.name == 'db.connect':
+            registry.inc('db_connections_opened_total', endpoint=endpoint)
+            root.attributes['db.connections'] = root.attributes.get('db.connections', 0) + 1
+            return
+        operation = span.attributes.get('db.operation', 'OTHER')
+        registry.inc('db_statements_total', endpoint=endpoint, operation=operation)
+        registry.observe('db_statement_duration_seconds', span.duration_ms / 1000, operation=operation)
+        root.attributes['db.statements'] = root.attributes.get('db.statements', 0) + 1
+    elif span.kind == 'crypto':
+        registry.observe('crypto_operation_duration_seconds', span.duration_ms / 1000, operation=span.name)
+
+
+# ── Collection ─────────────────────────────────────────────────────────────────
+
+def _alive(pid) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _snapshots():
+    """Snapshots of every worker under this master, this process's freshly written"""
+    get_registry().write()
+    for path in glob.glob(os.path.join(METRICS_DIR, f'{os.getppid()}_*.json')):
+        try:
+            with open(path) as f:
+                yield json.load(f)
+        except (OSError, ValueError):
+            continue   # being replaced or removed — the next scrape will see it
+
+def collect() -> dict:
+    """Sum every worker's snapshot: {'counters'|'gauges'|'histograms': {name: {labels: value}}}"""
+    merged = {'counters': defaultdict(dict), 'gauges': defaultdict(dict), 'histograms': defaultdict(dict)}
+    for snapshot in _snapshots():
+        live = _alive(snapshot['pid'])
+        for kind in ('counters', 'gauges'):
+            if kind == 'gauges' and not live:
+                continue
+            for name, labels, value in snapshot[kind]:
+                labels = tuple(map(tuple, labels))
+                merged[kind][name][labels] = merged[kind][name].get(labels, 0) + value
+        for name, labels, counts in snapshot['histograms']:
+            labels = tuple(map(tuple, labels))
+            total  = merged['histograms'][name].get(labels)
+            merged['histograms'][name][labels] = counts if total is None else [a + b for a, b in zip(total, counts)]
+    return merged
+
+
+def cleanup():
+    """Delete snapshots left by workers of an earlier master"""
+    for path in glob.glob(os.path.join(METRICS_DIR, '*_*.json')):
+        ppid = os.path.basename(path).split('_', 1)[0]
+        if ppid.isdigit() and int(ppid) != os.getppid() and not _alive(int(ppid)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# ── Text exposition ────────────────────────────────────────────────────────────
+
+def _number(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(labels, **extra) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+def render(merged=None) -> str:
+    merged = merged if merged is not None else collect()
+    lines  = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'histogram':
+            for labels, counts in sorted(merged['histograms'].get(name, {}).items()):
+                cumulative = 0
+                for le, count in zip([*map(_number, buckets), '+Inf'], counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_labels(labels, le=le)} {cumulative}')
+                lines.append(f'{name}_sum{_labels(labels)} {_number(counts[-1])}')
+                lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+        else:
+            values = merged['counters' if kind == 'counter' else 'gauges'].get(name, {})
+            for labels, value in sorted(values.items()):
+                lines.append(f'{name}{_labels(labels)} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+# ── Flask integration ──────────────────────────────────────────────────────────
+
+def metrics_endpoint():
+    """GET /api/metrics — every worker's metrics in Prometheus text format"""
+    import hmac
+    from flask import Response, request, jsonify
+
+    if METRICS_TOKEN:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(supplied, METRICS_TOKEN):
+            return jsonify({'success': False, 'error': 'Invalid metrics token'}), 401
+    response = Response(render(), content_type=CONTENT_TYPE)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+def init_app(app):
+    """
+    Serve /api/metrics, count in-flight requests and feed request/SQL/crypto
+    spans into the registry. With METRICS_ENABLED off none of it is installed,
+    so /api/metrics is a 404 and nothing is ever written to METRICS_DIR.
+    """
+    from flask import g
+
+    if not METRICS_ENABLED:
+        return
+    cleanup()
+    tracing.add_listener(_on_span)
+    app.add_url_rule('/api/metrics', 'metrics', metrics_endpoint, methods=['GET'])
+
+    @app.before_request
+    def _request_started():
+        g._metrics_in_flight = True
+        get_registry().add('http_requests_in_flight', 1)
+
+    @app.teardown_request
+    def _request_finished(exc=None):
+        if g.pop('_metrics_in_flight', None):
+            get_registry().add('http_requests_in_flight', -1)
@@ -1,6 +1,8 @@
 """Data models with static methods for database operations"""
-from database import execute_query
-from utils import generate_key, generate_token, calc_consistency_score
+from database import execute_query, execute_values, transaction
+from utils import generate_key, generate_token, calc_consistency_score, claim_timestamp, CLAIM_TIMESTAMP_SQL
+import stats_counters
+from pagination import build_page_query, finish_page
 
 class Identity:
     """Identity Anchor model"""
@@ -8,32 +10,46 @@ class Identity:
     @staticmethod
     def create(user_id=None):
         """Create new identity linked to a user"""
-        from utils import generate_keypair
-        public_key_hex, public_key_b64, private_key_enc = generate_keypair()
+        from keypool import take_keypair
+        public_key_hex, public_key_b64, private_key_enc = take_keypair()
         query = """
             INSERT INTO identity_anchors (user_id, user_pub_key, public_key_b64, private_key_encrypted, trust_score)
             VALUES (%s, %s, %s, %s, %s)
             RETURNING anchor_id, user_id, user_pub_key, public_key_b64, trust_score, created_at
         """
-        return execute_query(query, (user_id, public_key_hex, public_key_b64, private_key_enc, 50.0), fetchone=True, commit=True)
+        with transaction() as tx:
+            identity, error = execute_query(query, (user_id, public_key_hex, public_key_b64, private_key_enc, 50.0), fetchone=True, commit=True)
+            if error:
+                return None, error
+            stats_counters.bump(identities=1, trust_score_sum=identity['trust_score'])
+
+        if tx.error:
+            return None, tx.error
+        return identity, None
     
+    LIST_FIELDS = {
+        'anchor_id':      'anchor_id',
+        'user_id':        'user_id',
+        'user_pub_key':   'user_pub_key',
+        'public_key_b64': 'public_key_b64',
+        'trust_score':    'trust_score',
+        'created_at':     'created_at',
+    }
+
     @staticmethod
-    def get_all(user_id=None):
-        """Get identities — filtered by user if user_id provided"""
+    def get_all(page, user_id=None):
+        """Get one page of identities — filtered by user if user_id provided"""
+        where, params = [], []
         if user_id:
-            query = """
-                SELECT anchor_id, user_id, user_pub_key, public_key_b64, trust_score, created_at
-                FROM identity_anchors
-                WHERE user_id = %s
-                ORDER BY created_at DESC
-            """
-            return execute_query(query, (user_id,))
-        query = """
-            SELECT anchor_id, user_id, user_pub_key, public_key_b64, trust_score, created_at
-            FROM identity_anchors
-            ORDER BY created_at DESC
-        """
-        return execute_query(query)
+            where, params = ['user_id = %s'], [user_id]
+        query, params = build_page_query(
+            'identity_anchors', Identity.LIST_FIELDS, 'created_at', 'anchor_id', page, where, params
+        )
+        rows, error = execute_query(query, params)
+        if error:
+            return None, None, error
+        rows, next_cursor = finish_page(rows, page)
+        return rows, next_cursor, None
     
     @staticmethod
     def get_by_id(anchor_id):
@@ -42,92 +58,131 @@ class Identity:
         return execute_query(query, (anchor_id,), fetchone=True)
     
     @staticmethod
-    def search(term):
-        """Search identities"""
-        query = """
-            SELECT anchor_id, user_pub_key, trust_score, created_at
-            FROM identity_anchors
-            WHERE CAST(anchor_id AS TEXT) LIKE %s 
-               OR user_pub_key LIKE %s
-            ORDER BY created_at DESC
-        """
-        search_term = f"%{term}%"
-        return execute_query(query, (search_term, search_term))
+    def search(term, limit=None):
+        """Search identities by exact anchor id or public key prefix/substring"""
+        from search import search_identities, DEFAULT_LIMIT
+        return search_identities(term, limit or DEFAULT_LIMIT)
     
+    # Timestamps are rendered as UTC ISO-8601 (utils.CLAIM_TIMESTAMP_SQL), the form the app's
+    # JSON provider gives every datetime jsonify serialises
+    DETAILS_QUERY = f"""
+        SELECT json_build_object(
+            'identity', json_build_object(
+                'anchor_id',      i.anchor_id,
+                'user_id',        i.user_id,
+                'user_pub_key',   i.user_pub_key,
+                'public_key_b64', i.public_key_b64,
+                'trust_score',    i.trust_score,
+                'created_at',     to_char(i.created_at, '{CLAIM_TIMESTAMP_SQL}')
+            ),
+            'verifications', COALESCE(v.items, '[]'::json),
+            'events',        COALESCE(e.items, '[]'::json)
+        )::text AS details,
+        v.total AS total_verifications,
+        e.total AS total_events
+        FROM identity_anchors i
+        CROSS JOIN LATERAL (
+            SELECT json_agg(json_build_object(
+                       'verification_id',    pv.verification_id,
+                       'anchor_id',          pv.anchor_id,
+                       'platform_name',      pv.platform_name,
+                       'profile_url',        pv.profile_url,
+                       'verification_token', pv.verification_token,
+                       'signature',          pv.signature,
+                       'signed_at',          to_char(pv.signed_at, '{CLAIM_TIMESTAMP_SQL}'),
+                       'verified_at',        to_char(pv.verified_at, '{CLAIM_TIMESTAMP_SQL}'),
+                       'tx_hash',            pv.tx_hash
+                   ) ORDER BY pv.verified_at DESC) AS items,
+                   count(*) AS total
+            FROM platform_verifications pv WHERE pv.anchor_id = i.anchor_id
+        ) v
+        CROSS JOIN LATERAL (
+            SELECT json_agg(json_build_object(
+                       'event_id',   re.event_id,
+                       'anchor_id',  re.anchor_id,
+                       'event_type', re.event_type,
+                       'platform',   re.platform,
+                       'time_stamp', to_char(re.time_stamp, '{CLAIM_TIMESTAMP_SQL}')
+                   ) ORDER BY re.time_stamp DESC) AS items,
+                   count(*) AS total
+            FROM reputation_events re WHERE re.anchor_id = i.anchor_id
+        ) e
+        WHERE i.anchor_id = %s
+    """
+
     @staticmethod
     def get_details(anchor_id):
-        """Get complete identity details"""
-        identity, error = Identity.get_by_id(anchor_id)
-        if error or not identity:
+        """
+        Identity, verifications and events in one statement. Returns a row with
+        `details` — JSON text {identity, verifications, events}, never including
+        the private key — plus total_verifications and total_events.
+        """
+        row, error = execute_query(Identity.DETAILS_QUERY, (anchor_id,), fetchone=True)
+        if error or not row:
             return None, error or "Identity not found"
-        
-        verifications, _ = execute_query(
-            "SELECT * FROM platform_verifications WHERE anchor_id = %s ORDER BY verified_at DESC",
-            (anchor_id,)
-        )
-        
-        events, _ = execute_query(
-            "SELECT * FROM reputation_events WHERE anchor_id = %s ORDER BY time_stamp DESC",
-            (anchor_id,)
-        )
-        
-        return {
-            'identity': identity,
-            'verifications': verifications or [],
-            'events': events or []
-        }, None
-    
+        return row, None
+
     @staticmethod
-    def get_trust_history(anchor_id):
-        """Get trust score history"""
-        identity, error = Identity.get_by_id(anchor_id)
-        if error or not identity:
-            return None, error or "Identity not found"
-        
-        events, _ = execute_query(
-            """
-            SELECT event_id, anchor_id, event_type, platform, time_stamp
-            FROM reputation_events
-            WHERE anchor_id = %s
-            ORDER BY time_stamp DESC
-            LIMIT 20
-            """,
-            (anchor_id,)
-        )
-        
-        return {
-            'current_score': identity['trust_score'],
-            'history': events or []
-        }, None
+    def get_trust_history(anchor_id, start=None, end=None, resolution='auto'):
+        """Trust score points over a time range — raw changes or hourly/daily rollups"""
+        from trust_history import get_history
+        return get_history(anchor_id, start, end, resolution)
     
     @staticmethod
-    def update_trust_score(anchor_id, impact):
-        """Update trust score"""
+    def update_trust_score(anchor_id, impact, reason=None):
+        """Update trust score — records the change in trust_score_history and keeps trust_score_sum in step"""
         query = """
-            UPDATE identity_anchors 
-            SET trust_score = GREATEST(LEAST(trust_score + %s, 100), 0)
-            WHERE anchor_id = %s
-            RETURNING trust_score
+            WITH prev AS (
+                SELECT anchor_id, trust_score
+                FROM identity_anchors
+                WHERE anchor_id = %s
+                FOR NO KEY UPDATE   -- callers may already hold KEY SHARE from a child-row insert; FOR UPDATE would deadlock
+            ),
+            updated AS (
+                UPDATE identity_anchors a
+                SET trust_score = GREATEST(LEAST(prev.trust_score + %s, 100), 0)
+                FROM prev
+                WHERE a.anchor_id = prev.anchor_id
+                RETURNING a.anchor_id, a.trust_score, prev.trust_score AS previous_score
+            ),
+            history AS (
+                INSERT INTO trust_score_history (anchor_id, old_score, new_score, reason)
+                SELECT anchor_id, previous_score, trust_score, %s
+                FROM updated
+                WHERE trust_score <> previous_score
+            )
+            SELECT trust_score, previous_score FROM updated
         """
-        return execute_query(query, (impact, anchor_id), fetchone=True, commit=True)
+        with transaction() as tx:
+            result, error = execute_query(query, (anchor_id, impact, reason), fetchone=True, commit=True)
+            if error or not result:
+                return result, error
+            stats_counters.bump(trust_score_sum=result['trust_score'] - result['previous_score'])
+
+        if tx.error:
+            return None, tx.error
+        return result, None
     
     @staticmethod
     def get_statistics():
-        """Get dashboard statistics"""
-        stats = {}
-        
-        result, _ = execute_query("SELECT COUNT(*) as count FROM identity_anchors", fetchone=True)
-        stats['total_identities'] = result['count'] if result else 0
-        
-        result, _ = execute_query("SELECT COUNT(*) as count FROM platform_verifications", fetchone=True)
-        stats['total_verifications'] = result['count'] if result else 0
-        
-        result, _ = execute_query("SELECT AVG(trust_score) as avg FROM identity_anchors", fetchone=True)
-        stats['avg_trust'] = result['avg'] if result and result['avg'] else 0.0
-        
-        result, _ = execute_query("SELECT AVG(consistency_score) as avg FROM consistency_checks", fetchone=True)
-        stats['avg_consistency'] = result['avg'] if result and result['avg'] else 0.0
-        
+        """Get dashboard statistics from the running counters"""
+        counters, error = stats_counters.read()
+        if error:
+            return None, error
+        if counters is None:
+            # Counters never built — fall back to one aggregate query
+            counters, error = stats_counters.compute()
+            if error:
+                return None, error
+
+        identities = counters['identities']
+        checks     = counters['consistency_checks']
+        stats = {
+            'total_identities':    int(identities),
+            'total_verifications': int(counters['verifications']),
+            'avg_trust':           counters['trust_score_sum'] / identities if identities else 0.0,
+            'avg_consistency':     counters['consistency_score_sum'] / checks if checks else 0.0,
+        }
         return stats, None
 
 
@@ -136,54 +191,154 @@ class Verification:
     
     @staticmethod
     def create(anchor_id, platform, url):
-        """Create new verification"""
-        # Check if identity exists
-        identity, error = Identity.get_by_id(anchor_id)
-        if error or not identity:
-            return None, "Identity not found"
-        
-        # Insert verification
-        query = """
-            INSERT INTO platform_verifications 
-            (anchor_id, platform_name, profile_url, verification_token)
-            VALUES (%s, %s, %s, %s)
-            RETURNING verification_id, anchor_id, platform_name, profile_url, 
-                      verification_token, verified_at
+        """Create new verification — insert, trust update and event commit together"""
+        with transaction() as tx:
+            # Check if identity exists
+            identity, error = Identity.get_by_id(anchor_id)
+            if error or not identity:
+                return None, "Identity not found"
+
+            # Insert verification
+            query = """
+                INSERT INTO platform_verifications 
+                (anchor_id, platform_name, profile_url, verification_token)
+                VALUES (%s, %s, %s, %s)
+                RETURNING verification_id, anchor_id, platform_name, profile_url, 
+                          verification_token, verified_at
+            """
+            verification, error = execute_query(
+                query, 
+                (anchor_id, platform, url, generate_token()), 
+                fetchone=True, 
+                commit=True
+            )
+
+            if error:
+                return None, error
+            stats_counters.bump(verifications=1)
+
+            # Sign the claim with the identity's key
+            signed, _ = Verification.sign_rows(anchor_id, [verification])
+            verification['verified_at'] = claim_timestamp(verification['verified_at'])   # the signed form
+            if signed:
+                verification['signature'] = signed[0]['signature']
+                verification['signed_at'] = signed[0]['signed_at']
+
+            # Update trust score
+            result, _ = Identity.update_trust_score(anchor_id, 5.0, 'successful_verification')
+            if result:
+                verification['trust_score'] = result['trust_score']
+
+            # Log event
+            execute_query(
+                "INSERT INTO reputation_events (anchor_id, event_type, platform) VALUES (%s, %s, %s)",
+                (anchor_id, 'successful_verification', platform),
+                commit=True
+            )
+
+        if tx.error:
+            return None, tx.error
+        return verification, None
+    
+    @staticmethod
+    def claim_for(row):
+        """The signed claim for a platform_verifications row"""
+        from utils import build_verification_claim
+        return build_verification_claim(row['anchor_id'], row['platform_name'], row['profile_url'], row['verified_at'])
+
+    @staticmethod
+    def sign_rows(anchor_id, rows):
         """
-        verification, error = execute_query(
-            query, 
-            (anchor_id, platform, url, generate_token()), 
-            fetchone=True, 
-            commit=True
+        Sign verification rows of one anchor (one key load for all of them) and
+        store the signatures. Returns ([{verification_id, signature, signed_at}], error).
+        """
+        from signing import sign_claims, KeyNotFound
+        if not rows:
+            return [], None
+        try:
+            signatures = sign_claims(anchor_id, [Verification.claim_for(row) for row in rows])
+        except KeyNotFound as e:
+            return None, str(e)
+
+        return execute_values(
+            """
+            UPDATE platform_verifications v SET signature = s.signature, signed_at = CURRENT_TIMESTAMP
+            FROM (VALUES %s) AS s(verification_id, signature)
+            WHERE v.verification_id = s.verification_id
+            RETURNING v.verification_id, v.signature, v.signed_at
+            """,
+            [(row['verification_id'], signature) for row, signature in zip(rows, signatures)],
+            fetch=True
+        )
+
+    @staticmethod
+    def resign_all(anchor_id):
+        """Re-sign every verification of an anchor, e.g. after its key was rotated"""
+        rows, error = execute_query(
+            """
+            SELECT verification_id, anchor_id, platform_name, profile_url, verified_at
+            FROM platform_verifications WHERE anchor_id = %s
+            """,
+            (anchor_id,)
         )
-        
         if error:
             return None, error
-        
-        # Update trust score
-        result, _ = Identity.update_trust_score(anchor_id, 5.0)
-        if result:
-            verification['trust_score'] = result['trust_score']
-        
-        # Log event
-        execute_query(
-            "INSERT INTO reputation_events (anchor_id, event_type, platform) VALUES (%s, %s, %s)",
-            (anchor_id, 'successful_verification', platform),
-            commit=True
-        )
-        
-        return verification, None
-    
+        return Verification.sign_rows(anchor_id, rows)
+
     @staticmethod
-    def get_all():
-        """Get all verifications"""
-        query = """
-            SELECT v.*, i.trust_score
-            FROM platform_verifications v
-            JOIN identity_anchors i ON v.anchor_id = i.anchor_id
-            ORDER BY v.verified_at DESC
+    def verify_claim(anchor_id, platform, profile_url, verified_at, signature):
+        """Check one claim's signature against the anchor's public key — returns (valid, error)"""
+        results, error = Verification.verify_claims([{
+            'anchor_id': anchor_id, 'platform': platform, 'profile_url': profile_url,
+            'verified_at': verified_at, 'signature': signature,
+        }], parallel=False)
+        if error:
+            return None, error
+        if results[0]['error']:
+            return None, results[0]['error']
+        return results[0]['valid'], None
+
+    @staticmethod
+    def verify_claims(claims, parallel=True):
+        """
+        Check many claims at once; each is a dict with anchor_id, platform,
+        profile_url, verified_at and signature. Returns (results, error).
         """
-        return execute_query(query)
+        from signing import verify_claims
+        from utils import build_verification_claim
+        items = [
+            (claim['anchor_id'],
+             build_verification_claim(claim['anchor_id'], claim['platform'], claim['profile_url'], claim['verified_at']),
+             claim['signature'])
+            for claim in claims
+        ]
+        return verify_claims(items, parallel=parallel)
+
+    LIST_FIELDS = {
+        'verification_id':    'v.verification_id',
+        'anchor_id':          'v.anchor_id',
+        'platform_name':      'v.platform_name',
+        'profile_url':        'v.profile_url',
+        'verification_token': 'v.verification_token',
+        'signature':          'v.signature',
+        'signed_at':          'v.signed_at',
+        'verified_at':        f"to_char(v.verified_at, '{CLAIM_TIMESTAMP_SQL}')",
+        'tx_hash':            'v.tx_hash',
+        'trust_score':        'i.trust_score',
+    }
+
+    @staticmethod
+    def get_all(page):
+        """Get one page of verifications"""
+        query, params = build_page_query(
+            'platform_verifications v JOIN identity_anchors i ON v.anchor_id = i.anchor_id',
+            Verification.LIST_FIELDS, 'v.verified_at', 'v.verification_id', page
+        )
+        rows, error = execute_query(query, params)
+        if error:
+            return None, None, error
+        rows, next_cursor = finish_page(rows, page)
+        return rows, next_cursor, None
 
 
 class ConsistencyCheck:
@@ -205,23 +360,87 @@ class ConsistencyCheck:
             RETURNING check_id, user_group, platform_a, platform_b, 
                       consistency_score, checked_at
         """
-        return execute_query(
-            query,
-            (identity_anchor, platform_a, platform_b, score),
-            fetchone=True,
-            commit=True
-        )
+        with transaction() as tx:
+            check, error = execute_query(
+                query,
+                (identity_anchor, platform_a, platform_b, score),
+                fetchone=True,
+                commit=True
+            )
+            if error:
+                return None, error
+            stats_counters.bump(consistency_checks=1, consistency_score_sum=check['consistency_score'])
+
+        if tx.error:
+            return None, tx.error
+        return check, None
     
     @staticmethod
-    def get_all():
-        """Get all consistency checks"""
-        query = """
-            SELECT check_id, user_group, platform_a, platform_b, 
-                   consistency_score, checked_at
-            FROM consistency_checks
-            ORDER BY checked_at DESC
+    def create_batch(identity_anchor, pairs):
         """
-        return execute_query(query)
+        Score many (profile_a, profile_b) pairs with the vectorized scorers and
+        store every result with one multi-row INSERT.
+        """
+        import json
+        from psycopg2.extras import Json
+        from consistency import calc_batch_consistency_scores
+
+        results = calc_batch_consistency_scores(pairs)
+        rows = [
+            (
+                identity_anchor,
+                profile_a['platform'],
+                profile_b['platform'],
+                result['total_score'],
+                Json(result['breakdown'], dumps=json.dumps),
+                result['algorithm'],
+            )
+            for (profile_a, profile_b), result in zip(pairs, results)
+        ]
+
+        with transaction() as tx:
+            checks, error = execute_values(
+                """
+                INSERT INTO consistency_checks
+                (user_group, platform_a, platform_b, consistency_score, breakdown, algorithm)
+                VALUES %s
+                RETURNING check_id, user_group, platform_a, platform_b,
+                          consistency_score, checked_at
+                """,
+                rows,
+                fetch=True
+            )
+            if error:
+                return None, error
+            stats_counters.bump(
+                consistency_checks=len(checks),
+                consistency_score_sum=sum(check['consistency_score'] for check in checks)
+            )
+
+        if tx.error:
+            return None, tx.error
+        return checks, None
+
+    LIST_FIELDS = {
+        'check_id':          'check_id',
+        'user_group':        'user_group',
+        'platform_a':        'platform_a',
+        'platform_b':        'platform_b',
+        'consistency_score': 'consistency_score',
+        'checked_at':        'checked_at',
+    }
+
+    @staticmethod
+    def get_all(page):
+        """Get one page of consistency checks"""
+        query, params = build_page_query(
+            'consistency_checks', ConsistencyCheck.LIST_FIELDS, 'checked_at', 'check_id', page
+        )
+        rows, error = execute_query(query, params)
+        if error:
+            return None, None, error
+        rows, next_cursor = finish_page(rows, page)
+        return rows, next_cursor, None
 
 
 class ReputationEvent:
@@ -229,40 +448,53 @@ class ReputationEvent:
     
     @staticmethod
     def create(anchor_id, event_type, platform, score_impact):
-        """Create reputation event"""
-        # Check if identity exists
-        identity, error = Identity.get_by_id(anchor_id)
-        if error or not identity:
-            return None, "Identity not found"
-        
-        # Insert event
-        query = """
-            INSERT INTO reputation_events (anchor_id, event_type, platform)
-            VALUES (%s, %s, %s)
-            RETURNING event_id, anchor_id, event_type, platform, time_stamp
-        """
-        event, error = execute_query(
-            query,
-            (anchor_id, event_type, platform),
-            fetchone=True,
-            commit=True
-        )
-        
-        if error:
-            return None, error
-        
-        # Update trust score if impact provided
-        if score_impact != 0:
-            Identity.update_trust_score(anchor_id, score_impact)
-        
+        """Create reputation event — event and trust update commit together"""
+        with transaction() as tx:
+            # Check if identity exists
+            identity, error = Identity.get_by_id(anchor_id)
+            if error or not identity:
+                return None, "Identity not found"
+
+            # Insert event
+            query = """
+                INSERT INTO reputation_events (anchor_id, event_type, platform)
+                VALUES (%s, %s, %s)
+                RETURNING event_id, anchor_id, event_type, platform, time_stamp
+            """
+            event, error = execute_query(
+                query,
+                (anchor_id, event_type, platform),
+                fetchone=True,
+                commit=True
+            )
+
+            if error:
+                return None, error
+
+            # Update trust score if impact provided
+            if score_impact != 0:
+                Identity.update_trust_score(anchor_id, score_impact, event_type)
+
+        if tx.error:
+            return None, tx.error
         return event, None
     
+    LIST_FIELDS = {
+        'event_id':   'event_id',
+        'anchor_id':  'anchor_id',
+        'event_type': 'event_type',
+        'platform':   'platform',
+        'time_stamp': 'time_stamp',
+    }
+
     @staticmethod
-    def get_all():
-        """Get all reputation events"""
-        query = """
-            SELECT event_id, anchor_id, event_type, platform, time_stamp
-            FROM reputation_events
-            ORDER BY time_stamp DESC
-        """
-        return execute_query(query)
\ No newline at end of file
+    def get_all(page):
+        """Get one page of reputation events"""
+        query, params = build_page_query(
+            'reputation_events', ReputationEvent.LIST_FIELDS, 'time_stamp', 'event_id', page
+        )
+        rows, error = execute_query(query, params)
+        if error:
+            return None, None, error
+        rows, next_cursor = finish_page(rows, page)
+        return rows, next_cursor, None
@@ -4,11 +4,16 @@ import json
 import requests
 from flask import redirect, request, jsonify, url_for
 from cryptography.fernet import Fernet
-from database import execute_query
+from database import execute_query, execute_values, transaction
 from auth import generate_token
+import stats_counters
+import lookalikes
+from tracing import TracedAdapter, traced
+from pagination import parse_page_args, build_page_query, finish_page
 from config import (
     GITHUB_CLIENT_ID, GITHUB_CLIENT_SECRET,
-    GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET
+    GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET,
+    LOOKALIKE_FLAG_DISTANCE
 )
 
 # ── Encryption key for storing OAuth tokens safely ─────────────────────────────
@@ -22,12 +27,18 @@ if not FERNET_KEY:
 
 fernet = Fernet(FERNET_KEY.encode())
 
+@traced('crypto.fernet.encrypt', 'crypto')
 def encrypt_token(token: str) -> str:
     return fernet.encrypt(token.encode()).decode()
 
+@traced('crypto.fernet.decrypt', 'crypto')
 def decrypt_token(encrypted: str) -> str:
     return fernet.decrypt(encrypted.encode()).decode()
 
+# ── Provider HTTP calls — one keep-alive session, a trace span per request ─────
+http = requests.Session()
+http.mount('https://', TracedAdapter())
+
 # ── Helpers ────────────────────────────────────────────────────────────────────
 
 def error_response(message, status=400):
@@ -36,57 +47,86 @@ def error_response(message, status=400):
 def success_response(data):
     return jsonify({'success': True, **data})
 
-def save_oauth_verification(user_id, platform, platform_user_id, username, profile_url, access_token):
+def save_oauth_verification(user_id, platform, platform_user_id, username, profile_url, access_token,
+                            display_name=None, bio=None):
     """Store OAuth verification in DB, update trust score, log event"""
 
-    # Check if this platform account is already connected to ANY identity
-    existing, _ = execute_query(
-        "SELECT id FROM oauth_verifications WHERE platform = %s AND platform_user_id = %s",
-        (platform, str(platform_user_id)),
-        fetchone=True
-    )
-    if existing:
-        return None, f"This {platform} account is already connected to an identity"
-
-    # Encrypt the access token before storing
-    encrypted_token = encrypt_token(access_token)
+    with transaction() as tx:
+        # Check if this platform account is already connected to ANY identity
+        existing, _ = execute_query(
+            "SELECT id FROM oauth_verifications WHERE platform = %s AND platform_user_id = %s",
+            (platform, str(platform_user_id)),
+            fetchone=True
+        )
+        if existing:
+            return None, f"This {platform} account is already connected to an identity"
 
-    # Find the identity anchor for this user
-    identity, _ = execute_query(
-        "SELECT anchor_id FROM identity_anchors WHERE user_id = %s ORDER BY created_at DESC LIMIT 1",
-        (user_id,),
-        fetchone=True
-    )
+        # Encrypt the access token before storing
+        encrypted_token = encrypt_token(access_token)
 
-    anchor_id = identity['anchor_id'] if identity else None
-
-    # Save verification
-    result, error = execute_query(
-        """
-        INSERT INTO oauth_verifications 
-            (user_id, anchor_id, platform, platform_user_id, platform_username, profile_url, encrypted_token)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        RETURNING id, platform, platform_username, profile_url, connected_at
-        """,
-        (user_id, anchor_id, platform, str(platform_user_id), username, profile_url, encrypted_token),
-        fetchone=True,
-        commit=True
-    )
+        # Find the identity anchor for this user
+        identity, _ = execute_query(
+            "SELECT anchor_id FROM identity_anchors WHERE user_id = %s ORDER BY created_at DESC LIMIT 1",
+            (user_id,),
+            fetchone=True
+        )
 
-    if error:
-        return None, error
+        anchor_id = identity['anchor_id'] if identity else None
 
-    if anchor_id:
-        execute_query(
+        # Save verification
+        result, error = execute_query(
             """
-            INSERT INTO platform_verifications (anchor_id, platform_name, profile_url, verification_token)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT DO NOTHING
+            INSERT INTO oauth_verifications 
+                (user_id, anchor_id, platform, platform_user_id, platform_username, profile_url, encrypted_token,
+                 display_name, bio)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id, platform, platform_username, profile_url, connected_at
             """,
-            (anchor_id, platform, profile_url, 'oauth_verified'),
+            (user_id, anchor_id, platform, str(platform_user_id), username, profile_url, encrypted_token,
+             display_name, bio),
+            fetchone=True,
             commit=True
         )
 
+        if error:
+            return None, error
+
+        if anchor_id:
+            inserted, _ = execute_query(
+                """
+                INSERT INTO platform_verifications (anchor_id, platform_name, profile_url, verification_token)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT DO NOTHING
+                RETURNING verification_id, anchor_id, platform_name, profile_url, verified_at
+                """,
+                (anchor_id, platform, profile_url, 'oauth_verified'),
+                fetchone=True,
+                commit=True
+            )
+            if inserted:
+                from models import Verification
+                stats_counters.bump(verifications=1)
+                Verification.sign_rows(anchor_id, [inserted])
+
+        # Flag other identities' accounts whose usernames are a few edits away (no score
+        # impact). Skipped for accounts without an anchor, and for names so short that
+        # LOOKALIKE_FLAG_DISTANCE edits turn them into unrelated ones
+        flagged = []
+        if anchor_id is not None and len(lookalikes.normalise(username)) > 2 * LOOKALIKE_FLAG_DISTANCE:
+            matches = lookalikes.find(username, LOOKALIKE_FLAG_DISTANCE) or []
+            flagged = [account for match in matches for account in match['accounts']
+                       if account['anchor_id'] and account['anchor_id'] != anchor_id]
+        if flagged:
+            execute_values(
+                "INSERT INTO reputation_events (anchor_id, event_type, platform) VALUES %s",
+                sorted({(account['anchor_id'], 'suspicious_activity', account['platform']) for account in flagged})
+            )
+
+    if tx.error:
+        return None, tx.error
+
+    lookalikes.add({**result, 'anchor_id': anchor_id})
+    result['lookalikes'] = flagged
     return result, None
 
 
@@ -117,7 +157,7 @@ def github_callback():
         return error_response('No authorization code received from GitHub')
 
     # Exchange code for access token
-    token_res = requests.post(
+    token_res = http.post(
         'https://github.com/login/oauth/access_token',
         data={
             'client_id':     GITHUB_CLIENT_ID,
@@ -133,7 +173,7 @@ def github_callback():
         return error_response('Failed to get access token from GitHub')
 
     # Fetch GitHub profile
-    profile_res  = requests.get(
+    profile_res  = http.get(
         'https://api.github.com/user',
         headers={
             'Authorization': f'token {access_token}',
@@ -150,7 +190,8 @@ def github_callback():
 
     # Save to DB
     result, error = save_oauth_verification(
-        user_id, 'GitHub', github_id, username, profile_url, access_token
+        user_id, 'GitHub', github_id, username, profile_url, access_token,
+        display_name=profile.get('name'), bio=profile.get('bio')
     )
     if error:
         return redirect(f"https://identity-verifier-tt63.onrender.com/?oauth_error={error}")
@@ -188,7 +229,7 @@ def google_callback():
         return error_response('No authorization code received from Google')
 
     # Exchange code for access token
-    token_res = requests.post(
+    token_res = http.post(
         'https://oauth2.googleapis.com/token',
         data={
             'client_id':     GOOGLE_CLIENT_ID,
@@ -205,7 +246,7 @@ def google_callback():
         return error_response('Failed to get access token from Google')
 
     # Fetch Google profile
-    profile_res = requests.get(
+    profile_res = http.get(
         'https://www.googleapis.com/oauth2/v2/userinfo',
         headers={'Authorization': f'Bearer {access_token}'}
     )
@@ -219,7 +260,8 @@ def google_callback():
         return error_response('Failed to fetch Google profile')
 
     result, error = save_oauth_verification(
-        user_id, 'Google', google_id, username or email, profile_url, access_token
+        user_id, 'Google', google_id, username or email, profile_url, access_token,
+        display_name=profile.get('name')
     )
     if error:
         return redirect(f"https://identity-verifier-tt63.onrender.com/?oauth_error={error}")
@@ -230,22 +272,32 @@ def google_callback():
 
 # ── Get connected accounts ─────────────────────────────────────────────────────
 
+OAUTH_LIST_FIELDS = {
+    'id':                'id',
+    'platform':          'platform',
+    'platform_username': 'platform_username',
+    'profile_url':       'profile_url',
+    'connected_at':      'connected_at',
+}
+
 def get_oauth_verifications():
-    """Return all OAuth verifications for the logged-in user"""
+    """Return one page of OAuth verifications for the logged-in user"""
     user_id = request.user.get('user_id')
 
-    verifications, error = execute_query(
-        """
-        SELECT id, platform, platform_username, profile_url, connected_at
-        FROM oauth_verifications
-        WHERE user_id = %s
-        ORDER BY connected_at DESC
-        """,
-        (user_id,)
+    page, error = parse_page_args(request.args, OAUTH_LIST_FIELDS)
+    if error:
+        return error_response(error)
+
+    query, params = build_page_query(
+        'oauth_verifications', OAUTH_LIST_FIELDS, 'connected_at', 'id', page,
+        ['user_id = %s'], [user_id]
     )
+    verifications, error = execute_query(query, params)
     if error:
         return error_response(error, 500)
 
+    verifications, next_cursor = finish_page(verifications, page)
     return success_response({
-        'verifications': [dict(v) for v in verifications] if verifications else []
-    })
\ No newline at end of file
+        'verifications': verifications,
+        'next_cursor':   next_cursor
+    })
@@ -0,0 +1,116 @@
+"""
+Keyset (cursor) pagination and field projection for list endpoints.
+
+Every list is ordered newest-first on a (timestamp, id) pair, so the next page
+is simply "rows strictly older than the last one we returned":
+
+    WHERE (ts, id) < (%s, %s) ORDER BY ts DESC, id DESC LIMIT n + 1
+
+The cursor handed to clients is an opaque base64 token of that (ts, id) pair.
+Fetching one extra row tells us whether another page exists without a COUNT.
+Rows with a NULL ts are left out: they sort first under DESC, can't be put in
+a cursor, and a row comparison against them is never true.
+
+Query parameters understood by parse_page_args():
+    limit   — rows per page (default 50, max 500)
+    cursor  — next_cursor from the previous page
+    fields  — comma separated projection, e.g. fields=anchor_id,trust_score
+"""
+
+import base64
+import json
+from datetime import datetime
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT     = 500
+
+
+# ── Cursor encoding ────────────────────────────────────────────────────────────
+
+def encode_cursor(ts, row_id) -> str:
+    raw = json.dumps([ts.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """Return (datetime, id) — raises ValueError for anything malformed"""
+    try:
+        padded     = cursor + '=' * (-len(cursor) % 4)
+        ts, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+# ── Request parsing ────────────────────────────────────────────────────────────
+
+def parse_page_args(args, allowed_fields):
+    """
+    Read limit / cursor / fields from request.args.
+    Returns (page, error) where page is a dict of limit, after, fields.
+    """
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+    except (ValueError, TypeError):
+        return None, 'limit must be an integer'
+    if not (1 <= limit <= MAX_LIMIT):
+        return None, f'limit must be between 1 and {MAX_LIMIT}'
+
+    after  = None
+    cursor = args.get('cursor', '').strip()
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            return None, str(e)
+
+    fields = list(allowed_fields)
+    requested = args.get('fields', '').strip()
+    if requested:
+        fields = [f.strip() for f in requested.split(',') if f.strip()]
+        unknown = [f for f in fields if f not in allowed_fields]
+        if unknown or not fields:
+            return None, f'Invalid fields. Allowed: {", ".join(allowed_fields)}'
+
+    return {'limit': limit, 'after': after, 'fields': fields}, None
+
+
+# ── Query building ─────────────────────────────────────────────────────────────
+
+def build_page_query(from_clause, allowed_fields, ts_col, id_col, page, where=None, params=()):
+    """
+    Build the SELECT for one page.
+
+    allowed_fields maps output name -> SQL expression. The ordering columns are
+    always selected (as _cursor_ts / _cursor_id) so the next cursor can be built
+    whatever projection the client asked for.
+    """
+    columns = [f'{allowed_fields[f]} AS {f}' for f in page['fields']]
+    columns += [f'{ts_col} AS _cursor_ts', f'{id_col} AS _cursor_id']
+
+    conditions = list(where or []) + [f'{ts_col} IS NOT NULL']
+    params     = list(params)
+    if page['after']:
+        conditions.append(f'({ts_col}, {id_col}) < (%s, %s)')
+        params.extend(page['after'])
+
+    query = f"SELECT {', '.join(columns)} FROM {from_clause}"
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    query += f' ORDER BY {ts_col} DESC, {id_col} DESC LIMIT %s'
+    params.append(page['limit'] + 1)
+    return query, params
+
+
+def finish_page(rows, page):
+    """Trim the look-ahead row and strip cursor columns — returns (rows, next_cursor)"""
+    rows        = rows or []
+    next_cursor = None
+    if len(rows) > page['limit']:
+        rows = rows[:page['limit']]
+        last = rows[-1]
+        next_cursor = encode_cursor(last['_cursor_ts'], last['_cursor_id'])
+    for row in rows:
+        row.pop('_cursor_ts', None)
+        row.pop('_cursor_id', None)
+    return rows, next_cursor
@@ -0,0 +1,141 @@
+"""
+Password hashing off the request thread.
+
+bcrypt used to run inline on the gunicorn worker during /api/register and
+/api/login, blocking every other request on that worker for the full hash
+time. Hashes and checks now run in a small per-process ProcessPoolExecutor:
+
+  - BCRYPT_WORKERS processes do the hashing
+  - at most BCRYPT_MAX_QUEUE operations may be running or waiting; beyond
+    that HasherBusy is raised and the API answers 503 instead of piling up
+  - calibrate() picks the cost factor whose hash time is closest to (without
+    exceeding) BCRYPT_TARGET_MS on this hardware, unless BCRYPT_ROUNDS pins it
+  - needs_rehash() flags stored hashes weaker than the current cost so login
+    can upgrade them (never downgrades, so workers can't flip-flop a hash)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+from tracing import traced
+from config import (
+    BCRYPT_ROUNDS, BCRYPT_TARGET_MS, BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS,
+    BCRYPT_WORKERS, BCRYPT_MAX_QUEUE, BCRYPT_TIMEOUT
+)
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full — callers should answer 503"""
+
+
+# ── Pool workers (module level so they pickle) ────────────────────────────────
+
+def _hashpw(password: bytes, rounds: int) -> str:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _checkpw(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+def _time_rounds(rounds: int) -> float:
+    started = time.perf_counter()
+    bcrypt.hashpw(b'calibration-password', bcrypt.gensalt(rounds))
+    return time.perf_counter() - started
+
+
+# ── Executor ───────────────────────────────────────────────────────────────────
+
+_executor = None
+_pid      = None
+_slots    = threading.BoundedSemaphore(BCRYPT_MAX_QUEUE)
+_lock     = threading.Lock()
+# bcrypt.gensalt()'s default — calibration may raise the cost, never lower it below this
+FLOOR_ROUNDS = 12
+
+_rounds   = BCRYPT_ROUNDS or FLOOR_ROUNDS
+
+def _get_executor():
+    """This process's pool — recreated after a gunicorn fork"""
+    global _executor, _pid
+    if _executor is None or _pid != os.getpid():
+        with _lock:
+            if _executor is None or _pid != os.getpid():
+                _executor = ProcessPoolExecutor(max_workers=BCRYPT_WORKERS)
+                _pid      = os.getpid()
+    return _executor
+
+def _run(fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise HasherBusy('Password hashing is saturated, try again shortly')
+    try:
+        future = _get_executor().submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=BCRYPT_TIMEOUT)
+    except FutureTimeout:
+        raise HasherBusy('Password hashing timed out, try again shortly')
+
+
+# ── Cost factor ────────────────────────────────────────────────────────────────
+
+def calibrate(target_ms=BCRYPT_TARGET_MS) -> int:
+    """
+    Choose the cost factor for new hashes. Each extra round doubles the work,
+    so one timing at the minimum cost is enough to extrapolate. Runs in the
+    pool, which also warms up the worker processes.
+    """
+    global _rounds
+    if BCRYPT_ROUNDS:
+        _rounds = BCRYPT_ROUNDS
+        return _rounds
+
+    min_rounds = max(BCRYPT_MIN_ROUNDS, FLOOR_ROUNDS)
+    try:
+        base_ms = _run(_time_rounds, min_rounds) * 1000
+    except Exception as e:
+        print(f"bcrypt calibration failed, keeping cost {_rounds}: {e}")
+        return _rounds
+
+    rounds = min_rounds
+    while rounds < BCRYPT_MAX_ROUNDS and base_ms * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+        rounds += 1
+    _rounds = rounds
+    return _rounds
+
+def current_rounds() -> int:
+    return _rounds
+
+def hash_cost(hashed: str) -> int:
+    """Cost factor encoded in a bcrypt hash ($2b$<cost>$...)"""
+    try:
+        return int(hashed.split('$')[2])
+    except (IndexError, ValueError):
+        return 0
+
+def needs_rehash(hashed: str) -> bool:
+    return hash_cost(hashed) < _rounds
+
+
+# ── Public API ─────────────────────────────────────────────────────────────────
+
+@traced('crypto.bcrypt.hash', 'crypto')
+def hash_password(password: str) -> str:
+    return _run(_hashpw, password.encode('utf-8'), _rounds)
+
+@traced('crypto.bcrypt.check', 'crypto')
+def check_password(password: str, hashed: str) -> bool:
+    return _run(_checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+def stats() -> dict:
+    return {
+        'rounds':    _rounds,
+        'workers':   BCRYPT_WORKERS,
+        'max_queue': BCRYPT_MAX_QUEUE,
+        'available': _slots._value,
+    }
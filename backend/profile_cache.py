@@ -0,0 +1,173 @@
+"""
+Cached GitHub profile fetches with conditional revalidation.
+
+fetch_github_profile() used to call api.github.com on every consistency check
+with a throwaway connection. Profiles are now served from:
+
+  1. an in-process LRU with a TTL (PROFILE_CACHE_SIZE entries, PROFILE_CACHE_TTL seconds)
+  2. optionally, the shared profile_cache table (PROFILE_CACHE_DB=True) so
+     every gunicorn worker benefits from one worker's fetch
+
+A stale entry is revalidated with If-None-Match / If-Modified-Since; GitHub
+answers 304 without counting it against the rate limit. If GitHub is
+unreachable or rate-limits us, the stale profile is served rather than nothing.
+
+All requests share one pooled requests.Session. GITHUB_API_URL can point at a
+local stub server for tests.
+"""
+
+import threading
+import time
+from urllib.parse import quote
+
+import requests
+
+from memory_cache import LRUCache
+from tracing import TracedAdapter
+from metrics import register_cache
+from config import GITHUB_API_URL, PROFILE_CACHE_TTL, PROFILE_CACHE_SIZE, PROFILE_CACHE_DB
+
+HTTP_TIMEOUT   = 5
+HTTP_POOL_SIZE = 10
+
+
+# ── HTTP session ───────────────────────────────────────────────────────────────
+
+_session      = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """One keep-alive session per process, shared by every profile fetch"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = TracedAdapter(pool_connections=2, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({'Accept': 'application/vnd.github+json'})
+                _session = session
+    return _session
+
+
+# ── In-process LRU ─────────────────────────────────────────────────────────────
+
+# No TTL here: stale entries are kept for revalidation, freshness is judged by _is_fresh
+_memory = LRUCache(PROFILE_CACHE_SIZE)
+register_cache('github_profile', _memory)
+
+
+# ── Shared Postgres cache ──────────────────────────────────────────────────────
+
+def _db_get(key):
+    from database import execute_query
+    row, error = execute_query(
+        """
+        SELECT profile, etag, last_modified, EXTRACT(EPOCH FROM fetched_at) AS fetched_at
+        FROM profile_cache WHERE cache_key = %s
+        """,
+        (key,),
+        fetchone=True
+    )
+    if error or not row:
+        return None
+    return {
+        'profile':       row['profile'] or {},
+        'etag':          row['etag'],
+        'last_modified': row['last_modified'],
+        'fetched_at':    float(row['fetched_at']),
+    }
+
+
+def _db_put(key, entry):
+    import json
+    from psycopg2.extras import Json
+    from database import execute_query
+    execute_query(
+        """
+        INSERT INTO profile_cache (cache_key, profile, etag, last_modified, fetched_at)
+        VALUES (%s, %s, %s, %s, to_timestamp(%s))
+        ON CONFLICT (cache_key) DO UPDATE SET
+            profile       = EXCLUDED.profile,
+            etag          = EXCLUDED.etag,
+            last_modified = EXCLUDED.last_modified,
+            fetched_at    = EXCLUDED.fetched_at
+        """,
+        (key, Json(entry['profile'], dumps=json.dumps), entry['etag'], entry['last_modified'], entry['fetched_at']),
+        commit=True
+    )
+
+
+def _store(key, entry):
+    _memory.put(key, entry)
+    if PROFILE_CACHE_DB:
+        _db_put(key, entry)
+
+
+# ── Public API ─────────────────────────────────────────────────────────────────
+
+def _is_fresh(entry):
+    return time.time() - entry['fetched_at'] < PROFILE_CACHE_TTL
+
+
+def get_github_profile(username: str) -> dict:
+    """Return the normalised GitHub profile for `username`, or {} if unavailable"""
+    if not username:
+        return {}
+
+    key   = f"github:{username.lower()}"
+    entry = _memory.get(key)
+    if entry is None and PROFILE_CACHE_DB:
+        entry = _db_get(key)
+        if entry is not None:
+            _memory.put(key, entry)
+    if entry is not None and _is_fresh(entry):
+        return entry['profile']
+
+    headers = {}
+    if entry is not None:
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    try:
+        res = get_session().get(
+            f"{GITHUB_API_URL}/users/{quote(username, safe='')}",
+            headers=headers,
+            timeout=HTTP_TIMEOUT
+        )
+    except requests.RequestException:
+        return entry['profile'] if entry else {}
+
+    if res.status_code == 304 and entry is not None:
+        entry = {**entry, 'fetched_at': time.time()}
+        _store(key, entry)
+        return entry['profile']
+
+    if res.status_code == 200:
+        data    = res.json()
+        profile = {
+            'username': data.get('login', ''),
+            'name':     data.get('name', ''),
+            'bio':      data.get('bio', ''),
+            'platform': 'GitHub'
+        }
+    elif res.status_code == 404:
+        profile = {}   # cache the miss too, so unknown names don't burn rate limit
+    else:
+        # Rate limited or GitHub error — serve stale data if we have it
+        return entry['profile'] if entry else {}
+
+    _store(key, {
+        'profile':       profile,
+        'etag':          res.headers.get('ETag'),
+        'last_modified': res.headers.get('Last-Modified'),
+        'fetched_at':    time.time(),
+    })
+    return profile
+
+
+def cache_stats() -> dict:
+    return _memory.stats()
@@ -0,0 +1,103 @@
+"""
+Content-addressed cache of rendered QR codes.
+
+A QR code depends only on its payload (anchor id + public key), so it never
+changes once rendered. get_qr_code() used to rebuild the matrix, render a PIL
+image, PNG-encode and base64 it on every request. Renderings are now keyed by
+sha256(payload) plus the format and served from:
+
+  1. an in-process LRU of rendered bytes (QR_CACHE_SIZE entries)
+  2. files under QR_CACHE_DIR, shared by every worker and kept across restarts
+
+The key doubles as a strong ETag, so clients revalidate with If-None-Match and
+get a 304 without anything being rendered or read from disk.
+"""
+
+import hashlib
+import os
+
+from memory_cache import LRUCache
+from utils import qr_payload, render_qr_png, render_qr_svg
+from metrics import register_cache
+from config import QR_CACHE_SIZE, QR_CACHE_DIR
+
+# Bump when the rendering parameters change so old files are not served
+RENDER_VERSION = 'v1'
+
+FORMATS = {
+    'png': ('image/png',     render_qr_png),
+    'svg': ('image/svg+xml', render_qr_svg),
+}
+
+
+class QRCode:
+    """One rendered QR code"""
+
+    __slots__ = ('key', 'fmt', 'body', 'mimetype')
+
+    def __init__(self, key, fmt, body):
+        self.key      = key
+        self.fmt      = fmt
+        self.body     = body
+        self.mimetype = FORMATS[fmt][0]
+
+    @property
+    def etag(self) -> str:
+        return self.key
+
+
+_memory = LRUCache(QR_CACHE_SIZE)   # key -> rendered bytes
+register_cache('qr', _memory)
+
+
+def cache_key(anchor_id, public_key_b64, fmt='png') -> str:
+    """Content hash of the payload, rendering version and format — also the ETag"""
+    digest = hashlib.sha256(RENDER_VERSION.encode() + b'\0' + qr_payload(public_key_b64, anchor_id))
+    return f"{digest.hexdigest()[:40]}-{fmt}"
+
+
+def _path(key):
+    return os.path.join(QR_CACHE_DIR, key[:2], key)
+
+def _read_disk(key):
+    if not QR_CACHE_DIR:
+        return None
+    try:
+        with open(_path(key), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _write_disk(key, body):
+    """Atomic write — concurrent workers rendering the same code both succeed"""
+    if not QR_CACHE_DIR:
+        return
+    path = _path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(body)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"QR cache write failed: {e}")
+
+
+def get_qr(anchor_id, public_key_b64, fmt='png') -> QRCode:
+    """The rendered QR code for an identity, rendering it at most once"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported QR format: {fmt}")
+
+    key  = cache_key(anchor_id, public_key_b64, fmt)
+    body = _memory.get(key)
+    if body is None:
+        body = _read_disk(key)
+        if body is None:
+            body = FORMATS[fmt][1](qr_payload(public_key_b64, anchor_id))
+            _write_disk(key, body)
+        _memory.put(key, body)
+    return QRCode(key, fmt, body)
+
+
+def stats() -> dict:
+    return {'entries': len(_memory), 'hits': _memory.hits, 'misses': _memory.misses}
@@ -0,0 +1,157 @@
+"""
+App-wide response layer: compression, ETags and conditional GETs.
+
+Every JSON payload used to go out uncompressed and in full on every poll —
+the verifications and reputation-events lists are re-fetched constantly by the
+dashboard even when nothing changed. init_app(app) installs an after_request
+hook that, for GET/HEAD 200 responses:
+
+  1. adds a weak ETag (blake2b of the body) unless the view set its own, and
+     answers a matching If-None-Match with an empty 304
+  2. compresses bodies of at least COMPRESS_MIN_SIZE bytes with brotli (when the
+     optional `brotli` package is installed) or gzip, whichever the client
+     prefers, for compressible content types
+  3. gives static frontend files a Cache-Control: HTML revalidates every time,
+     assets requested with a ?v= version are cached for STATIC_MAX_AGE seconds,
+     and unversioned ones revalidate against their ETag
+
+send_html() serves a frontend page with its local script/stylesheet URLs
+stamped with ?v=<content hash>, so a new page never runs against stale
+cached JS or CSS.
+
+Streamed responses (exports) are left alone — they manage their own encoding.
+
+init_app also installs APIJSONProvider, so jsonify writes datetimes as UTC
+ISO-8601 — the form the SQL-built payloads use (utils.CLAIM_TIMESTAMP_SQL) —
+instead of Flask's RFC 1123 default.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+from datetime import date, datetime
+
+from flask import Response, request
+from flask.json.provider import DefaultJSONProvider
+
+from config import COMPRESS_MIN_SIZE, COMPRESS_LEVEL, BROTLI_QUALITY, STATIC_MAX_AGE
+from utils import claim_timestamp
+
+try:
+    import brotli
+except ImportError:   # optional — gzip only
+    brotli = None
+
+COMPRESSIBLE = (
+    'application/json', 'application/javascript', 'application/x-ndjson',
+    'image/svg+xml', 'text/',
+)
+
+STATIC_ENDPOINTS = {'serve_index', 'serve_login', 'serve_static', 'static'}
+
+# <script src="x.js"> / <link href="x.css"> pointing at a local file
+ASSET_RE = re.compile(r'(<(?:script|link)\b[^>]*?\b(?:src|href)=")([\w./-]+\.(?:js|css))(")')
+
+# Static files bigger than this are sent as-is rather than read into memory to compress
+STATIC_COMPRESS_MAX = 2 * 1024 * 1024
+
+
+def _encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def _compressible(response) -> bool:
+    mimetype = response.mimetype or ''
+    return any(mimetype.startswith(prefix) for prefix in COMPRESSIBLE)
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0)
+
+def body_etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class APIJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider with datetimes as UTC ISO-8601 rather than RFC 1123"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, datetime):
+            return claim_timestamp(o)
+        if isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+
+def _asset_version(path) -> str:
+    with open(path, 'rb') as f:
+        return body_etag(f.read())[:12]
+
+def send_html(directory, filename):
+    """A frontend page with ?v=<content hash> on each local asset URL"""
+    with open(os.path.join(directory, filename), encoding='utf-8') as f:
+        html = f.read()
+
+    def stamp(match):
+        path = os.path.join(directory, match.group(2))
+        if not os.path.isfile(path):
+            return match.group(0)
+        return f'{match.group(1)}{match.group(2)}?v={_asset_version(path)}{match.group(3)}'
+
+    return Response(ASSET_RE.sub(stamp, html), mimetype='text/html')
+
+
+def _static_cache_control(response):
+    # Overwrites the header: send_file always sets its own `no-cache`
+    if response.mimetype == 'text/html' or 'v' not in request.args:
+        response.headers['Cache-Control'] = 'no-cache'
+    else:
+        response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}'
+
+
+def process_response(response):
+    if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+        return response
+
+    if request.endpoint in STATIC_ENDPOINTS:
+        _static_cache_control(response)
+        # send_from_directory streams the file; small text assets are read in so they can be compressed
+        if not _compressible(response) or (response.content_length or 0) > STATIC_COMPRESS_MAX:
+            return response
+        response.direct_passthrough = False
+    elif response.is_streamed or response.direct_passthrough:
+        return response
+
+    body = response.get_data()
+
+    # 1. ETag / If-None-Match
+    etag, _ = response.get_etag()
+    if etag is None:
+        response.set_etag(body_etag(body), weak=True)
+        if 'Cache-Control' not in response.headers:
+            response.headers['Cache-Control'] = 'private, no-cache'
+    if response.make_conditional(request).status_code == 304:
+        return response
+
+    # 2. Compression
+    response.vary.add('Accept-Encoding')
+    if len(body) < COMPRESS_MIN_SIZE or not _compressible(response) or 'Content-Encoding' in response.headers:
+        return response
+    encoding = request.accept_encodings.best_match(_encodings())
+    if not encoding:
+        return response
+
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # A strong validator must differ between encodings; weak ones may be shared
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    app.json = APIJSONProvider(app)
+    app.after_request(process_response)
@@ -1,10 +1,12 @@
 """API route handlers"""
-from flask import jsonify, request
+from flask import jsonify, request, Response
 from datetime import datetime
 import re
+import json
 from models import Identity, Verification, ConsistencyCheck, ReputationEvent
 from database import execute_query
-from auth import hash_password, check_password, generate_token
+from auth import hash_password, check_password, needs_rehash, HasherBusy, generate_token, bearer_token, revoke_token
+from pagination import parse_page_args
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
 
@@ -14,6 +16,16 @@ def success_response(data):
 def error_response(message, status=400):
     return jsonify({'success': False, 'error': message}), status
 
+def json_body():
+    """The request's JSON object — None if the body is missing, malformed or not an object"""
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else None
+
+def busy_response(message='Server busy, please retry shortly'):
+    response = jsonify({'success': False, 'error': message})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 ALLOWED_PLATFORMS = {'Instagram', 'LinkedIn', 'X', 'Facebook', 'GitHub', 'Kaggle', 'Google'}
 ALLOWED_EVENT_TYPES = {'successful_verification', 'suspicious_activity', 'profile_update', 're_verification'}
 
@@ -44,7 +56,7 @@ def is_valid_password(password):
 # ── Auth ───────────────────────────────────────────────────────────────────────
 
 def register():
-    data = request.get_json()
+    data = json_body()
     if not data:
         return error_response('Request body must be JSON')
 
@@ -82,6 +94,11 @@ def register():
     if existing:
         return error_response('Email or username already taken')
 
+    try:
+        password_hash = hash_password(password)
+    except HasherBusy as e:
+        return busy_response(str(e))
+
     # Create user
     user, error = execute_query(
         """
@@ -89,7 +106,7 @@ def register():
         VALUES (%s, %s, %s)
         RETURNING user_id, username, email, created_at
         """,
-        (username, email, hash_password(password)),
+        (username, email, password_hash),
         fetchone=True,
         commit=True
     )
@@ -101,7 +118,7 @@ def register():
 
 
 def login():
-    data = request.get_json()
+    data = json_body()
     if not data:
         return error_response('Request body must be JSON')
 
@@ -123,8 +140,19 @@ def login():
     if error or not user:
         return error_response('Invalid email or password', 401)
 
-    if not check_password(password, user['password_hash']):
-        return error_response('Invalid email or password', 401)
+    try:
+        if not check_password(password, user['password_hash']):
+            return error_response('Invalid email or password', 401)
+
+        # Upgrade hashes made with an older, cheaper cost factor
+        if needs_rehash(user['password_hash']):
+            execute_query(
+                "UPDATE users SET password_hash = %s WHERE user_id = %s",
+                (hash_password(password), user['user_id']),
+                commit=True
+            )
+    except HasherBusy as e:
+        return busy_response(str(e))
 
     token = generate_token(user['user_id'], user['username'])
     return success_response({
@@ -136,6 +164,12 @@ def login():
         }
     })
 
+def logout():
+    error = revoke_token(bearer_token())
+    if error:
+        return error_response(f'Failed to revoke token: {error}', 500)
+    return success_response({'message': 'Logged out'})
+
 # ── Statistics ─────────────────────────────────────────────────────────────────
 
 def get_statistics():
@@ -162,49 +196,144 @@ def create_identity():
 
 def get_identities():
     user_id = request.user.get('user_id')
-    identities, error = Identity.get_all(user_id=user_id)
+    page, error = parse_page_args(request.args, Identity.LIST_FIELDS)
+    if error:
+        return error_response(error)
+    identities, next_cursor, error = Identity.get_all(page, user_id=user_id)
     if error:
         return error_response(error, 500)
-    return success_response({'identities': [dict(i) for i in identities]})
+    return success_response({'identities': identities, 'next_cursor': next_cursor})
 
 def search_identities():
     term = request.args.get('q', '').strip()
     if not term:
         return error_response('Search term is required')
-    identities, error = Identity.search(term)
+    try:
+        limit = int(request.args.get('limit', 20))
+    except (ValueError, TypeError):
+        return error_response('limit must be an integer')
+    identities, error = Identity.search(term, limit)
     if error:
         return error_response(error, 500)
-    return success_response({'identities': [dict(i) for i in identities]})
+    return success_response({'identities': identities})
+
+def find_lookalikes():
+    """Connected accounts whose usernames are within ?max_distance= edits of ?username="""
+    import lookalikes
+    username = request.args.get('username', '').strip()
+    if not username:
+        return error_response('username is required')
+    try:
+        k     = int(request.args['max_distance']) if 'max_distance' in request.args else None
+        limit = min(int(request.args.get('limit', 50)), 500)
+    except (ValueError, TypeError):
+        return error_response('max_distance and limit must be integers')
+    try:
+        matches = lookalikes.find(username, k, limit)
+    except ValueError as e:
+        return error_response(str(e))
+    if matches is None:
+        return busy_response('Lookalike index is still loading')
+    return success_response({'username': lookalikes.normalise(username), 'matches': matches})
+
+def json_text_response(fields, **extra):
+    """
+    Success response around a JSON object that is already serialised (e.g. built
+    by Postgres) — its members are spliced in as-is, without decoding them.
+    """
+    head = json.dumps({'success': True, **extra})
+    body = head[:-1] + ', ' + fields[1:] if fields != '{}' else head
+    return Response(body, mimetype='application/json')
 
 def get_identity_details(anchor_id):
     data, error = Identity.get_details(anchor_id)
     if error:
         return error_response(error, 404 if 'not found' in error.lower() else 500)
-    return success_response({
-        'identity':      dict(data['identity']),
-        'verifications': [dict(v) for v in data['verifications']],
-        'events':        [dict(e) for e in data['events']]
-    })
+    return json_text_response(data['details'])
+
+def streamed_export(scope, anchor_id=None, user_id=None):
+    """Streaming NDJSON/CSV response for ?format=ndjson|csv, gzip-encoded when the client accepts it"""
+    import psycopg2
+    import exporter
+    from flask import stream_with_context
+    from database import PoolTimeout
+
+    fmt = request.args.get('format', 'ndjson').lower()
+    if fmt not in exporter.FORMATS:
+        return error_response(f'format must be one of: {", ".join(exporter.FORMATS)}')
+
+    gzip     = 'gzip' in request.headers.get('Accept-Encoding', '') and request.args.get('gzip', '1') != '0'
+    try:
+        # The first batch is fetched before responding, so failures get a JSON error
+        chunks = exporter.prefetch(exporter.stream_export(fmt, scope, anchor_id=anchor_id, user_id=user_id, gzip=gzip))
+    except PoolTimeout as e:
+        return busy_response(str(e))
+    except psycopg2.Error as e:
+        return error_response(f'Export failed: {e}', 500)
+
+    name     = f"identity_{anchor_id}" if scope == 'anchor' else f"identities_{scope}"
+    response = Response(stream_with_context(chunks), mimetype=exporter.FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{name}_export_{datetime.now():%Y-%m-%d}.{fmt}"'
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
 
 def export_identity(anchor_id):
+    if request.args.get('format'):
+        identity, error = execute_query("SELECT 1 FROM identity_anchors WHERE anchor_id = %s", (anchor_id,), fetchone=True)
+        if error or not identity:
+            return error_response(error or 'Identity not found', 500 if error else 404)
+        return streamed_export('anchor', anchor_id=anchor_id)
+
     data, error = Identity.get_details(anchor_id)
     if error:
         return error_response(error, 404 if 'not found' in error.lower() else 500)
-    return success_response({
-        'data': {
-            'export_date':   datetime.now().isoformat(),
-            'identity':      dict(data['identity']),
-            'verifications': [dict(v) for v in data['verifications']],
-            'events':        [dict(e) for e in data['events']],
-            'statistics': {
-                'total_verifications': len(data['verifications']),
-                'total_events':        len(data['events'])
-            }
-        }
+    statistics = json.dumps({
+        'total_verifications': data['total_verifications'],
+        'total_events':        data['total_events']
     })
+    export_date = json.dumps(datetime.now().isoformat())
+    return json_text_response(
+        f'{{"data": {{"export_date": {export_date}, {data["details"][1:-1]}, "statistics": {statistics}}}}}'
+    )
+
+def export_identities():
+    """Bulk streaming export — ?scope=user (your identities, default) or ?scope=all"""
+    scope = request.args.get('scope', 'user')
+    if scope not in ('user', 'all'):
+        return error_response('scope must be one of: user, all')
+    return streamed_export(scope, user_id=request.user.get('user_id'))
+
+def get_identity_cluster(anchor_id):
+    """Identities the clustering job linked to this one, with the evidence"""
+    import clustering
+    identity, error = execute_query("SELECT 1 FROM identity_anchors WHERE anchor_id = %s", (anchor_id,), fetchone=True)
+    if error or not identity:
+        return error_response(error or 'Identity not found', 500 if error else 404)
+    cluster, error = clustering.get_cluster(anchor_id)
+    if error:
+        return error_response(error, 500)
+    return success_response({'cluster': cluster})
 
 def get_trust_history(anchor_id):
-    data, error = Identity.get_trust_history(anchor_id)
+    """Score history over ?from=&to= (ISO-8601 or unix seconds, UTC) at ?resolution=auto|raw|hour|day"""
+    from trust_history import parse_time, RESOLUTIONS
+
+    resolution = request.args.get('resolution', 'auto').lower()
+    if resolution != 'auto' and resolution not in RESOLUTIONS:
+        return error_response(f'resolution must be one of: auto, {", ".join(RESOLUTIONS)}')
+    try:
+        start = parse_time(request.args.get('from'))
+        end   = parse_time(request.args.get('to'))
+    except ValueError:
+        return error_response("'from' and 'to' must be ISO-8601 timestamps or unix seconds")
+
+    if start and end and start >= end:
+        return error_response("'from' must be before 'to'")
+
+    data, error = Identity.get_trust_history(anchor_id, start, end, resolution)
     if error:
         return error_response(error, 404 if 'not found' in error.lower() else 500)
     return success_response(data)
@@ -212,7 +341,10 @@ def get_trust_history(anchor_id):
 # ── Verification ───────────────────────────────────────────────────────────────
 
 def add_verification():
-    data      = request.get_json()
+    data = json_body()
+    if data is None:
+        return error_response('Request body must be a JSON object')
+
     anchor_id = data.get('anchor_id')
     platform  = data.get('platform_name', '').strip()
     url       = data.get('profile_url', '').strip()
@@ -253,15 +385,21 @@ def add_verification():
     return success_response({'verification': dict(verification)})
 
 def get_verifications():
-    verifications, error = Verification.get_all()
+    page, error = parse_page_args(request.args, Verification.LIST_FIELDS)
+    if error:
+        return error_response(error)
+    verifications, next_cursor, error = Verification.get_all(page)
     if error:
         return error_response(error, 500)
-    return success_response({'verifications': [dict(v) for v in verifications]})
+    return success_response({'verifications': verifications, 'next_cursor': next_cursor})
 
 # ── Consistency Check ──────────────────────────────────────────────────────────
 
 def run_consistency_check():
-    data            = request.get_json()
+    data = json_body()
+    if data is None:
+        return error_response('Request body must be a JSON object')
+
     identity_anchor = data.get('identity_anchor', '').strip() if data.get('identity_anchor') else None
     platform_a      = data.get('platform_a', '').strip()
     platform_b      = data.get('platform_b', '').strip()
@@ -280,11 +418,55 @@ def run_consistency_check():
         return error_response(error, 500)
     return success_response({'check': dict(check)})
 
+MAX_BATCH_PAIRS = 5000
+
+def run_batch_consistency_check():
+    """Score and store many profile pairs in one request"""
+    data = json_body()
+    if data is None:
+        return error_response('Request body must be a JSON object')
+
+    identity_anchor = str(data.get('identity_anchor') or '').strip()
+    raw_pairs       = data.get('pairs')
+
+    if not identity_anchor or not isinstance(raw_pairs, list) or not raw_pairs:
+        return error_response('Missing required fields: identity_anchor, pairs')
+
+    if len(raw_pairs) > MAX_BATCH_PAIRS:
+        return error_response(f'Too many pairs (max {MAX_BATCH_PAIRS} per request)')
+
+    pairs = []
+    for i, pair in enumerate(raw_pairs):
+        profile_a = pair.get('profile_a') if isinstance(pair, dict) else None
+        profile_b = pair.get('profile_b') if isinstance(pair, dict) else None
+        if not isinstance(profile_a, dict) or not isinstance(profile_b, dict):
+            return error_response(f'pairs[{i}] must contain profile_a and profile_b objects')
+
+        platform_a = str(profile_a.get('platform') or '').strip()
+        platform_b = str(profile_b.get('platform') or '').strip()
+        if platform_a not in ALLOWED_PLATFORMS or platform_b not in ALLOWED_PLATFORMS:
+            return error_response(f'pairs[{i}]: invalid platform. Allowed: {", ".join(ALLOWED_PLATFORMS)}')
+        if platform_a == platform_b:
+            return error_response(f'pairs[{i}]: platform A and platform B must be different')
+
+        pairs.append((
+            {**profile_a, 'platform': platform_a},
+            {**profile_b, 'platform': platform_b},
+        ))
+
+    checks, error = ConsistencyCheck.create_batch(identity_anchor, pairs)
+    if error:
+        return error_response(error, 500)
+    return success_response({'checks': checks, 'count': len(checks)})
+
 def get_consistency_checks():
-    checks, error = ConsistencyCheck.get_all()
+    page, error = parse_page_args(request.args, ConsistencyCheck.LIST_FIELDS)
+    if error:
+        return error_response(error)
+    checks, next_cursor, error = ConsistencyCheck.get_all(page)
     if error:
         return error_response(error, 500)
-    return success_response({'checks': [dict(c) for c in checks]})
+    return success_response({'checks': checks, 'next_cursor': next_cursor})
 
 def get_consistency_report(check_id):
     """Return detailed breakdown of a consistency check"""
@@ -315,73 +497,153 @@ def get_consistency_report(check_id):
 
 # ── Reputation Events ──────────────────────────────────────────────────────────
 
-def log_reputation_event():
-    data         = request.get_json()
+def parse_event(data):
+    """Validate one reputation event payload — returns (event, error)"""
+    if not isinstance(data, dict):
+        return None, 'Event must be an object'
+
     anchor_id    = data.get('anchor_id')
-    event_type   = data.get('event_type', '').strip()
-    platform     = data.get('platform', '').strip()
+    event_type   = str(data.get('event_type') or '').strip()
+    platform     = str(data.get('platform') or '').strip()
     score_impact = data.get('score_impact', 0)
 
     if not all([anchor_id, event_type]):
-        return error_response('Missing required fields: anchor_id, event_type')
+        return None, 'Missing required fields: anchor_id, event_type'
 
     try:
         anchor_id = int(anchor_id)
     except (ValueError, TypeError):
-        return error_response('anchor_id must be a positive integer')
+        return None, 'anchor_id must be a positive integer'
 
     if anchor_id <= 0:
-        return error_response('anchor_id must be a positive integer')
-
-    user_id = request.user.get('user_id')
-    owner, _ = execute_query(
-        'SELECT anchor_id FROM identity_anchors WHERE anchor_id = %s AND user_id = %s',
-        (anchor_id, user_id),
-        fetchone=True
-    )
-    if not owner:
-        return error_response('You do not own this identity anchor', 403)
+        return None, 'anchor_id must be a positive integer'
 
     if event_type not in ALLOWED_EVENT_TYPES:
-        return error_response(f'Invalid event_type. Allowed: {", ".join(ALLOWED_EVENT_TYPES)}')
+        return None, f'Invalid event_type. Allowed: {", ".join(ALLOWED_EVENT_TYPES)}'
 
     if platform and platform not in ALLOWED_PLATFORMS:
-        return error_response(f'Invalid platform. Allowed: {", ".join(ALLOWED_PLATFORMS)}')
+        return None, f'Invalid platform. Allowed: {", ".join(ALLOWED_PLATFORMS)}'
 
     try:
         score_impact = float(score_impact)
     except (ValueError, TypeError):
-        return error_response('score_impact must be a number')
+        return None, 'score_impact must be a number'
 
     if not (-100 <= score_impact <= 100):
-        return error_response('score_impact must be between -100 and 100')
+        return None, 'score_impact must be between -100 and 100'
+
+    return {'anchor_id': anchor_id, 'event_type': event_type, 'platform': platform, 'score_impact': score_impact}, None
+
+def log_reputation_event():
+    event, error = parse_event(request.get_json(silent=True))
+    if error:
+        return error_response(error)
+
+    user_id = request.user.get('user_id')
+    owner, _ = execute_query(
+        'SELECT anchor_id FROM identity_anchors WHERE anchor_id = %s AND user_id = %s',
+        (event['anchor_id'], user_id),
+        fetchone=True
+    )
+    if not owner:
+        return error_response('You do not own this identity anchor', 403)
 
-    event, error = ReputationEvent.create(anchor_id, event_type, platform, score_impact)
+    event, error = ReputationEvent.create(event['anchor_id'], event['event_type'], event['platform'], event['score_impact'])
     if error:
         return error_response(error, 404 if 'not found' in error.lower() else 500)
     return success_response({'event': dict(event)})
 
+MAX_BATCH_EVENTS = 5000
+
+def log_reputation_events_batch():
+    """
+    Ingest many events in one request. Deltas are coalesced per anchor and
+    committed per the durability mode (body "durability": sync|group|async,
+    default from config); async answers 202 before the events are written.
+    """
+    import event_ingest
+
+    data = json_body()
+    if data is None:
+        return error_response('Request body must be a JSON object')
+
+    raw_events = data.get('events')
+    durability = data.get('durability')
+
+    if not isinstance(raw_events, list) or not raw_events:
+        return error_response('Missing required field: events')
+
+    if len(raw_events) > MAX_BATCH_EVENTS:
+        return error_response(f'Too many events (max {MAX_BATCH_EVENTS} per request)')
+
+    if durability is not None and durability not in event_ingest.DURABILITY_MODES:
+        return error_response(f'durability must be one of: {", ".join(event_ingest.DURABILITY_MODES)}')
+
+    events = []
+    for i, raw in enumerate(raw_events):
+        event, error = parse_event(raw)
+        if error:
+            return error_response(f'events[{i}]: {error}')
+        events.append(event)
+
+    # Every anchor in the batch must belong to the caller — one query for all of them
+    anchor_ids = sorted({event['anchor_id'] for event in events})
+    owned, error = execute_query(
+        'SELECT anchor_id FROM identity_anchors WHERE anchor_id = ANY(%s) AND user_id = %s',
+        (anchor_ids, request.user.get('user_id'))
+    )
+    if error:
+        return error_response(error, 500)
+    not_owned = set(anchor_ids) - {row['anchor_id'] for row in owned}
+    if not_owned:
+        return error_response(f'You do not own identity anchor(s): {", ".join(map(str, sorted(not_owned)))}', 403)
+
+    result, error = event_ingest.ingest(events, durability)
+    if error:
+        return error_response(error, 500)
+    if not result['committed']:
+        response = success_response({'accepted': result['count']})
+        return response, 202
+    return success_response(result)
+
 def get_reputation_events():
-    events, error = ReputationEvent.get_all()
+    page, error = parse_page_args(request.args, ReputationEvent.LIST_FIELDS)
+    if error:
+        return error_response(error)
+    events, next_cursor, error = ReputationEvent.get_all(page)
     if error:
         return error_response(error, 500)
-    return success_response({'events': [dict(e) for e in events]})
+    return success_response({'events': events, 'next_cursor': next_cursor})
 
 # ── Health ─────────────────────────────────────────────────────────────────────
 
 def health_check():
-    from database import get_connection
-    conn = get_connection()
-    if conn:
-        conn.close()
-        return success_response({'status': 'healthy', 'message': 'Database connection OK'})
-    return error_response('Database connection failed', 500)
+    from database import health_check as db_health_check
+    import keypool
+    ok, pool = db_health_check()
+    if ok:
+        return success_response({'status': 'healthy', 'message': 'Database connection OK', 'pool': pool, 'keypool': keypool.stats()})
+    return jsonify({'success': False, 'error': 'Database connection failed', 'pool': pool, 'keypool': keypool.stats()}), 500
+
+QR_IMMUTABLE = 'private, max-age=31536000, immutable'
 
 def get_qr_code(anchor_id):
-    """Generate and return a QR code for an identity's public key"""
-    from utils import generate_qr_code_base64
+    """
+    QR code for an identity's public key. ?format=png|svg returns the raw image;
+    without it, JSON with a base64 data URL. Both carry a strong content ETag.
+    """
+    import base64
+    import qr_cache
+
+    fmt = request.args.get('format', '').lower()
+    if fmt and fmt not in qr_cache.FORMATS:
+        return error_response(f'format must be one of: {", ".join(qr_cache.FORMATS)}')
 
-    identity, error = Identity.get_by_id(anchor_id)
+    identity, error = execute_query(
+        "SELECT anchor_id, user_pub_key, public_key_b64 FROM identity_anchors WHERE anchor_id = %s",
+        (anchor_id,),
+        fetchone=True
+    )
     if error or not identity:
         return error_response('Identity not found', 404)
 
@@ -389,18 +651,38 @@ def get_qr_code(anchor_id):
     if not public_key_b64:
         return error_response('This identity has no cryptographic key yet. Re-create it to get one.', 400)
 
-    qr_base64 = generate_qr_code_base64(public_key_b64, anchor_id)
-    return success_response({
-        'anchor_id':      anchor_id,
-        'public_key':     identity['user_pub_key'],
-        'public_key_b64': public_key_b64,
-        'qr_code':        f"data:image/png;base64,{qr_base64}"
-    })
+    # Revalidation needs only the key — nothing is rendered or read for a 304
+    etag = qr_cache.cache_key(anchor_id, public_key_b64, fmt or 'png')
+    if fmt:
+        cache_control = QR_IMMUTABLE
+    else:
+        etag, cache_control = f'{etag}-json', 'private, no-cache'
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif fmt:
+        qr       = qr_cache.get_qr(anchor_id, public_key_b64, fmt)
+        response = Response(qr.body, mimetype=qr.mimetype)
+    else:
+        qr       = qr_cache.get_qr(anchor_id, public_key_b64, 'png')
+        response = success_response({
+            'anchor_id':      anchor_id,
+            'public_key':     identity['user_pub_key'],
+            'public_key_b64': public_key_b64,
+            'qr_code':        f"data:image/png;base64,{base64.b64encode(qr.body).decode()}",
+            'qr_png_url':     f"{request.path}?format=png",
+            'qr_svg_url':     f"{request.path}?format=svg",
+        })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
 
 
 def verify_claim():
     """Verify a verification signature — proves a claim hasn't been tampered with"""
-    data         = request.get_json()
+    data = json_body()
+    if data is None:
+        return error_response('Request body must be a JSON object')
+
     anchor_id    = data.get('anchor_id')
     platform     = data.get('platform')
     profile_url  = data.get('profile_url')
@@ -410,6 +692,13 @@ def verify_claim():
     if not all([anchor_id, platform, profile_url, verified_at, signature]):
         return error_response('Missing fields: anchor_id, platform, profile_url, verified_at, signature')
 
+    try:
+        anchor_id = int(anchor_id)
+    except (ValueError, TypeError):
+        return error_response('anchor_id must be a positive integer')
+    if anchor_id <= 0:
+        return error_response('anchor_id must be a positive integer')
+
     valid, error = Verification.verify_claim(anchor_id, platform, profile_url, verified_at, signature)
     if error:
         return error_response(error, 404)
@@ -421,10 +710,55 @@ def verify_claim():
     })
 
 
+MAX_BATCH_CLAIMS = 1000
+CLAIM_FIELDS     = ('anchor_id', 'platform', 'profile_url', 'verified_at', 'signature')
+
+def verify_claims_batch():
+    """Verify many claim signatures in one pass — per-claim results, in request order"""
+    data = json_body()
+    if data is None:
+        return error_response('Request body must be a JSON object')
+
+    raw_claims = data.get('claims')
+    parallel   = data.get('parallel', True) is not False
+
+    if not isinstance(raw_claims, list) or not raw_claims:
+        return error_response('Missing required field: claims')
+
+    if len(raw_claims) > MAX_BATCH_CLAIMS:
+        return error_response(f'Too many claims (max {MAX_BATCH_CLAIMS} per request)')
+
+    claims = []
+    for i, claim in enumerate(raw_claims):
+        if not isinstance(claim, dict) or not all(claim.get(field) for field in CLAIM_FIELDS):
+            return error_response(f'claims[{i}] is missing fields: {", ".join(CLAIM_FIELDS)}')
+        try:
+            anchor_id = int(claim['anchor_id'])
+        except (ValueError, TypeError):
+            return error_response(f'claims[{i}]: anchor_id must be a positive integer')
+        claims.append({**claim, 'anchor_id': anchor_id})
+
+    results, error = Verification.verify_claims(claims, parallel=parallel)
+    if error:
+        return error_response(error, 500)
+
+    valid = sum(1 for result in results if result['valid'])
+    return success_response({
+        'results': [{'index': i, 'anchor_id': claim['anchor_id'], **result}
+                    for i, (claim, result) in enumerate(zip(claims, results))],
+        'count':   len(results),
+        'valid':   valid,
+        'invalid': len(results) - valid,
+    })
+
+
 def store_on_blockchain():
-    """Store a verification hash on Polygon Amoy"""
-    from blockchain import store_verification_on_chain
-    data = request.get_json()
+    """Queue a verification for batched anchoring on Polygon Amoy — returns 202 with a job id"""
+    from anchoring import enqueue
+    data = json_body()
+    if data is None:
+        return error_response('Request body must be a JSON object')
+
     verification_id = data.get('verification_id')
     anchor_id       = data.get('anchor_id')
     platform        = data.get('platform')
@@ -433,17 +767,35 @@ def store_on_blockchain():
     if not all([verification_id, anchor_id, platform, profile_url]):
         return error_response('verification_id, anchor_id, platform and profile_url are required')
 
-    result = store_verification_on_chain(verification_id, anchor_id, platform, profile_url)
-    if not result['success']:
-        return error_response(result.get('error', 'Blockchain error'), 500)
+    try:
+        verification_id = int(verification_id)
+    except (ValueError, TypeError):
+        return error_response('verification_id must be a positive integer')
 
-    # Save tx_hash to database
-    execute_query(
-        "UPDATE platform_verifications SET tx_hash = %s WHERE verification_id = %s",
-        (result.get('tx_hash'), verification_id),
-        commit=True
+    # The leaf hash is built from the stored row, so reject mismatched details up front
+    stored, _ = execute_query(
+        "SELECT anchor_id, platform_name, profile_url FROM platform_verifications WHERE verification_id = %s",
+        (verification_id,),
+        fetchone=True
     )
-    return success_response(result)
+    if not stored:
+        return error_response('Verification not found', 404)
+    if (str(stored['anchor_id']), stored['platform_name'], stored['profile_url']) != (str(anchor_id), platform, profile_url):
+        return error_response('anchor_id, platform and profile_url do not match the stored verification')
+
+    job, error = enqueue(verification_id)
+    if error:
+        return error_response(error, 404 if 'not found' in error.lower() else 500)
+    return jsonify({'success': True, 'job': job, 'job_id': job['job_id'], 'status': job['status']}), 202
+
+
+def get_anchor_job(job_id):
+    """Status of a queued anchoring job, with its Merkle proof once batched"""
+    from anchoring import get_job
+    job, error = get_job(job_id)
+    if error:
+        return error_response(error, 404 if 'not found' in error.lower() else 500)
+    return success_response({'job': job})
 
 
 def blockchain_status():
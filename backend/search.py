@@ -0,0 +1,107 @@
+"""
+Identity search backed by indexes instead of a sequential LIKE scan.
+
+Two paths, tried in order until the result limit is filled:
+  1. Exact anchor id     — a numeric term goes straight to the primary key
+  2. Public key match    — a hex term is matched against user_pub_key
+       a. prefix     — LIKE 'term%'   via idx_anchors_pub_key_prefix (varchar_pattern_ops)
+       b. substring  — LIKE '%term%'  via idx_anchors_pub_key_trgm (pg_trgm GIN),
+                       only for terms of 3+ characters (shorter ones have no trigram)
+
+Results are ranked by path (exact id, then prefix, then substring) and newest
+first within a path, and every query is LIMITed.
+"""
+
+import re
+from database import execute_query
+
+DEFAULT_LIMIT   = 20
+MAX_LIMIT       = 100
+MIN_TRIGRAM_LEN = 3
+
+HEX_RE = re.compile(r'^[0-9a-f]+$')
+
+RESULT_COLUMNS = "anchor_id, user_pub_key, trust_score, created_at"
+
+
+def _exact_anchor(term):
+    anchor_id = int(term)
+    if anchor_id > 2_147_483_647:   # SERIAL range — avoid an out-of-range error
+        return [], None
+    return execute_query(
+        f"SELECT {RESULT_COLUMNS} FROM identity_anchors WHERE anchor_id = %s",
+        (anchor_id,)
+    )
+
+
+def _key_prefix(term, limit):
+    return execute_query(
+        f"""
+        SELECT {RESULT_COLUMNS}
+        FROM identity_anchors
+        WHERE user_pub_key LIKE %s
+        ORDER BY created_at DESC
+        LIMIT %s
+        """,
+        (term + '%', limit)
+    )
+
+
+def _key_substring(term, limit):
+    return execute_query(
+        f"""
+        SELECT {RESULT_COLUMNS}
+        FROM identity_anchors
+        WHERE user_pub_key LIKE %s
+          AND user_pub_key NOT LIKE %s
+        ORDER BY created_at DESC
+        LIMIT %s
+        """,
+        ('%' + term + '%', term + '%', limit)
+    )
+
+
+def search_identities(term, limit=DEFAULT_LIMIT):
+    """
+    Search identities by anchor id or public key fragment.
+    Returns (rows, error); each row carries a `match` field naming the path that found it.
+    """
+    term  = term.strip().lower()
+    limit = max(1, min(limit, MAX_LIMIT))
+    results, seen = [], set()
+
+    def collect(rows, match):
+        for row in rows or []:
+            if row['anchor_id'] in seen:
+                continue
+            seen.add(row['anchor_id'])
+            row['match'] = match
+            results.append(row)
+
+    # str.isdigit() also accepts non-ASCII digits such as "²", which int() rejects
+    if term.isascii() and term.isdigit():
+        rows, error = _exact_anchor(term)
+        if error:
+            return None, error
+        collect(rows, 'anchor_id')
+
+    if not HEX_RE.match(term):
+        return results[:limit], None
+
+    # Prefix and substring matches are disjoint, but the exact-id row can turn
+    # up again in either, so each asks for that many rows more than it needs
+    exact = len(results)
+
+    if len(results) < limit:
+        rows, error = _key_prefix(term, limit - len(results) + exact)
+        if error:
+            return None, error
+        collect(rows, 'key_prefix')
+
+    if len(results) < limit and len(term) >= MIN_TRIGRAM_LEN:
+        rows, error = _key_substring(term, limit - len(results) + exact)
+        if error:
+            return None, error
+        collect(rows, 'key_substring')
+
+    return results[:limit], None
@@ -0,0 +1,195 @@
+"""
+Signing and verification service for verification claims.
+
+utils.sign_verification_claim() Fernet-decrypts the private key, rebuilds an
+Ed25519PrivateKey and re-serialises the claim for every single signature, so
+re-signing an anchor's N claims decrypts and loads the same key N times. Here:
+
+  - loaded private-key objects are kept in a small LRU (SIGNING_KEY_CACHE_SIZE
+    anchors) for at most SIGNING_KEY_TTL seconds after they were decrypted
+  - sign_claims(anchor_id, claims) loads the key once and signs them all
+  - claims may be dicts or pre-serialised canonical bytes (utils.canonical_claim)
+
+About zeroing: Python cannot overwrite the key material. The Ed25519PrivateKey
+is an opaque handle onto OpenSSL memory, and Fernet returns the decrypted seed
+as immutable bytes. On eviction the entry's references are dropped right away,
+so OpenSSL frees the key (and cleanses it, as it does for all private keys) as
+soon as no in-flight signer holds it. Short TTLs are the real control here.
+
+Verification works the same way in reverse: verify_claims() loads each
+anchor's Ed25519PublicKey once (an LRU of VERIFY_KEY_CACHE_SIZE anchors, one
+ANY() query for all misses) and checks a whole batch. OpenSSL releases the GIL
+while verifying, so large batches can be split across a small thread pool.
+"""
+
+import base64
+import binascii
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cryptography.exceptions import InvalidSignature
+
+import tracing
+from database import execute_query
+from memory_cache import LRUCache
+from metrics import register_cache
+from utils import load_private_key, load_public_key, canonical_claim
+from config import SIGNING_KEY_CACHE_SIZE, SIGNING_KEY_TTL, VERIFY_KEY_CACHE_SIZE, VERIFY_WORKERS
+
+# Below this many claims a batch is verified inline — the pool hand-off costs more
+PARALLEL_THRESHOLD = 64
+
+
+class KeyNotFound(Exception):
+    """The anchor does not exist or has no private key"""
+
+
+_keys = LRUCache(SIGNING_KEY_CACHE_SIZE, ttl=SIGNING_KEY_TTL)   # anchor_id -> Ed25519PrivateKey
+register_cache('signing_key', _keys)
+
+
+def _private_key(anchor_id):
+    key = _keys.get(anchor_id)
+    if key is not None:
+        return key
+
+    row, error = execute_query(
+        "SELECT private_key_encrypted FROM identity_anchors WHERE anchor_id = %s",
+        (anchor_id,),
+        fetchone=True
+    )
+    if error:
+        raise KeyNotFound(error)
+    if not row or not row['private_key_encrypted']:
+        raise KeyNotFound(f'Identity {anchor_id} has no signing key')
+
+    key = load_private_key(row['private_key_encrypted'])
+    _keys.put(anchor_id, key)
+    return key
+
+
+def sign_claims(anchor_id, claims) -> list:
+    """
+    Sign many claims with one anchor's key. `claims` are dicts or canonical
+    bytes; returns base64 signatures in the same order. Raises KeyNotFound.
+    """
+    key = _private_key(anchor_id)
+    _keys.prune()
+    with tracing.span('crypto.ed25519.sign', 'crypto') as span:
+        signatures = [base64.b64encode(key.sign(canonical_claim(claim))).decode() for claim in claims]
+        span.set(claims=len(signatures))
+    return signatures
+
+
+def sign_claim(anchor_id, claim) -> str:
+    return sign_claims(anchor_id, [claim])[0]
+
+
+# ── Verification ───────────────────────────────────────────────────────────────
+
+_public_keys = LRUCache(VERIFY_KEY_CACHE_SIZE)   # anchor_id -> Ed25519PublicKey
+register_cache('verify_key', _public_keys)
+
+_executor      = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=VERIFY_WORKERS, thread_name_prefix='verify')
+    return _executor
+
+
+def public_keys(anchor_ids):
+    """({anchor_id: Ed25519PublicKey} for the anchors that exist and have a key, error)"""
+    found, missing = {}, []
+    for anchor_id in set(anchor_ids):
+        key = _public_keys.get(anchor_id)
+        if key is not None:
+            found[anchor_id] = key
+        else:
+            missing.append(anchor_id)
+
+    if missing:
+        rows, error = execute_query(
+            "SELECT anchor_id, user_pub_key, public_key_b64 FROM identity_anchors WHERE anchor_id = ANY(%s)",
+            (missing,)
+        )
+        if error:
+            return found, error
+        for row in rows:
+            if not row['public_key_b64']:   # legacy anchors have a random hex id, not a key
+                continue
+            key = load_public_key(row['user_pub_key'])
+            _public_keys.put(row['anchor_id'], key)
+            found[row['anchor_id']] = key
+    return found, None
+
+
+def _verify_one(key, message, signature_b64) -> bool:
+    try:
+        key.verify(base64.b64decode(signature_b64, validate=True), message)
+        return True
+    except (InvalidSignature, binascii.Error, ValueError):
+        return False
+
+
+def _verify_chunk(chunk):
+    return [_verify_one(key, message, signature) for key, message, signature in chunk]
+
+
+def verify_claims(items, parallel=True):
+    """
+    Verify many (anchor_id, claim, signature_b64) triples. Claims are dicts or
+    canonical bytes. Returns (results, error) with one {'valid', 'error'} result
+    per item, in order. Unknown anchors are reported per item, not as an error.
+    """
+    keys, error = public_keys([anchor_id for anchor_id, _, _ in items])
+    if error:
+        return None, error
+    results = [None] * len(items)
+    work, positions = [], []
+
+    for i, (anchor_id, claim, signature) in enumerate(items):
+        key = keys.get(anchor_id)
+        if key is None:
+            results[i] = {'valid': False, 'error': 'Identity not found or has no key'}
+            continue
+        work.append((key, canonical_claim(claim), signature))
+        positions.append(i)
+
+    with tracing.span('crypto.ed25519.verify', 'crypto', claims=len(work)):
+        if parallel and VERIFY_WORKERS > 1 and len(work) >= PARALLEL_THRESHOLD:
+            size   = -(-len(work) // VERIFY_WORKERS)
+            chunks = [work[i:i + size] for i in range(0, len(work), size)]
+            valid  = [v for chunk in _get_executor().map(_verify_chunk, chunks) for v in chunk]
+        else:
+            valid = _verify_chunk(work)
+
+    for i, ok in zip(positions, valid):
+        results[i] = {'valid': ok, 'error': None}
+    return results, None
+
+
+def forget(anchor_id=None):
+    """Evict one anchor's keys (e.g. after rotation), or every key"""
+    if anchor_id is None:
+        _keys.clear()
+        _public_keys.clear()
+    else:
+        _keys.discard(anchor_id)
+        _public_keys.discard(anchor_id)
+
+
+def stats() -> dict:
+    return {
+        'cached_keys':        len(_keys),
+        'hits':               _keys.hits,
+        'misses':             _keys.misses,
+        'ttl':                _keys.ttl,
+        'cached_public_keys': len(_public_keys),
+        'public_key_hits':    _public_keys.hits,
+        'public_key_misses':  _public_keys.misses,
+    }
@@ -0,0 +1,131 @@
+"""
+Running totals behind /api/statistics.
+
+Instead of scanning identity_anchors, platform_verifications and
+consistency_checks on every dashboard load, the write paths add their deltas
+to the small stats_counters table inside the same transaction() as the insert
+or update. Reading the statistics is then a single primary-key-sized query.
+
+Each counter is spread over STATS_COUNTER_SHARDS rows (name, shard). A writer
+adds to the shard of its process and thread, so concurrent transactions lock
+different rows instead of queueing on one; readers SUM the shards per name.
+
+Counters:
+  identities             — rows in identity_anchors
+  trust_score_sum        — SUM(identity_anchors.trust_score)
+  verifications          — rows in platform_verifications
+  consistency_checks     — rows in consistency_checks with a score
+  consistency_score_sum  — SUM(consistency_checks.consistency_score)
+
+Rebuild from scratch (e.g. after a restore or manual SQL):
+  python stats_counters.py rebuild
+"""
+
+import os
+import threading
+
+from database import execute_query, transaction
+from config import STATS_COUNTER_SHARDS
+
+COUNTERS = (
+    'identities',
+    'trust_score_sum',
+    'verifications',
+    'consistency_checks',
+    'consistency_score_sum',
+)
+
+
+def bump(**deltas):
+    """
+    Add deltas to counters, e.g. bump(identities=1, trust_score_sum=50).
+    Call inside the transaction() that performs the write so both commit together.
+    Rows are upserted in name order, all in this thread's shard, so concurrent
+    writers that do share a shard lock them consistently.
+    """
+    rows = sorted((name, delta) for name, delta in deltas.items() if delta)
+    if not rows:
+        return None, None
+
+    unknown = [name for name, _ in rows if name not in COUNTERS]
+    if unknown:
+        return None, f"Unknown counter(s): {', '.join(unknown)}"
+
+    shard  = hash((os.getpid(), threading.get_ident())) % STATS_COUNTER_SHARDS
+    values = ', '.join(['(%s, %s, %s)'] * len(rows))
+    params = [item for name, delta in rows for item in (name, shard, delta)]
+    return execute_query(
+        f"""
+        INSERT INTO stats_counters (name, shard, value) VALUES {values}
+        ON CONFLICT (name, shard) DO UPDATE SET value = stats_counters.value + EXCLUDED.value
+        """,
+        params,
+        commit=True
+    )
+
+
+def read():
+    """Return {counter: value} — None if the counters have never been built"""
+    rows, error = execute_query("SELECT name, SUM(value) AS value FROM stats_counters GROUP BY name")
+    if error:
+        return None, error
+    counters = {row['name']: row['value'] for row in rows}
+    if not all(name in counters for name in COUNTERS):
+        return None, None
+    return counters, None
+
+
+def compute():
+    """Recompute every counter with one aggregate query (used as a fallback and by rebuild)"""
+    return execute_query(
+        """
+        SELECT
+            (SELECT COUNT(*)                          FROM identity_anchors)       AS identities,
+            (SELECT COALESCE(SUM(trust_score), 0)     FROM identity_anchors)       AS trust_score_sum,
+            (SELECT COUNT(*)                          FROM platform_verifications) AS verifications,
+            (SELECT COUNT(consistency_score)          FROM consistency_checks)     AS consistency_checks,
+            (SELECT COALESCE(SUM(consistency_score), 0) FROM consistency_checks)   AS consistency_score_sum
+        """,
+        fetchone=True
+    )
+
+
+def rebuild():
+    """Recompute all counters from the source tables and overwrite stats_counters (one shard each)"""
+    with transaction() as tx:
+        # Block writers for the duration so no delta lands between count and overwrite
+        execute_query(
+            "LOCK TABLE identity_anchors, platform_verifications, consistency_checks IN SHARE MODE",
+            commit=True
+        )
+        totals, error = compute()
+        if error:
+            return None, error
+
+        values = ', '.join(['(%s, %s)'] * len(COUNTERS))
+        params = [item for name in COUNTERS for item in (name, totals[name])]
+        execute_query("DELETE FROM stats_counters", commit=True)
+        execute_query(
+            f"INSERT INTO stats_counters (name, value) VALUES {values}",
+            params,
+            commit=True
+        )
+
+    if tx.error:
+        return None, tx.error
+    return dict(totals), None
+
+
+if __name__ == '__main__':
+    import sys
+
+    if sys.argv[1:] != ['rebuild']:
+        print("Usage: python stats_counters.py rebuild")
+        sys.exit(1)
+
+    totals, error = rebuild()
+    if error:
+        print(f"Rebuild failed: {error}")
+        sys.exit(1)
+    for name in COUNTERS:
+        print(f"{name:<24} {totals[name]}")
@@ -0,0 +1,465 @@
+"""
+Lightweight request tracing.
+
+A slow request could be spending its time in SQL, bcrypt, Fernet, Ed25519,
+GitHub/Google or the Polygon RPC, and nothing recorded which. This module keeps
+a tree of timed spans per request, held in a contextvar:
+
+  - init_app(app) opens a root span per request, continuing the caller's trace
+    when it sends a W3C `traceparent` header, and closes it at teardown
+  - span(name, kind) / @traced(name, kind) time a block or function as a
+    child of the current span. Outside a traced request they cost one
+    contextvar lookup and record nothing
+  - sql_span(query) tags database spans with a literal-free SQL fingerprint
+  - TracedAdapter, a requests HTTPAdapter, records one span per outgoing HTTP
+    call. Sessions with kind='chain' name the span after the JSON-RPC method
+
+Finished spans go to listeners registered with add_listener() (metrics use
+this), and sampled traces are exported in the background by TRACING_EXPORTER:
+
+  none   nothing leaves the process
+  file   one JSON object per span, appended to TRACING_FILE
+  otlp   OTLP/HTTP JSON batches POSTed to TRACING_OTLP_ENDPOINT (a collector,
+         Jaeger, or any stand-in that accepts /v1/traces)
+
+In DEBUG mode responses carry a Server-Timing header with the time spent per
+span kind, so the browser's network panel shows where a request went.
+
+CLI (a local stand-in collector that prints what it receives):
+  python tracing.py sink [port]
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from contextlib import nullcontext
+from functools import lru_cache, wraps
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from config import (
+    DEBUG, TRACING_EXPORTER, TRACING_FILE, TRACING_OTLP_ENDPOINT, TRACING_SAMPLE_RATE,
+    TRACING_SERVICE_NAME, TRACING_FLUSH_INTERVAL, TRACING_QUEUE_MAX
+)
+
+EXPORTERS = ('none', 'file', 'otlp')
+
+TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+# OTLP SpanKind for each of our span kinds (1 internal, 2 server, 3 client)
+OTLP_KINDS = {'request': 2, 'db': 3, 'http': 3, 'chain': 3}
+
+SQL_MAX_LENGTH = 300
+
+
+# ── Spans ──────────────────────────────────────────────────────────────────────
+
+class Span:
+    __slots__ = ('name', 'kind', 'trace_id', 'span_id', 'parent_id', 'sampled', 'root',
+                 'attributes', 'error', 'start_ns', 'end_ns', 'duration_ms', 'timings', '_started')
+
+    def __init__(self, name, kind, trace_id, parent_id=None, sampled=True, root=None, attributes=None):
+        self.name        = name
+        self.kind        = kind
+        self.trace_id    = trace_id
+        self.span_id     = os.urandom(8).hex()
+        self.parent_id   = parent_id
+        self.sampled     = sampled
+        self.root        = root or self
+        self.attributes  = attributes or {}
+        self.error       = None
+        self.start_ns    = time.time_ns()
+        self.end_ns      = None
+        self.duration_ms = None
+        self.timings     = {} if root is None else None   # root only: kind -> [count, ms]
+        self._started    = time.perf_counter()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def fail(self, error):
+        self.error = str(error)
+        return self
+
+    def finish(self):
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        self.end_ns      = self.start_ns + int(self.duration_ms * 1_000_000)
+        if self.root is not self:
+            totals = self.root.timings.setdefault(self.kind, [0, 0.0])
+            totals[0] += 1
+            totals[1] += self.duration_ms
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self) -> dict:
+        return {
+            'trace_id':    self.trace_id,
+            'span_id':     self.span_id,
+            'parent_id':   self.parent_id,
+            'name':        self.name,
+            'kind':        self.kind,
+            'start_ns':    self.start_ns,
+            'end_ns':      self.end_ns,
+            'duration_ms': round(self.duration_ms, 3),
+            'attributes':  self.attributes,
+            'error':       self.error,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span outside a trace — every call is a no-op"""
+    def set(self, **attributes):
+        return self
+
+    def fail(self, error):
+        return self
+
+
+NOOP          = _NoopSpan()
+_NOOP_CONTEXT = nullcontext(NOOP)
+_current      = ContextVar('tracing_span', default=None)
+_listeners    = []
+
+
+def current_span():
+    return _current.get()
+
+def annotate(**attributes):
+    """Set attributes on the current span, if any"""
+    span = _current.get()
+    if span is not None:
+        span.attributes.update(attributes)
+
+def add_listener(fn):
+    """fn(span) is called for every finished span, sampled or not"""
+    _listeners.append(fn)
+
+def active() -> bool:
+    return TRACING_EXPORTER != 'none' or DEBUG or bool(_listeners)
+
+
+def _finish(span):
+    span.finish()
+    for listener in _listeners:
+        try:
+            listener(span)
+        except Exception as e:
+            print(f"Span listener failed: {e}")
+    if span.sampled and TRACING_EXPORTER != 'none':
+        get_exporter().submit(span)
+
+
+class _SpanContext:
+    __slots__ = ('span', 'token')
+
+    def __init__(self, span):
+        self.span  = span
+        self.token = None
+
+    def __enter__(self):
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.span.fail(exc)
+        _current.reset(self.token)
+        _finish(self.span)
+        return False
+
+
+def span(name, kind='internal', **attributes):
+    """Context manager timing a child of the current span (a no-op outside a trace)"""
+    parent = _current.get()
+    if parent is None:
+        return _NOOP_CONTEXT
+    return _SpanContext(Span(name, kind, parent.trace_id, parent.span_id, parent.sampled, parent.root, attributes))
+
+def traced(name=None, kind='internal'):
+    """Decorator form of span(); the span is named after the function by default"""
+    def decorator(fn):
+        span_name = name or f'{fn.__module__}.{fn.__qualname__}'
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with span(span_name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_trace(name, kind='request', traceparent=None, **attributes):
+    """Open a root span (continuing `traceparent` if valid) and make it current. Returns (span, token)."""
+    trace_id, parent_id, sampled = None, None, None
+    match = TRACEPARENT.match((traceparent or '').strip().lower())
+    if match and match.group(1) != '0' * 32 and match.group(2) != '0' * 16:
+        trace_id, parent_id, sampled = match.group(1), match.group(2), int(match.group(3), 16) & 1 == 1
+    if trace_id is None:
+        trace_id = os.urandom(16).hex()
+        sampled  = random.random() < TRACING_SAMPLE_RATE
+    root = Span(name, kind, trace_id, parent_id, sampled, attributes=attributes)
+    return root, _current.set(root)
+
+def end_trace(root, token, error=None):
+    if error is not None:
+        root.fail(error)
+    try:
+        _current.reset(token)
+    except ValueError:   # ended from another context (e.g. after a streamed response)
+        _current.set(None)
+    _finish(root)
+
+
+# ── SQL ────────────────────────────────────────────────────────────────────────
+
+_SQL_COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|%\(\w+\)s")
+
+@lru_cache(maxsize=2048)
+def sql_fingerprint(query: str) -> str:
+    """The statement with comments, literals and placeholders reduced to ?, whitespace collapsed"""
+    text = _SQL_LITERALS.sub('?', _SQL_COMMENTS.sub(' ', query))
+    return ' '.join(text.split())[:SQL_MAX_LENGTH]
+
+def sql_span(query, name='db.query'):
+    if _current.get() is None:
+        return _NOOP_CONTEXT
+    fingerprint = sql_fingerprint(query)
+    return span(name, 'db', **{
+        'db.operation': fingerprint.split(' ', 1)[0].upper(),
+        'db.statement': fingerprint,
+    })
+
+
+# ── Outgoing HTTP ──────────────────────────────────────────────────────────────
+
+class TracedAdapter(HTTPAdapter):
+    """HTTPAdapter that records a span per request sent through it"""
+
+    kind = 'http'
+
+    def __init__(self, *args, kind='http', **kwargs):
+        self.kind = kind
+        super().__init__(*args, **kwargs)
+
+    def _span_name(self, request):
+        url = urlsplit(request.url)
+        if self.kind == 'chain' and request.body:
+            try:
+                payload = json.loads(request.body)
+                methods = [payload['method']] if isinstance(payload, dict) else [p['method'] for p in payload]
+                return f"rpc {','.join(methods)}"
+            except (ValueError, KeyError, TypeError):
+                pass
+        return f"{request.method} {url.netloc}{url.path}"
+
+    def send(self, request, **kwargs):
+        if _current.get() is None:
+            return super().send(request, **kwargs)
+        url = urlsplit(request.url)
+        with span(self._span_name(request), self.kind, **{
+            'http.method': request.method,
+            'http.url':    f'{url.scheme}://{url.netloc}{url.path}',   # no query string — may hold secrets
+        }) as s:
+            response = super().send(request, **kwargs)
+            s.set(**{'http.status_code': response.status_code})
+            return response
+
+
+# ── Export ─────────────────────────────────────────────────────────────────────
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+def otlp_payload(spans) -> dict:
+    """An OTLP/HTTP JSON ExportTraceServiceRequest for finished spans"""
+    return {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': TRACING_SERVICE_NAME}}]},
+        'scopeSpans': [{
+            'scope': {'name': 'tracing'},
+            'spans': [{
+                'traceId':           s.trace_id,
+                'spanId':            s.span_id,
+                'parentSpanId':      s.parent_id or '',
+                'name':              s.name,
+                'kind':              OTLP_KINDS.get(s.kind, 1),
+                'startTimeUnixNano': str(s.start_ns),
+                'endTimeUnixNano':   str(s.end_ns),
+                'attributes':        [{'key': k, 'value': _otlp_value(v)}
+                                      for k, v in {'span.kind': s.kind, **s.attributes}.items()],
+                'status':            {'code': 2, 'message': s.error} if s.error else {'code': 0},
+            } for s in spans],
+        }],
+    }]}
+
+
+class SpanExporter:
+    """Per-process queue of finished spans, written out every TRACING_FLUSH_INTERVAL seconds"""
+
+    def __init__(self, exporter, interval, max_queued):
+        self.exporter = exporter
+        self.interval = interval
+        self.pid      = os.getpid()
+        self._queue   = deque(maxlen=max_queued)   # oldest spans are dropped when full
+        self._lock    = threading.Lock()
+        self._thread  = None
+        self._session = None
+        self.stats    = {'exported': 0, 'failures': 0}
+
+    def submit(self, span):
+        self._queue.append(span)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='span-exporter', daemon=True)
+                    self._thread.start()
+
+    def flush(self):
+        with self._lock:
+            batch = []
+            while self._queue:
+                batch.append(self._queue.popleft())
+            if not batch:
+                return 0
+            try:
+                if self.exporter == 'file':
+                    with open(TRACING_FILE, 'a', encoding='utf-8') as f:
+                        f.writelines(json.dumps(s.to_dict(), default=str) + '\n' for s in batch)
+                elif self.exporter == 'otlp':
+                    if self._session is None:
+                        import requests
+                        self._session = requests.Session()
+                    response = self._session.post(TRACING_OTLP_ENDPOINT, json=otlp_payload(batch), timeout=5)
+                    response.raise_for_status()
+            except Exception as e:
+                self.stats['failures'] += 1
+                print(f"Span export failed ({len(batch)} spans): {e}")
+                return 0
+            self.stats['exported'] += len(batch)
+            return len(batch)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+
+_exporter      = None
+_exporter_lock = threading.Lock()
+
+def get_exporter() -> SpanExporter:
+    """This process's exporter — recreated after a gunicorn fork"""
+    global _exporter
+    exporter = _exporter
+    if exporter is not None and exporter.pid == os.getpid():
+        return exporter
+    with _exporter_lock:
+        if _exporter is None or _exporter.pid != os.getpid():
+            _exporter = SpanExporter(TRACING_EXPORTER, TRACING_FLUSH_INTERVAL, TRACING_QUEUE_MAX)
+        return _exporter
+
+
+# ── Flask integration ──────────────────────────────────────────────────────────
+
+def server_timing(root) -> str:
+    entries = [f'{kind};dur={ms:.1f};desc="{count} span{"s" if count != 1 else ""}"'
+               for kind, (count, ms) in sorted(root.timings.items())]
+    entries.append(f'total;dur={(time.perf_counter() - root._started) * 1000:.1f}')
+    return ', '.join(entries)
+
+
+def init_app(app):
+    """Trace every request; in DEBUG mode add a Server-Timing header"""
+    from flask import g, request
+
+    if TRACING_EXPORTER not in EXPORTERS:
+        raise ValueError(f"TRACING_EXPORTER must be one of: {', '.join(EXPORTERS)}")
+
+    @app.before_request
+    def _start_request_trace():
+        if not active():
+            return
+        # Only matched routes are recorded as http.route — raw paths would make unbounded metric labels
+        route      = request.url_rule.rule if request.url_rule else None
+        attributes = {'http.method': request.method, 'http.target': request.path}
+        if route:
+            attributes['http.route'] = route
+        g._trace = start_trace(
+            f'{request.method} {route or request.path}', 'request', request.headers.get('traceparent'), **attributes
+        )
+
+    @app.after_request
+    def _tag_response(response):
+        trace = g.get('_trace')
+        if trace is not None:
+            root = trace[0]
+            root.set(**{'http.status_code': response.status_code})
+            if DEBUG:
+                response.headers['Server-Timing'] = server_timing(root)
+        return response
+
+    @app.teardown_request
+    def _end_request_trace(exc=None):
+        trace = g.pop('_trace', None)
+        if trace is not None:
+            end_trace(*trace, error=exc)
+
+    if TRACING_EXPORTER != 'none':
+        import atexit
+        atexit.register(lambda: _exporter is not None and _exporter.pid == os.getpid() and _exporter.flush())
+
+
+def run_sink(port=4318):
+    """Minimal OTLP/HTTP JSON receiver: prints one line per span POSTed to /v1/traces"""
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_response(400)
+                self.end_headers()
+                return
+            for resource in payload.get('resourceSpans', []):
+                for scope in resource.get('scopeSpans', []):
+                    for s in scope.get('spans', []):
+                        ms = (int(s['endTimeUnixNano']) - int(s['startTimeUnixNano'])) / 1e6
+                        print(f"{s['traceId'][:8]} {s['spanId']} <- {s.get('parentSpanId') or '-':16} "
+                              f"{ms:9.3f} ms  {s['name']}")
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, *args):
+            pass
+
+    print(f"OTLP sink listening on http://localhost:{port}/v1/traces")
+    HTTPServer(('127.0.0.1', port), Handler).serve_forever()
+
+
+if __name__ == '__main__':
+    import sys
+
+    if sys.argv[1:2] != ['sink']:
+        print("Usage: python tracing.py sink [port]")
+        sys.exit(1)
+    run_sink(int(sys.argv[2]) if len(sys.argv) > 2 else 4318)
@@ -0,0 +1,280 @@
+"""
+Trust score history as a time series.
+
+Every Identity.update_trust_score() writes a trust_score_history row (old and
+new score, reason) in the same statement as the update. A rollup job folds the
+raw rows into hourly and daily OHLC buckets in trust_score_rollups, tracking
+how far each resolution has been rolled up in trust_score_rollup_state.
+
+get_history() answers range queries from whichever source is bounded:
+
+  raw   trust_score_history rows in [from, to)
+  hour  rolled-up buckets, plus a live aggregate of the not-yet-rolled tail
+  day   the same, per day
+
+so the cost depends on the number of points returned (capped at
+TRUST_HISTORY_MAX_POINTS), not on how many changes an identity has had.
+All times are UTC.
+
+CLI:
+  python trust_history.py rollup    # roll up everything that is due
+  python trust_history.py rebuild   # drop the rollups and redo them from raw history
+"""
+
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+
+from database import execute_query, transaction
+from config import (
+    TRUST_ROLLUP_INTERVAL, TRUST_ROLLUP_LAG, TRUST_ROLLUP_WORKER_ENABLED, TRUST_HISTORY_MAX_POINTS
+)
+
+RESOLUTIONS = ('raw', 'hour', 'day')
+
+# resolution='auto' picks the finest resolution that keeps the span readable
+AUTO_RAW_SPAN  = timedelta(days=2)
+AUTO_HOUR_SPAN = timedelta(days=90)
+
+DEFAULT_SPAN = timedelta(days=30)
+
+
+# ── Rollups ────────────────────────────────────────────────────────────────────
+
+_BUCKETS_SQL = """
+    SELECT h.anchor_id,
+           date_trunc(%(resolution)s, h.changed_at) AS bucket,
+           (array_agg(h.old_score ORDER BY h.changed_at, h.history_id))[1]           AS open_score,
+           (array_agg(h.new_score ORDER BY h.changed_at DESC, h.history_id DESC))[1] AS close_score,
+           LEAST(MIN(h.old_score), MIN(h.new_score))                                 AS min_score,
+           GREATEST(MAX(h.old_score), MAX(h.new_score))                              AS max_score,
+           COUNT(*)                                                                  AS changes
+    FROM trust_score_history h{join}
+    WHERE {where}
+    GROUP BY h.anchor_id, bucket
+"""
+
+def rollup(resolution):
+    """
+    Roll up every complete bucket since the watermark. Buckets are closed
+    TRUST_ROLLUP_LAG seconds after they end, so slow transactions that stamped
+    changed_at earlier still land before their bucket is rolled up.
+    Returns (buckets written, error).
+    """
+    with transaction() as tx:
+        state, error = execute_query(
+            """
+            SELECT rolled_through,
+                   date_trunc(%s, (now() AT TIME ZONE 'UTC') - make_interval(secs => %s)) AS until
+            FROM trust_score_rollup_state WHERE resolution = %s
+            FOR UPDATE
+            """,
+            (resolution, TRUST_ROLLUP_LAG, resolution),
+            fetchone=True
+        )
+        if error or not state:
+            return 0, error or f"No rollup state for {resolution}"
+        if state['until'] <= state['rolled_through']:
+            return 0, None
+
+        written, error = execute_query(
+            f"""
+            WITH buckets AS ({_BUCKETS_SQL.format(join='', where='h.changed_at >= %(lo)s AND h.changed_at < %(hi)s')}),
+            upserted AS (
+                INSERT INTO trust_score_rollups
+                    (anchor_id, resolution, bucket, open_score, close_score, min_score, max_score, changes)
+                SELECT anchor_id, %(resolution)s, bucket, open_score, close_score, min_score, max_score, changes
+                FROM buckets
+                ON CONFLICT (anchor_id, resolution, bucket) DO UPDATE SET
+                    open_score  = EXCLUDED.open_score,
+                    close_score = EXCLUDED.close_score,
+                    min_score   = EXCLUDED.min_score,
+                    max_score   = EXCLUDED.max_score,
+                    changes     = EXCLUDED.changes
+                RETURNING 1
+            )
+            SELECT COUNT(*) AS count FROM upserted
+            """,
+            {'resolution': resolution, 'lo': state['rolled_through'], 'hi': state['until']},
+            fetchone=True
+        )
+        if error:
+            return 0, error
+
+        execute_query(
+            "UPDATE trust_score_rollup_state SET rolled_through = %s WHERE resolution = %s",
+            (state['until'], resolution),
+            commit=True
+        )
+
+    if tx.error:
+        return 0, tx.error
+    return written['count'], None
+
+
+def run_rollups():
+    """
+    Roll up every resolution. Safe to run from several processes at once: the
+    state row is locked FOR UPDATE, so a second runner waits, then finds nothing due.
+    """
+    return {resolution: rollup(resolution) for resolution in ('hour', 'day')}
+
+
+def rebuild():
+    """Discard all rollups and rebuild them from trust_score_history"""
+    with transaction() as tx:
+        execute_query("DELETE FROM trust_score_rollups", commit=True)
+        execute_query("UPDATE trust_score_rollup_state SET rolled_through = '1970-01-01'", commit=True)
+    if tx.error:
+        return {resolution: (0, tx.error) for resolution in ('hour', 'day')}
+    return run_rollups()
+
+
+def start_worker(interval=TRUST_ROLLUP_INTERVAL):
+    """Run rollups in a daemon thread every `interval` seconds"""
+    if not TRUST_ROLLUP_WORKER_ENABLED:
+        return None
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                run_rollups()
+            except Exception as e:
+                print(f"Trust score rollup failed: {e}")
+
+    thread = threading.Thread(target=run, name='trust-rollups', daemon=True)
+    thread.start()
+    return thread
+
+
+# ── Range queries ──────────────────────────────────────────────────────────────
+
+# A bare year (2026) or year-month (2026-03) means its start, not unix seconds
+_YEAR_MONTH = re.compile(r'(\d{4})(?:-(\d{2}))?')
+
+def parse_time(value):
+    """
+    ISO-8601 (or unix seconds, when the value is no ISO date) to a naive UTC
+    datetime; None passes through. Raises ValueError for anything else,
+    including values outside the datetime range.
+    """
+    if value in (None, ''):
+        return None
+    match = _YEAR_MONTH.fullmatch(value)
+    if match:
+        return datetime(int(match[1]), int(match[2] or 1), 1)
+    try:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            parsed = datetime.fromtimestamp(float(value), tz=timezone.utc)
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    except (OverflowError, OSError) as e:
+        raise ValueError(f'Timestamp out of range: {value}') from e
+    return parsed
+
+
+def choose_resolution(start, end):
+    span = end - start
+    if span <= AUTO_RAW_SPAN:
+        return 'raw'
+    return 'hour' if span <= AUTO_HOUR_SPAN else 'day'
+
+
+def _raw_points(anchor_id, start, end, limit):
+    return execute_query(
+        """
+        SELECT changed_at AS time, new_score AS score, old_score AS previous,
+               LEAST(old_score, new_score) AS min, GREATEST(old_score, new_score) AS max,
+               1 AS changes, reason
+        FROM trust_score_history
+        WHERE anchor_id = %s AND changed_at >= %s AND changed_at < %s
+        ORDER BY changed_at, history_id
+        LIMIT %s
+        """,
+        (anchor_id, start, end, limit)
+    )
+
+
+def _bucket_points(anchor_id, resolution, start, end, limit):
+    """Rolled-up buckets before the watermark, live-aggregated raw rows after it"""
+    live = _BUCKETS_SQL.format(
+        join=', state s',
+        where='h.anchor_id = %(anchor_id)s AND h.changed_at >= GREATEST(%(start)s, s.rolled_through) AND h.changed_at < %(end)s'
+    )
+    return execute_query(
+        f"""
+        WITH state AS (
+            SELECT rolled_through FROM trust_score_rollup_state WHERE resolution = %(resolution)s
+        ),
+        points AS (
+            SELECT r.bucket, r.open_score, r.close_score, r.min_score, r.max_score, r.changes
+            FROM trust_score_rollups r, state s
+            WHERE r.anchor_id = %(anchor_id)s AND r.resolution = %(resolution)s
+              AND r.bucket >= date_trunc(%(resolution)s, %(start)s::timestamp)
+              AND r.bucket < %(end)s AND r.bucket < s.rolled_through
+            UNION ALL
+            SELECT bucket, open_score, close_score, min_score, max_score, changes
+            FROM ({live}) tail
+        )
+        SELECT bucket AS time, close_score AS score, open_score AS previous,
+               min_score AS min, max_score AS max, changes, NULL AS reason
+        FROM points
+        ORDER BY bucket
+        LIMIT %(limit)s
+        """,
+        {'anchor_id': anchor_id, 'resolution': resolution, 'start': start, 'end': end, 'limit': limit}
+    )
+
+
+def get_history(anchor_id, start=None, end=None, resolution='auto', limit=TRUST_HISTORY_MAX_POINTS):
+    """
+    Score points for one identity in [start, end) — default the last 30 days.
+    Returns ({current_score, resolution, from, to, history}, error).
+    """
+    identity, error = execute_query(
+        "SELECT trust_score FROM identity_anchors WHERE anchor_id = %s", (anchor_id,), fetchone=True
+    )
+    if error or not identity:
+        return None, error or "Identity not found"
+
+    end   = end or datetime.utcnow()
+    start = start or end - DEFAULT_SPAN
+    if start >= end:
+        return None, "'from' must be before 'to'"
+    if resolution == 'auto':
+        resolution = choose_resolution(start, end)
+    limit = min(limit, TRUST_HISTORY_MAX_POINTS)
+
+    if resolution == 'raw':
+        points, error = _raw_points(anchor_id, start, end, limit)
+    else:
+        points, error = _bucket_points(anchor_id, resolution, start, end, limit)
+    if error:
+        return None, error
+
+    return {
+        'current_score': identity['trust_score'],
+        'resolution':    resolution,
+        'from':          start,
+        'to':            end,
+        'history':       points,
+        'truncated':     len(points) >= limit,
+    }, None
+
+
+if __name__ == '__main__':
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ''
+    if command == 'rollup':
+        result = run_rollups()
+    elif command == 'rebuild':
+        result = rebuild()
+    else:
+        print("Usage: python trust_history.py rollup|rebuild")
+        sys.exit(1)
+    for resolution, (written, error) in result.items():
+        print(f"{resolution:<6} {'error: ' + error if error else f'{written} buckets'}")
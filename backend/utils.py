@@ -4,7 +4,7 @@ import secrets
 import random
 import base64
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 from cryptography.hazmat.primitives.serialization import (
@@ -14,6 +14,7 @@ from cryptography.fernet import Fernet
 from cryptography.exceptions import InvalidSignature
 
 import os
+from tracing import traced
 
 # ── Fernet encryption (for storing private keys safely) ───────────────────────
 FERNET_KEY = os.getenv('FERNET_KEY')
@@ -24,6 +25,7 @@ fernet = Fernet(FERNET_KEY.encode())
 
 # ── Ed25519 Key Generation ─────────────────────────────────────────────────────
 
+@traced('crypto.ed25519.generate', 'crypto')
 def generate_keypair():
     """
     Generate a real Ed25519 public/private key pair.
@@ -46,6 +48,7 @@ def generate_keypair():
     return public_key_hex, public_key_b64, private_key_enc
 
 
+@traced('crypto.fernet.decrypt', 'crypto')
 def load_private_key(private_key_enc: str) -> Ed25519PrivateKey:
     """Decrypt and load a private key from its encrypted stored form"""
     priv_bytes = fernet.decrypt(private_key_enc.encode())
@@ -61,26 +64,39 @@ def load_public_key(public_key_hex: str):
 
 # ── Signing & Verification ─────────────────────────────────────────────────────
 
-def sign_verification_claim(private_key_enc: str, claim: dict) -> str:
+def canonical_claim(claim) -> bytes:
+    """
+    The exact bytes that get signed: sorted-key, whitespace-free JSON.
+    Already-canonical bytes are passed through unchanged.
+    """
+    if isinstance(claim, (bytes, bytearray)):
+        return bytes(claim)
+    return json.dumps(claim, sort_keys=True, separators=(',', ':')).encode()
+
+
+@traced('crypto.ed25519.sign', 'crypto')
+def sign_verification_claim(private_key_enc: str, claim) -> str:
     """
     Sign a verification claim dict with the identity's private key.
     The claim is serialized to a canonical JSON string before signing.
     Returns the signature as a base64 string.
+    (For many claims or repeat signing, use signing.sign_claims instead.)
     """
     private_key    = load_private_key(private_key_enc)
-    claim_bytes    = json.dumps(claim, sort_keys=True, separators=(',', ':')).encode()
+    claim_bytes    = canonical_claim(claim)
     signature_bytes = private_key.sign(claim_bytes)
     return base64.b64encode(signature_bytes).decode()
 
 
-def verify_signature(public_key_hex: str, claim: dict, signature_b64: str) -> bool:
+@traced('crypto.ed25519.verify', 'crypto')
+def verify_signature(public_key_hex: str, claim, signature_b64: str) -> bool:
     """
     Verify a signature against a claim using the identity's public key.
     Returns True if valid, False if tampered or invalid.
     """
     try:
         public_key     = load_public_key(public_key_hex)
-        claim_bytes    = json.dumps(claim, sort_keys=True, separators=(',', ':')).encode()
+        claim_bytes    = canonical_claim(claim)
         sig_bytes      = base64.b64decode(signature_b64)
         public_key.verify(sig_bytes, claim_bytes)
         return True
@@ -88,6 +104,20 @@ def verify_signature(public_key_hex: str, claim: dict, signature_b64: str) -> bo
         return False
 
 
+# Claims sign verified_at in exactly the form the API returns it — the same as
+# Postgres to_char(verified_at, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"') — so a client
+# can rebuild the claim from any response that carries the signature.
+CLAIM_TIMESTAMP_SQL = 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'
+
+def claim_timestamp(value) -> str:
+    """Canonical UTC form of a verified_at value; strings are passed through unchanged"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    return value
+
+
 def build_verification_claim(anchor_id, platform, profile_url, verified_at=None) -> dict:
     """
     Build the canonical claim dict that gets signed.
@@ -97,43 +127,65 @@ def build_verification_claim(anchor_id, platform, profile_url, verified_at=None)
         "anchor_id":   anchor_id,
         "platform":    platform,
         "profile_url": profile_url,
-        "verified_at": verified_at or datetime.utcnow().isoformat(),
+        "verified_at": claim_timestamp(verified_at or datetime.utcnow()),
         "issuer":      "CrossPlatformIdentityVerifier/v1"
     }
 
 
 # ── QR Code Generation ─────────────────────────────────────────────────────────
 
-def generate_qr_code_base64(public_key_b64: str, anchor_id: int) -> str:
-    """
-    Generate a QR code image containing the identity's public key.
-    Returns the image as a base64 PNG string (embeddable directly in HTML).
-    """
-    import qrcode
-    import io
-
-    # The QR code encodes a JSON payload with the public key and anchor ID
-    payload = json.dumps({
+def qr_payload(public_key_b64: str, anchor_id: int) -> bytes:
+    """The JSON payload a QR code encodes: the public key and anchor ID"""
+    return json.dumps({
         "anchor_id":  anchor_id,
         "public_key": public_key_b64,
         "issuer":     "CrossPlatformIdentityVerifier/v1"
-    })
+    }).encode()
+
+
+def _qr_matrix(payload: bytes, image_factory=None):
+    import qrcode
 
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_M,
         box_size=6,
-        border=4
+        border=4,
+        image_factory=image_factory
     )
-    qr.add_data(payload)
+    qr.add_data(payload.decode())
     qr.make(fit=True)
+    return qr
+
+
+def render_qr_png(payload: bytes) -> bytes:
+    """Render a QR payload as PNG bytes"""
+    import io
 
-    img        = qr.make_image(fill_color="black", back_color="white")
+    img        = _qr_matrix(payload).make_image(fill_color="black", back_color="white")
     buffer     = io.BytesIO()
     img.save(buffer, format='PNG')
-    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def render_qr_svg(payload: bytes) -> bytes:
+    """Render a QR payload as a standalone SVG document (no PIL involved)"""
+    import io
+    from qrcode.image.svg import SvgPathImage
 
-    return base64.b64encode(buffer.getvalue()).decode()
+    img        = _qr_matrix(payload, image_factory=SvgPathImage).make_image()
+    buffer     = io.BytesIO()
+    img.save(buffer)
+    return buffer.getvalue()
+
+
+def generate_qr_code_base64(public_key_b64: str, anchor_id: int) -> str:
+    """
+    Generate a QR code image containing the identity's public key.
+    Returns the image as a base64 PNG string (embeddable directly in HTML).
+    (Routes serve QR codes through qr_cache, which caches the rendered bytes.)
+    """
+    return base64.b64encode(render_qr_png(qr_payload(public_key_b64, anchor_id))).decode()
 
 
 # ── Legacy helpers (kept for backwards compatibility) ─────────────────────────
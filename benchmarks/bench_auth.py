@@ -0,0 +1,67 @@
+"""
+Per-request auth overhead — full JWT decode vs the token_required fast path.
+
+Wraps a no-op view in auth.token_required and calls it inside a Flask test
+request context, the way a dashboard page load hits 5–8 endpoints with the
+same token. Compares:
+
+  decode   — the old path: header .replace + jwt.decode on every call
+  cached   — token_required with the verified-claims LRU warm
+
+No database is needed: the revocation poller is not started, so the denylist
+stays empty.
+
+Usage (from the repo root):
+    python benchmarks/bench_auth.py [calls] [repeats]
+"""
+
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from flask import Flask  # noqa: E402
+
+import auth  # noqa: E402
+
+
+def legacy_check(request):
+    token = request.headers.get('Authorization', '').replace('Bearer ', '')
+    return auth.decode_token(token)
+
+
+def time_calls(fn, calls, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        samples.append((time.perf_counter() - started) / calls * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    calls   = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    app   = Flask(__name__)
+    token = auth.generate_token(1, 'bench')
+    view  = auth.token_required(lambda: None)
+
+    with app.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+        from flask import request
+        decode_us = time_calls(lambda: legacy_check(request), calls, repeats)
+        view()   # warm the cache
+        cached_us = time_calls(view, calls, repeats)
+
+    print(f"{'path':<10} {'µs/request':>12}")
+    print(f"{'decode':<10} {decode_us:>12.2f}")
+    print(f"{'cached':<10} {cached_us:>12.2f}")
+    print(f"speedup    {decode_us / cached_us:>11.1f}x")
+    print(f"cache      hits={auth._token_cache.hits} misses={auth._token_cache.misses}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Bytes on the wire and latency — plain responses vs the response layer.
+
+Serves a synthetic page of verification rows (the shape /api/verifications
+returns) from two Flask apps, one with response_layer.init_app() and one
+without, and measures with the test client:
+
+  plain        the old behaviour: full uncompressed JSON on every poll
+  compressed   first fetch with Accept-Encoding (brotli if installed, else gzip)
+  revalidated  a repeat poll sending the ETag back: 304, empty body
+
+No database is needed.
+
+Usage (from the repo root):
+    python benchmarks/bench_http.py [rows] [requests]
+"""
+
+import os
+import sys
+import time
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from flask import Flask, jsonify  # noqa: E402
+
+import response_layer  # noqa: E402
+
+PLATFORMS = ['GitHub', 'LinkedIn', 'X', 'Instagram', 'Kaggle', 'Facebook', 'Google']
+
+
+def make_rows(n):
+    now = datetime(2026, 1, 1)
+    return [{
+        'verification_id':    i,
+        'anchor_id':          1000 + i // 3,
+        'platform_name':      PLATFORMS[i % len(PLATFORMS)],
+        'profile_url':        f'https://example.com/{PLATFORMS[i % len(PLATFORMS)].lower()}/user{i}',
+        'verification_token': f'{i:064x}',
+        'signature':          None,
+        'verified_at':        now - timedelta(minutes=i),
+        'tx_hash':            None,
+        'trust_score':        50 + i % 50,
+    } for i in range(n)]
+
+
+def make_app(rows, with_layer):
+    app = Flask(__name__)
+
+    @app.route('/api/verifications')
+    def verifications():
+        return jsonify({'success': True, 'verifications': rows, 'next_cursor': None})
+
+    if with_layer:
+        response_layer.init_app(app)
+    return app
+
+
+def measure(client, headers, n):
+    times, size, status = [], 0, None
+    for _ in range(n):
+        started  = time.perf_counter()
+        response = client.get('/api/verifications', headers=headers)
+        times.append((time.perf_counter() - started) * 1000)
+        size, status = len(response.data), response.status_code
+    times.sort()
+    return {
+        'status': status,
+        'bytes':  size,
+        'p50':    statistics.median(times),
+        'p99':    times[min(len(times) - 1, int(len(times) * 0.99))],
+    }
+
+
+def main():
+    n_rows   = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rows     = make_rows(n_rows)
+    encoding = 'br, gzip' if response_layer.brotli is not None else 'gzip'
+
+    plain   = make_app(rows, with_layer=False).test_client()
+    layered = make_app(rows, with_layer=True).test_client()
+
+    etag = layered.get('/api/verifications', headers={'Accept-Encoding': encoding}).headers['ETag']
+    results = {
+        'plain':       measure(plain,   {}, requests),
+        'compressed':  measure(layered, {'Accept-Encoding': encoding}, requests),
+        'revalidated': measure(layered, {'Accept-Encoding': encoding, 'If-None-Match': etag}, requests),
+    }
+
+    print(f"{n_rows} rows, {requests} requests each, Accept-Encoding: {encoding}\n")
+    print(f"{'mode':<12} {'status':>6} {'bytes':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<12} {r['status']:>6} {r['bytes']:>9} {r['p50']:>8.3f} {r['p99']:>8.3f}")
+    ratio = results['plain']['bytes'] / max(results['compressed']['bytes'], 1)
+    print(f"\ncompression ratio {ratio:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Lookalike-username lookup — segment index vs a linear scan.
+
+Builds a LookalikeIndex over synthetic usernames (word + word + digits, the
+shape real handles tend to have) and times queries for misspellings of
+existing names against:
+
+  scan    rapidfuzz.process.extract over every name with a distance cutoff —
+          the scan runs in C, so this is the best a linear scan can do
+  index   LookalikeIndex.query (segment lookups, then RapidFuzz on candidates)
+
+and checks both return the same names. No database is needed.
+
+Usage (from the repo root):
+    python benchmarks/bench_lookalikes.py [usernames] [queries] [max_distance]
+"""
+
+import os
+import sys
+import time
+import random
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from rapidfuzz import process  # noqa: E402
+from rapidfuzz.distance import Levenshtein  # noqa: E402
+
+from lookalikes import LookalikeIndex, normalise  # noqa: E402
+
+WORDS = ['john', 'jane', 'alex', 'sam', 'dev', 'code', 'data', 'cyber', 'pixel', 'night',
+         'shadow', 'wolf', 'star', 'blue', 'red', 'tech', 'ninja', 'coder', 'maria', 'chris',
+         'ali', 'kumar', 'lee', 'smith', 'gamer', 'crypto', 'art', 'music', 'photo', 'the']
+SEPARATORS = ['', '', '_', '.']
+
+
+def make_usernames(n, rng):
+    names = set()
+    while len(names) < n:
+        name = rng.choice(WORDS) + rng.choice(SEPARATORS) + rng.choice(WORDS)
+        if rng.random() < 0.7:
+            name += str(rng.randint(0, 9999))
+        names.add(name)
+    return list(names)
+
+
+def mutate(name, edits, rng):
+    chars = list(name)
+    for _ in range(edits):
+        op  = rng.choice('isd') if len(chars) > 1 else 'i'
+        pos = rng.randrange(len(chars) + (op == 'i'))
+        if op == 'i':
+            chars.insert(pos, rng.choice('abcdefghijklmnopqrstuvwxyz0123456789'))
+        elif op == 's':
+            chars[min(pos, len(chars) - 1)] = rng.choice('abcdefghijklmnopqrstuvwxyz0123456789')
+        else:
+            del chars[min(pos, len(chars) - 1)]
+    return ''.join(chars)
+
+
+def timed(fn, queries):
+    times, results = [], []
+    for q in queries:
+        started = time.perf_counter()
+        results.append(fn(q))
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return results, {
+        'p50': statistics.median(times),
+        'p99': times[min(len(times) - 1, int(len(times) * 0.99))],
+    }
+
+
+def main():
+    n_names   = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    k         = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    rng       = random.Random(1729)
+
+    usernames = make_usernames(n_names, rng)
+    normalised = [normalise(u) for u in usernames]
+
+    started = time.perf_counter()
+    index   = LookalikeIndex(max_distance=k)
+    index.add_many({'id': i, 'anchor_id': i, 'platform': 'GitHub', 'platform_username': u}
+                   for i, u in enumerate(usernames))
+    build = time.perf_counter() - started
+
+    queries = [mutate(rng.choice(usernames), rng.randint(0, k), rng) for _ in range(n_queries)]
+
+    def scan(q):
+        hits = process.extract(normalise(q), normalised, scorer=Levenshtein.distance,
+                               score_cutoff=k, limit=None)
+        return {name for name, _, _ in hits}
+
+    def lookup(q):
+        return {m['username'] for m in index.query(q, k, limit=n_names)}
+
+    scanned, scan_times  = timed(scan, queries)
+    indexed, index_times = timed(lookup, queries)
+    mismatches = sum(1 for a, b in zip(scanned, indexed) if a != b)
+
+    print(f"{n_names} usernames, {n_queries} queries, max_distance={k}")
+    print(f"index build {build:.1f}s, {len(index)} names, {len(index._segments)} segment keys")
+    print(f"avg matches per query {statistics.mean(len(r) for r in indexed):.1f}\n")
+    print(f"{'method':<8} {'p50 ms':>9} {'p99 ms':>9}")
+    print(f"{'scan':<8} {scan_times['p50']:>9.3f} {scan_times['p99']:>9.3f}")
+    print(f"{'index':<8} {index_times['p50']:>9.3f} {index_times['p99']:>9.3f}")
+    print(f"\nspeedup (p50) {scan_times['p50'] / max(index_times['p50'], 1e-9):.0f}x, "
+          f"result mismatches: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
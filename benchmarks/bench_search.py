@@ -0,0 +1,129 @@
+"""
+Identity search latency — old sequential LIKE scan vs indexed search paths.
+
+Builds a scratch copy of identity_anchors with N rows (default 1,000,000) in
+its own schema, times the legacy query and the new search.py queries against
+it, then drops the schema. Real tables are never touched.
+
+Usage (from the repo root, with the database env configured):
+    python benchmarks/bench_search.py [rows] [repeats]
+"""
+
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from database import get_connection  # noqa: E402
+
+SCHEMA = 'bench_search'
+
+LEGACY_QUERY = f"""
+    SELECT anchor_id, user_pub_key, trust_score, created_at
+    FROM {SCHEMA}.identity_anchors
+    WHERE CAST(anchor_id AS TEXT) LIKE %s OR user_pub_key LIKE %s
+    ORDER BY created_at DESC
+"""
+
+EXACT_QUERY = f"SELECT anchor_id, user_pub_key, trust_score, created_at FROM {SCHEMA}.identity_anchors WHERE anchor_id = %s"
+
+PREFIX_QUERY = f"""
+    SELECT anchor_id, user_pub_key, trust_score, created_at
+    FROM {SCHEMA}.identity_anchors
+    WHERE user_pub_key LIKE %s
+    ORDER BY created_at DESC LIMIT 20
+"""
+
+SUBSTRING_QUERY = f"""
+    SELECT anchor_id, user_pub_key, trust_score, created_at
+    FROM {SCHEMA}.identity_anchors
+    WHERE user_pub_key LIKE %s
+    ORDER BY created_at DESC LIMIT 20
+"""
+
+
+def setup(cur, rows):
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    cur.execute(f"""
+        CREATE TABLE {SCHEMA}.identity_anchors (
+            anchor_id    SERIAL PRIMARY KEY,
+            user_pub_key VARCHAR(255) NOT NULL,
+            trust_score  NUMERIC(5,2) DEFAULT 50.0,
+            created_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute(f"""
+        INSERT INTO {SCHEMA}.identity_anchors (user_pub_key, created_at)
+        SELECT encode(sha256(i::text::bytea), 'hex'), now() - (i || ' seconds')::interval
+        FROM generate_series(1, %s) AS i
+    """, (rows,))
+    cur.execute(f"ANALYZE {SCHEMA}.identity_anchors")
+
+
+def add_indexes(cur):
+    cur.execute(f"CREATE INDEX ON {SCHEMA}.identity_anchors (user_pub_key varchar_pattern_ops)")
+    cur.execute(f"CREATE INDEX ON {SCHEMA}.identity_anchors USING gin (user_pub_key gin_trgm_ops)")
+    cur.execute(f"ANALYZE {SCHEMA}.identity_anchors")
+
+
+def time_query(cur, query, params, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        cur.execute(query, params)
+        cur.fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def main():
+    rows    = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    conn = get_connection()
+    if not conn:
+        sys.exit("Database connection failed")
+    conn.autocommit = True
+    cur = conn.cursor()
+
+    print(f"Building {rows:,} anchors in schema {SCHEMA} ...")
+    setup(cur, rows)
+
+    cur.execute(f"SELECT user_pub_key FROM {SCHEMA}.identity_anchors WHERE anchor_id = %s", (rows // 2,))
+    key = cur.fetchone()['user_pub_key']
+    cases = [
+        ('anchor id',   str(rows // 2)),
+        ('key prefix',  key[:8]),
+        ('key infix',   key[20:30]),
+    ]
+
+    results = []
+    for label, term in cases:
+        legacy = time_query(cur, LEGACY_QUERY, (f'%{term}%', f'%{term}%'), repeats)
+        results.append((label, term, legacy))
+
+    print("Creating search indexes ...")
+    add_indexes(cur)
+
+    print()
+    print(f"{'case':<12} {'term':<12} {'legacy p50/p95 ms':>20} {'indexed p50/p95 ms':>20}")
+    for label, term, legacy in results:
+        if label == 'anchor id':
+            indexed = time_query(cur, EXACT_QUERY, (int(term),), repeats)
+        elif label == 'key prefix':
+            indexed = time_query(cur, PREFIX_QUERY, (term + '%',), repeats)
+        else:
+            indexed = time_query(cur, SUBSTRING_QUERY, ('%' + term + '%',), repeats)
+        print(f"{label:<12} {term:<12} {legacy[0]:>9.2f}/{legacy[1]:<10.2f} {indexed[0]:>9.2f}/{indexed[1]:<10.2f}")
+
+    cur.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
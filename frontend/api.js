@@ -25,6 +25,18 @@ async function apiFetch(url, options = {}) {
     return res.json();
 }
 
+// Build a list URL with keyset pagination params (cursor / limit / fields)
+function pageUrl(path, { cursor, limit, fields } = {}) {
+    const params = new URLSearchParams();
+    if (cursor) params.set('cursor', cursor);
+    if (limit)  params.set('limit', limit);
+    if (fields) params.set('fields', Array.isArray(fields) ? fields.join(',') : fields);
+    const qs = params.toString();
+    return `${API_URL}${path}${qs ? `?${qs}` : ''}`;
+}
+
+const PAGE_SIZE = 200;
+
 const api = {
     // Statistics
     getStatistics: () => apiFetch(`${API_URL}/statistics`),
@@ -33,7 +45,8 @@ const api = {
     createIdentity: () =>
         apiFetch(`${API_URL}/identity`, { method: 'POST' }),
 
-    getIdentities: () => apiFetch(`${API_URL}/identities`),
+    getIdentitiesPage: (cursor, limit = PAGE_SIZE, fields) =>
+        apiFetch(pageUrl('/identities', { cursor, limit, fields })),
 
     searchIdentities: (term) =>
         apiFetch(`${API_URL}/identities/search?q=${encodeURIComponent(term)}`),
@@ -42,10 +55,17 @@ const api = {
 
     exportIdentity: (id) => apiFetch(`${API_URL}/identity/${id}/export`),
 
-    getTrustHistory: (id) => apiFetch(`${API_URL}/identity/${id}/history`),
+    // Optional { from, to, resolution } — ISO timestamps, resolution auto|raw|hour|day
+    getTrustHistory: (id, range = {}) => {
+        const params = new URLSearchParams(Object.entries(range).filter(([, v]) => v));
+        const qs = params.toString();
+        return apiFetch(`${API_URL}/identity/${id}/history${qs ? `?${qs}` : ''}`);
+    },
 
     getQrCode: (id) => apiFetch(`${API_URL}/identity/${id}/qr`),
 
+    getIdentityCluster: (id) => apiFetch(`${API_URL}/identity/${id}/cluster`),
+
     // Verifications
     addVerification: (data) =>
         apiFetch(`${API_URL}/verification`, {
@@ -53,7 +73,8 @@ const api = {
             body: JSON.stringify(data)
         }),
 
-    getVerifications: () => apiFetch(`${API_URL}/verifications`),
+    getVerificationsPage: (cursor, limit = PAGE_SIZE, fields) =>
+        apiFetch(pageUrl('/verifications', { cursor, limit, fields })),
 
     // Consistency Checks
     runConsistencyCheck: (data) =>
@@ -62,7 +83,8 @@ const api = {
             body: JSON.stringify(data)
         }),
 
-    getConsistencyChecks: () => apiFetch(`${API_URL}/consistency-checks`),
+    getConsistencyChecksPage: (cursor, limit = PAGE_SIZE, fields) =>
+        apiFetch(pageUrl('/consistency-checks', { cursor, limit, fields })),
 
     getConsistencyReport: (checkId) => apiFetch(`${API_URL}/consistency-check/${checkId}/report`),
 
@@ -77,6 +99,8 @@ const api = {
             })
         }),
 
+    getAnchorJob: (jobId) => apiFetch(`${API_URL}/blockchain/jobs/${jobId}`),
+
     // Reputation Events
     logEvent: (data) =>
         apiFetch(`${API_URL}/reputation-event`, {
@@ -84,7 +108,8 @@ const api = {
             body: JSON.stringify(data)
         }),
 
-    getReputationEvents: () => apiFetch(`${API_URL}/reputation-events`),
+    getReputationEventsPage: (cursor, limit = PAGE_SIZE, fields) =>
+        apiFetch(pageUrl('/reputation-events', { cursor, limit, fields })),
 
     // Health Check
     healthCheck: () => apiFetch(`${API_URL}/health`)
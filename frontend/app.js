@@ -238,25 +238,11 @@ async function loadIdentities() {
     tbody.innerHTML = '<tr><td colspan="5" class="loading-row"><div class="loading-spinner"></div> Loading identities...</td></tr>';
     
     try {
-        const data = await api.getIdentities();
+        const data = await api.getIdentitiesPage();
         if (data.success) {
+            identitiesCursor = data.next_cursor || null;
             displayIdentities(data.identities);
-
-            // Also populate the Consistency Check anchor selector so users must pick a real identity
-            const select = document.getElementById('consistencyAnchorId');
-            if (select) {
-                const previousValue = select.value;
-                select.innerHTML = '<option value=\"\">Select Anchor</option>' +
-                    data.identities.map(id => `
-                        <option value="${id.anchor_id}">
-                            #${id.anchor_id} - ${id.user_pub_key.substring(0, 24)}...
-                        </option>
-                    `).join('');
-                // Preserve selection if it still exists
-                if (previousValue && data.identities.some(id => String(id.anchor_id) === previousValue)) {
-                    select.value = previousValue;
-                }
-            }
+            fillAnchorSelect(data.identities);
         } else {
             tbody.innerHTML = `<tr><td colspan="5" class="no-data">Error loading identities: ${data.error || 'Unknown error'}</td></tr>`;
         }
@@ -266,6 +252,46 @@ async function loadIdentities() {
     }
 }
 
+// Populate the Consistency Check anchor selector so users must pick a real identity
+function fillAnchorSelect(identities) {
+    const select = document.getElementById('consistencyAnchorId');
+    if (!select) return;
+    const previousValue = select.value;
+    select.innerHTML = '<option value=\"\">Select Anchor</option>' +
+        identities.map(id => `
+            <option value="${id.anchor_id}">
+                #${id.anchor_id} - ${id.user_pub_key.substring(0, 24)}...
+            </option>
+        `).join('');
+    // Preserve selection if it still exists
+    if (previousValue && identities.some(id => String(id.anchor_id) === previousValue)) {
+        select.value = previousValue;
+    }
+}
+
+// "Load more": fetch the server page after `cursor` and append it to the rows already loaded.
+// Returns the combined rows, the new cursor and the table page the new rows start on.
+async function nextPage(fetchPage, cursor, key, loaded) {
+    const data = await fetchPage(cursor);
+    if (!data || !data.success) throw new Error((data && data.error) || 'Unknown error');
+    const items = loaded.concat(data[key] || []);
+    return {
+        items,
+        cursor: data.next_cursor || null,
+        page:   Math.max(1, Math.min(Math.floor(loaded.length / 10) + 1, Math.ceil(items.length / 10)))
+    };
+}
+
+async function loadMoreIdentities() {
+    try {
+        const next = await nextPage(api.getIdentitiesPage, identitiesCursor, 'identities', allIdentities);
+        identitiesCursor = next.cursor;
+        displayIdentities(next.items, next.page);
+        fillAnchorSelect(next.items);
+    } catch (error) {
+        ui.showMessage('identityMessage', 'Error loading more identities: ' + error.message, 'error');
+    }
+}
 
 async function viewIdentity(anchorId) {
     const modal = document.getElementById('identityDetailsModal');
@@ -440,7 +466,7 @@ async function viewTrustHistory(anchorId) {
         console.log('Loading trust history for identity:', anchorId);
         const data = await api.getTrustHistory(anchorId);
         if (data.success) {
-            displayTrustHistory(anchorId, data.history || [], data.current_score || 0);
+            displayTrustHistory(anchorId, data.history || [], data.current_score || 0, data.resolution);
         } else {
             alert('Error: ' + (data.error || 'Unknown error'));
         }
@@ -498,7 +524,7 @@ async function loadVerifications() {
 
     // Auto-fill anchor ID with the user's own anchor
     try {
-        const idData = await api.getIdentities();
+        const idData = await api.getIdentitiesPage(null, 1, ['anchor_id']);
         if (idData.success && idData.identities && idData.identities.length > 0) {
             const myAnchor = idData.identities[0];
             const anchorInput = document.getElementById('verifyAnchorId');
@@ -512,8 +538,9 @@ async function loadVerifications() {
     } catch (e) {}
 
     try {
-        const data = await api.getVerifications();
+        const data = await api.getVerificationsPage();
         if (data.success) {
+            verificationsCursor = data.next_cursor || null;
             displayVerifications(data.verifications);
         } else {
             tbody.innerHTML = `<tr><td colspan="7" class="no-data">Error loading verifications: ${data.error || 'Unknown error'}</td></tr>`;
@@ -524,6 +551,16 @@ async function loadVerifications() {
     }
 }
 
+async function loadMoreVerifications() {
+    try {
+        const next = await nextPage(api.getVerificationsPage, verificationsCursor, 'verifications', allVerifications);
+        verificationsCursor = next.cursor;
+        displayVerifications(next.items, next.page);
+    } catch (error) {
+        ui.showMessage('verificationMessage', 'Error loading more verifications: ' + error.message, 'error');
+    }
+}
+
 // Consistency check operations
 async function runConsistencyCheck(event) {
     event.preventDefault();
@@ -564,8 +601,9 @@ async function loadConsistencyChecks() {
     tbody.innerHTML = '<tr><td colspan="7" class="loading-row"><div class="loading-spinner"></div> Loading consistency checks...</td></tr>';
     
     try {
-        const data = await api.getConsistencyChecks();
+        const data = await api.getConsistencyChecksPage();
         if (data.success) {
+            consistencyCursor = data.next_cursor || null;
             displayConsistencyChecksWithReport(data.checks);
         } else {
             tbody.innerHTML = `<tr><td colspan="7" class="no-data">Error loading checks: ${data.error || 'Unknown error'}</td></tr>`;
@@ -576,14 +614,29 @@ async function loadConsistencyChecks() {
     }
 }
 
-function displayConsistencyChecksWithReport(checks) {
+async function loadMoreConsistencyChecks() {
+    try {
+        const next = await nextPage(api.getConsistencyChecksPage, consistencyCursor, 'checks', allConsistencyChecks);
+        consistencyCursor = next.cursor;
+        displayConsistencyChecksWithReport(next.items, next.page);
+    } catch (error) {
+        ui.showMessage('consistencyMessage', 'Error loading more checks: ' + error.message, 'error');
+    }
+}
+
+function displayConsistencyChecksWithReport(checks, page = 1) {
     const tbody = document.querySelector('#consistencyTable tbody');
     if (!checks || checks.length === 0) {
         tbody.innerHTML = `<tr><td colspan="7" class="no-data">No consistency checks found. Run your first check above!</td></tr>`;
+        document.getElementById('consistencyPagination').innerHTML = '';
         return;
     }
 
-    tbody.innerHTML = checks.map(c => `
+    allConsistencyChecks = checks;
+    consistencyPage = page;
+    const pagination = ui.paginate(checks, page, 10);
+
+    tbody.innerHTML = pagination.data.map(c => `
         <tr>
             <td>${c.check_id}</td>
             <td>${c.user_group}</td>
@@ -599,6 +652,13 @@ function displayConsistencyChecksWithReport(checks) {
             </td>
         </tr>
     `).join('');
+
+    ui.renderPagination('consistencyPagination', pagination, 'goToConsistencyReportPage',
+                        consistencyCursor && 'loadMoreConsistencyChecks');
+}
+
+function goToConsistencyReportPage(page) {
+    displayConsistencyChecksWithReport(allConsistencyChecks, page);
 }
 
 async function viewConsistencyReport(checkId) {
@@ -680,7 +740,7 @@ async function loadEvents() {
 
     // Auto-fill anchor ID
     try {
-        const idData = await api.getIdentities();
+        const idData = await api.getIdentitiesPage(null, 1, ['anchor_id']);
         if (idData.success && idData.identities && idData.identities.length > 0) {
             const myAnchor = idData.identities[0];
             const anchorInput = document.getElementById('eventAnchorId');
@@ -694,8 +754,9 @@ async function loadEvents() {
     } catch (e) {}
 
     try {
-        const data = await api.getReputationEvents();
+        const data = await api.getReputationEventsPage();
         if (data.success) {
+            eventsCursor = data.next_cursor || null;
             displayEvents(data.events);
         } else {
             tbody.innerHTML = `<tr><td colspan="5" class="no-data">Error loading events: ${data.error || 'Unknown error'}</td></tr>`;
@@ -706,6 +767,16 @@ async function loadEvents() {
     }
 }
 
+async function loadMoreEvents() {
+    try {
+        const next = await nextPage(api.getReputationEventsPage, eventsCursor, 'events', allEvents);
+        eventsCursor = next.cursor;
+        displayEvents(next.items, next.page);
+    } catch (error) {
+        ui.showMessage('eventMessage', 'Error loading more events: ' + error.message, 'error');
+    }
+}
+
 // Reputation event operations
 async function logEvent(event) {
     event.preventDefault();
@@ -781,7 +852,14 @@ async function storeOnBlockchain(verificationId, anchorId, platform, profileUrl)
     btn.disabled = true;
 
     try {
-        const data = await api.storeOnBlockchain(verificationId, anchorId, platform, profileUrl);
+        let data = await api.storeOnBlockchain(verificationId, anchorId, platform, profileUrl);
+
+        // Anchoring is queued and committed in batches — poll the job until it lands
+        if (data.success && data.job_id) {
+            btn.textContent = 'Queued';
+            ui.showMessage('verificationMessage', 'Queued for the next on-chain batch...', 'info');
+            data = await waitForAnchorJob(data.job_id);
+        }
 
         if (data.success && data.tx_hash) {
             // Replace button with on-chain link immediately
@@ -804,4 +882,22 @@ async function storeOnBlockchain(verificationId, anchorId, platform, profileUrl)
         btn.disabled = false;
         ui.showMessage('verificationMessage', 'Error: ' + err.message, 'error');
     }
-}
\ No newline at end of file
+}
+
+async function waitForAnchorJob(jobId, intervalMs = 5000, maxWaitMs = 300000) {
+    const deadline = Date.now() + maxWaitMs;
+    while (Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+        const data = await api.getAnchorJob(jobId);
+        if (!data || !data.success) return data || { success: false, error: 'Blockchain error' };
+
+        const job = data.job;
+        if (job.status === 'anchored') {
+            return job.tx_hash
+                ? { success: true, tx_hash: job.tx_hash }
+                : { success: true, note: 'Already stored on-chain' };
+        }
+        if (job.status === 'failed') return { success: false, error: job.error || 'Anchoring failed' };
+    }
+    return { success: false, error: 'Still queued — check back shortly' };
+}
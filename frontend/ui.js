@@ -127,11 +127,12 @@ const ui = {
         };
     },
 
-    renderPagination(containerId, pagination, onPageChange) {
+    // onLoadMore: name of a function fetching the next server page, while there is one
+    renderPagination(containerId, pagination, onPageChange, onLoadMore) {
         const container = document.getElementById(containerId);
         if (!container) return;
         
-        if (pagination.totalPages <= 1) {
+        if (pagination.totalPages <= 1 && !onLoadMore) {
             container.innerHTML = '';
             return;
         }
@@ -167,7 +168,10 @@ const ui = {
         // Next button
         html += `<button class="page-btn" ${!pagination.hasNext ? 'disabled' : ''} onclick="${onPageChange}(${pagination.currentPage + 1})">Next ›</button>`;
         
-        html += `<span class="page-info">Showing ${((pagination.currentPage - 1) * 10) + 1}-${Math.min(pagination.currentPage * 10, pagination.totalItems)} of ${pagination.totalItems}</span>`;
+        html += `<span class="page-info">Showing ${((pagination.currentPage - 1) * 10) + 1}-${Math.min(pagination.currentPage * 10, pagination.totalItems)} of ${pagination.totalItems}${onLoadMore ? '+' : ''}</span>`;
+        if (onLoadMore) {
+            html += `<button class="page-btn" onclick="${onLoadMore}()">Load more</button>`;
+        }
         html += '</div>';
         
         container.innerHTML = html;
@@ -183,6 +187,11 @@ let allIdentities = [];
 let allVerifications = [];
 let allConsistencyChecks = [];
 let allEvents = [];
+// next_cursor of the last server page loaded — null once a list is exhausted
+let identitiesCursor = null;
+let verificationsCursor = null;
+let consistencyCursor = null;
+let eventsCursor = null;
 
 // Display functions
 function displayIdentities(identities, page = 1) {
@@ -216,7 +225,7 @@ function displayIdentities(identities, page = 1) {
         </tr>
     `).join('');
     
-    ui.renderPagination('identitiesPagination', pagination, 'goToIdentitiesPage');
+    ui.renderPagination('identitiesPagination', pagination, 'goToIdentitiesPage', identitiesCursor && 'loadMoreIdentities');
 }
 
 function goToIdentitiesPage(page) {
@@ -263,7 +272,7 @@ function displayVerifications(verifications, page = 1) {
         </tr>
     `).join('');
     
-    ui.renderPagination('verificationsPagination', pagination, 'goToVerificationsPage');
+    ui.renderPagination('verificationsPagination', pagination, 'goToVerificationsPage', verificationsCursor && 'loadMoreVerifications');
 }
 
 function goToVerificationsPage(page) {
@@ -303,7 +312,7 @@ function displayConsistencyChecks(checks, page = 1) {
         </tr>
     `).join('');
     
-    ui.renderPagination('consistencyPagination', pagination, 'goToConsistencyPage');
+    ui.renderPagination('consistencyPagination', pagination, 'goToConsistencyPage', consistencyCursor && 'loadMoreConsistencyChecks');
 }
 
 function goToConsistencyPage(page) {
@@ -339,35 +348,43 @@ function displayEvents(events, page = 1) {
         </tr>
     `).join('');
     
-    ui.renderPagination('eventsPagination', pagination, 'goToEventsPage');
+    ui.renderPagination('eventsPagination', pagination, 'goToEventsPage', eventsCursor && 'loadMoreEvents');
 }
 
 function goToEventsPage(page) {
     displayEvents(allEvents, page);
 }
 
-function displayTrustHistory(anchorId, history, currentScore) {
+function displayTrustHistory(anchorId, history, currentScore, resolution) {
     const modal = document.getElementById('historyModal');
     const content = document.getElementById('historyContent');
     
+    // Newest first; each point is a raw change or an hourly/daily bucket
     const historyRows = history && history.length > 0 
-        ? history.map(h => `
+        ? history.slice().reverse().map(h => {
+            const delta = (parseFloat(h.score) - parseFloat(h.previous)).toFixed(2);
+            const detail = h.changes > 1 ? `${h.changes} changes (${h.min}–${h.max})` : (h.reason || 'N/A');
+            return `
             <tr>
-                <td>${h.event_type}</td>
-                <td>${h.platform || 'N/A'}</td>
-                <td title="${ui.formatDate(h.time_stamp)}">${ui.relativeTime(h.time_stamp)}</td>
+                <td>${ui.trustBadge(h.score)}</td>
+                <td>${delta > 0 ? '+' : ''}${delta}</td>
+                <td>${detail}</td>
+                <td title="${ui.formatDate(h.time)}">${ui.relativeTime(h.time)}</td>
             </tr>
-        `).join('')
-        : '<tr><td colspan="3" class="no-data">No history available</td></tr>';
+        `;
+        }).join('')
+        : '<tr><td colspan="4" class="no-data">No history available</td></tr>';
     
     content.innerHTML = `
         <h3>Trust Score History - Identity #${anchorId}</h3>
-        <p><strong>Current Score:</strong> ${ui.trustBadge(currentScore)}</p>
+        <p><strong>Current Score:</strong> ${ui.trustBadge(currentScore)}
+           ${resolution && resolution !== 'raw' ? `<span style="color:#999; font-size:12px;">(per ${resolution})</span>` : ''}</p>
         <table>
             <thead>
                 <tr>
-                    <th>Event Type</th>
-                    <th>Platform</th>
+                    <th>Score</th>
+                    <th>Change</th>
+                    <th>Reason</th>
                     <th>Time</th>
                 </tr>
             </thead>
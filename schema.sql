@@ -82,4 +82,168 @@ CREATE TABLE IF NOT EXISTS reputation_events (
     time_stamp  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX IF NOT EXISTS idx_events_anchor_id ON reputation_events(anchor_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_events_anchor_id ON reputation_events(anchor_id);
+
+-- ── Statistics Counters ───────────────────────────────────────────────────────
+-- Running totals kept in step by the write paths (see backend/stats_counters.py).
+-- Rebuild with: python backend/stats_counters.py rebuild
+CREATE TABLE IF NOT EXISTS stats_counters (
+    name   VARCHAR(50) NOT NULL,
+    shard  SMALLINT    NOT NULL DEFAULT 0,   -- writers spread over shards; readers SUM per name
+    value  NUMERIC     NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, shard)
+);
+
+-- Tables created before sharding were keyed on name alone
+ALTER TABLE stats_counters ADD COLUMN IF NOT EXISTS shard SMALLINT NOT NULL DEFAULT 0;
+ALTER TABLE stats_counters DROP CONSTRAINT IF EXISTS stats_counters_pkey;
+ALTER TABLE stats_counters ADD PRIMARY KEY (name, shard);
+
+INSERT INTO stats_counters (name, value)
+          SELECT 'identities',            COUNT(*)                          FROM identity_anchors
+UNION ALL SELECT 'trust_score_sum',       COALESCE(SUM(trust_score), 0)       FROM identity_anchors
+UNION ALL SELECT 'verifications',         COUNT(*)                          FROM platform_verifications
+UNION ALL SELECT 'consistency_checks',    COUNT(consistency_score)          FROM consistency_checks
+UNION ALL SELECT 'consistency_score_sum', COALESCE(SUM(consistency_score), 0) FROM consistency_checks
+ON CONFLICT (name, shard) DO NOTHING;
+
+
+-- ── Keyset Pagination Indexes ─────────────────────────────────────────────────
+-- List endpoints page newest-first on (timestamp, id); see backend/pagination.py
+ALTER TABLE platform_verifications ADD COLUMN IF NOT EXISTS tx_hash VARCHAR(100);
+
+CREATE INDEX IF NOT EXISTS idx_anchors_created_page       ON identity_anchors(created_at DESC, anchor_id DESC);
+CREATE INDEX IF NOT EXISTS idx_anchors_user_created_page  ON identity_anchors(user_id, created_at DESC, anchor_id DESC);
+CREATE INDEX IF NOT EXISTS idx_verifications_page         ON platform_verifications(verified_at DESC, verification_id DESC);
+CREATE INDEX IF NOT EXISTS idx_checks_page                ON consistency_checks(checked_at DESC, check_id DESC);
+CREATE INDEX IF NOT EXISTS idx_events_page                ON reputation_events(time_stamp DESC, event_id DESC);
+CREATE INDEX IF NOT EXISTS idx_oauth_user_connected_page  ON oauth_verifications(user_id, connected_at DESC, id DESC);
+
+
+-- ── Identity Search Indexes ───────────────────────────────────────────────────
+-- Prefix matches on the hex public key use the btree pattern index, substring
+-- matches use the trigram index (see backend/search.py)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_anchors_pub_key_prefix ON identity_anchors (user_pub_key varchar_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_anchors_pub_key_trgm   ON identity_anchors USING gin (user_pub_key gin_trgm_ops);
+
+
+-- ── Stored Profile Text ───────────────────────────────────────────────────────
+-- Display name and bio captured at OAuth time; the bio corpus the TF-IDF model
+-- is fitted on (see backend/bio_vectorizer.py)
+ALTER TABLE oauth_verifications ADD COLUMN IF NOT EXISTS display_name VARCHAR(255);
+ALTER TABLE oauth_verifications ADD COLUMN IF NOT EXISTS bio          TEXT;
+
+
+-- ── Profile Cache ─────────────────────────────────────────────────────────────
+-- Shared cache of fetched platform profiles with their validators, used when
+-- PROFILE_CACHE_DB=True (see backend/profile_cache.py)
+CREATE TABLE IF NOT EXISTS profile_cache (
+    cache_key      VARCHAR(255) PRIMARY KEY,
+    profile        JSONB,
+    etag           VARCHAR(255),
+    last_modified  VARCHAR(100),
+    fetched_at     TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+
+-- ── Blockchain Anchoring ──────────────────────────────────────────────────────
+-- Verifications are queued as anchor jobs and committed in batches: one Merkle
+-- root per batch on-chain, one inclusion proof per job (see backend/anchoring.py)
+CREATE TABLE IF NOT EXISTS anchor_batches (
+    batch_id      SERIAL PRIMARY KEY,
+    merkle_root   VARCHAR(66) NOT NULL,
+    leaf_count    INTEGER     NOT NULL,
+    status        VARCHAR(20) NOT NULL DEFAULT 'committing',   -- committing | committed | failed
+    tx_hash       VARCHAR(100),
+    block_number  BIGINT,
+    error         TEXT,
+    created_at    TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    committed_at  TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS anchor_jobs (
+    job_id           SERIAL PRIMARY KEY,
+    verification_id  INTEGER     NOT NULL UNIQUE REFERENCES platform_verifications(verification_id),
+    leaf_hash        VARCHAR(66) NOT NULL,
+    status           VARCHAR(20) NOT NULL DEFAULT 'pending',   -- pending | batched | anchored | failed
+    batch_id         INTEGER REFERENCES anchor_batches(batch_id),
+    leaf_index       INTEGER,
+    merkle_proof     JSONB,
+    attempts         INTEGER NOT NULL DEFAULT 0,
+    error            TEXT,
+    created_at       TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at       TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_anchor_jobs_pending ON anchor_jobs(job_id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_anchor_jobs_batch   ON anchor_jobs(batch_id);
+-- Polled every worker tick for batches a crashed send left behind
+CREATE INDEX IF NOT EXISTS idx_anchor_batches_committing ON anchor_batches(created_at) WHERE status = 'committing';
+
+-- Revoked JWTs (logout). Rows are keyed by sha256 of the token and pruned once
+-- the token would have expired anyway; workers poll this into a local denylist
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    token_digest  CHAR(64)    PRIMARY KEY,
+    expires_at    TIMESTAMPTZ NOT NULL,
+    revoked_at    TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires ON revoked_tokens(expires_at);
+
+-- Trust score time series: one row per score change, written in the same
+-- statement as the update (see Identity.update_trust_score). Times are UTC.
+CREATE TABLE IF NOT EXISTS trust_score_history (
+    history_id  BIGSERIAL PRIMARY KEY,
+    anchor_id   INTEGER      NOT NULL REFERENCES identity_anchors(anchor_id),
+    old_score   NUMERIC(5,2) NOT NULL,
+    new_score   NUMERIC(5,2) NOT NULL,
+    reason      VARCHAR(100),
+    changed_at  TIMESTAMP    NOT NULL DEFAULT (now() AT TIME ZONE 'UTC')
+);
+
+CREATE INDEX IF NOT EXISTS idx_trust_history_anchor_time ON trust_score_history(anchor_id, changed_at);
+CREATE INDEX IF NOT EXISTS idx_trust_history_time        ON trust_score_history(changed_at);
+
+-- Hourly / daily OHLC buckets of trust_score_history (see backend/trust_history.py)
+CREATE TABLE IF NOT EXISTS trust_score_rollups (
+    anchor_id    INTEGER      NOT NULL REFERENCES identity_anchors(anchor_id),
+    resolution   VARCHAR(10)  NOT NULL,   -- hour | day
+    bucket       TIMESTAMP    NOT NULL,   -- UTC bucket start
+    open_score   NUMERIC(5,2) NOT NULL,
+    close_score  NUMERIC(5,2) NOT NULL,
+    min_score    NUMERIC(5,2) NOT NULL,
+    max_score    NUMERIC(5,2) NOT NULL,
+    changes      INTEGER      NOT NULL,
+    PRIMARY KEY (anchor_id, resolution, bucket)
+);
+
+-- Everything before rolled_through has been rolled up for that resolution
+CREATE TABLE IF NOT EXISTS trust_score_rollup_state (
+    resolution      VARCHAR(10) PRIMARY KEY,
+    rolled_through  TIMESTAMP   NOT NULL
+);
+
+INSERT INTO trust_score_rollup_state (resolution, rolled_through)
+VALUES ('hour', '1970-01-01'), ('day', '1970-01-01')
+ON CONFLICT (resolution) DO NOTHING;
+
+-- Identities that look like the same person (see backend/clustering.py).
+-- Rebuilt wholesale by `python clustering.py run`; cluster_id is the smallest member anchor_id
+CREATE TABLE IF NOT EXISTS identity_clusters (
+    anchor_id     INTEGER PRIMARY KEY REFERENCES identity_anchors(anchor_id),
+    cluster_id    INTEGER NOT NULL,
+    cluster_size  INTEGER NOT NULL,
+    clustered_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_identity_clusters_cluster ON identity_clusters(cluster_id);
+
+CREATE TABLE IF NOT EXISTS identity_cluster_links (
+    anchor_a  INTEGER      NOT NULL REFERENCES identity_anchors(anchor_id),
+    anchor_b  INTEGER      NOT NULL REFERENCES identity_anchors(anchor_id),
+    score     NUMERIC(5,2) NOT NULL,
+    evidence  JSONB,
+    PRIMARY KEY (anchor_a, anchor_b)
+);
@@ -0,0 +1,100 @@
+import base64
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+# utils.py refuses to import without a Fernet key
+if not os.getenv('FERNET_KEY'):
+    os.environ['FERNET_KEY'] = base64.urlsafe_b64encode(os.urandom(32)).decode()
+
+
+class FakeCursor:
+    """Enough of a psycopg2 cursor for database._run and psycopg2's execute_values"""
+
+    def __init__(self, db):
+        self.db         = db
+        self.connection = db
+        self.rows       = []
+        self.rowcount   = 0
+
+    def execute(self, query, params=None):
+        if isinstance(query, bytes):
+            query = query.decode()
+        query = ' '.join(query.split())
+        self.db.statements.append((query, params))
+        self.rows = [dict(row) for row in self.db.respond(query, params)]
+        self.rowcount = len(self.rows)
+
+    def mogrify(self, template, args):
+        self.db.values.append(tuple(args))
+        return repr(tuple(args)).encode()
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    """
+    Stands in for the connection pool: statements are recorded, and each one
+    is answered by the first registered handler whose prefix it starts with
+    (rows, or a callable taking the params). Anything else returns no rows.
+    """
+
+    encoding = 'UTF8'
+    closed   = 0
+
+    def __init__(self):
+        self.handlers   = []
+        self.statements = []
+        self.values     = []   # rows passed to execute_values
+        self.commits    = 0
+
+    def on(self, prefix, rows):
+        self.handlers.append((' '.join(prefix.split()), rows))
+
+    def respond(self, query, params):
+        for prefix, rows in self.handlers:
+            if query.startswith(prefix):
+                return rows(params) if callable(rows) else rows
+        return []
+
+    def executed(self, prefix):
+        return [params for query, params in self.statements if query.startswith(prefix)]
+
+    # pool
+    def getconn(self):
+        return self
+
+    def putconn(self, conn, discard=False):
+        pass
+
+    # connection
+    def cursor(self, cursor_factory=None, name=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def set_session(self, **kwargs):
+        pass
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    database = pytest.importorskip('database')
+    db = FakeDatabase()
+    monkeypatch.setattr(database, 'get_pool', lambda: db)
+    return db
@@ -0,0 +1,114 @@
+"""
+Anchoring pipeline: pending jobs -> Merkle batch -> root on-chain -> proofs.
+
+The database is the fake_db fixture and the chain is FakeContract, which
+implements the two contract calls anchoring uses, so no node is needed.
+"""
+
+import pytest
+
+pytest.importorskip('psycopg2')
+pytest.importorskip('web3')
+
+import anchoring   # noqa: E402
+import blockchain  # noqa: E402
+from merkle import build_levels, merkle_proof, merkle_root, verify_proof  # noqa: E402
+
+EMPTY = b'\x00' * 32
+
+
+class FakeContract:
+    """getVerification / storeVerification of the verification contract, in memory"""
+
+    def __init__(self):
+        self.slots     = {}
+        self.functions = self
+
+    def getVerification(self, slot):
+        return Call(lambda: (self.slots.get(slot, EMPTY), 0))
+
+    def storeVerification(self, slot, value):
+        return Call(lambda: self.slots.__setitem__(slot, value))
+
+
+class Call:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def call(self):
+        return self.fn()
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    """A FakeContract; sent transactions are applied to it and mined at once"""
+    contract = FakeContract()
+    sent     = []
+
+    def send(w3, fn_call, **kwargs):
+        fn_call.call()
+        sent.append(fn_call)
+        return {'tx_hash': f'0x{len(sent):064x}', 'status': 1, 'block': 100 + len(sent)}
+
+    monkeypatch.setattr(blockchain, 'send_contract_transaction', send)
+    contract.sent = sent
+    return contract
+
+
+def leaf(verification_id):
+    return blockchain.build_verification_hash(verification_id, 7, 'GitHub', f'https://github.com/u{verification_id}')
+
+
+@pytest.mark.parametrize('count', [1, 2, 3, 5, 8, 9])
+def test_every_proof_verifies(count):
+    leaves = [leaf(i) for i in range(count)]
+    levels = build_levels(leaves)
+    root   = merkle_root(leaves)
+    for index, value in enumerate(leaves):
+        assert verify_proof(value, merkle_proof(levels, index), root)
+        assert not verify_proof(leaf(99), merkle_proof(levels, index), root)
+
+
+def test_batch_root_goes_on_chain_and_proofs_check_out(fake_db, chain):
+    jobs = [{'job_id': 10 + i, 'leaf_hash': anchoring._hex(leaf(i))} for i in range(5)]
+    fake_db.on("SELECT job_id, leaf_hash FROM anchor_jobs", jobs)
+    fake_db.on("INSERT INTO anchor_batches",
+               lambda params: [{'batch_id': 1, 'merkle_root': params[0], 'leaf_count': params[1]}])
+
+    result = anchoring.process_once(w3=object(), contract=chain)
+
+    assert result['success'] and result['batch_id'] == 1 and result['leaf_count'] == 5
+    assert len(chain.sent) == 1
+
+    # The root on-chain is the Merkle root of the claimed jobs' leaves
+    stored = chain.slots[blockchain.ROOT_ID_OFFSET + 1]
+    assert stored == merkle_root([leaf(i) for i in range(5)])
+
+    # Every job got its leaf index and a proof against that root
+    proofs = {job_id: (index, proof.adapted) for job_id, batch_id, index, proof in fake_db.values}
+    assert sorted(proofs) == [job['job_id'] for job in jobs]
+    for job in jobs:
+        index, proof = proofs[job['job_id']]
+        assert verify_proof(leaf(index), [anchoring._unhex(h) for h in proof], stored)
+
+    # The batch, its jobs and the verifications were marked with the tx hash
+    assert fake_db.executed("UPDATE anchor_batches SET status = 'committed'") == [(result['tx_hash'], result['block'], 1)]
+    assert fake_db.executed("UPDATE platform_verifications v SET tx_hash") == [(result['tx_hash'], 1)]
+
+
+def test_root_already_on_chain_is_not_resent(fake_db, chain):
+    root = merkle_root([leaf(0)])
+    chain.slots[blockchain.ROOT_ID_OFFSET + 1] = root
+    fake_db.on("SELECT job_id, leaf_hash FROM anchor_jobs", [{'job_id': 10, 'leaf_hash': anchoring._hex(leaf(0))}])
+    fake_db.on("INSERT INTO anchor_batches",
+               lambda params: [{'batch_id': 1, 'merkle_root': params[0], 'leaf_count': params[1]}])
+
+    result = anchoring.process_once(w3=object(), contract=chain)
+
+    assert result['success'] and result['tx_hash'] is None
+    assert chain.sent == []
+
+
+def test_idle_queue(fake_db, chain):
+    assert anchoring.process_once(w3=object(), contract=chain) is None
+    assert chain.sent == []
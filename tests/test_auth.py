@@ -0,0 +1,47 @@
+"""Logging out revokes the token, whether or not cross-worker sync is enabled."""
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('jwt')
+pytest.importorskip('psycopg2')
+
+from flask import Flask, jsonify  # noqa: E402
+
+import auth  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch, fake_db):
+    monkeypatch.setattr(auth, 'SECRET_KEY', 'test-secret-' + 'x' * 32)
+    monkeypatch.setattr(auth, '_revoked', frozenset())
+
+    app = Flask(__name__)
+
+    @app.route('/me')
+    @auth.token_required
+    def me():
+        from flask import request
+        return jsonify({'user_id': request.user['user_id']})
+
+    @app.route('/logout', methods=['POST'])
+    @auth.token_required
+    def logout():
+        error = auth.revoke_token(auth.bearer_token())
+        return jsonify({'error': error})
+
+    return app.test_client()
+
+
+@pytest.mark.parametrize('sync_enabled', [False, True])
+def test_logged_out_token_is_refused(client, fake_db, monkeypatch, sync_enabled):
+    monkeypatch.setattr(auth, 'JWT_REVOCATION_ENABLED', sync_enabled)
+    headers = {'Authorization': f'Bearer {auth.generate_token(3, "octocat")}'}
+
+    assert client.get('/me', headers=headers).get_json() == {'user_id': 3}
+    assert client.post('/logout', headers=headers).get_json() == {'error': None}
+    assert len(fake_db.executed('INSERT INTO revoked_tokens')) == 1
+
+    response = client.get('/me', headers=headers)
+    assert response.status_code == 401
+    assert response.get_json()['error'] == 'Token revoked'
@@ -0,0 +1,51 @@
+"""A signed verification can be checked again from what the API returns."""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip('cryptography')
+pytest.importorskip('flask')
+pytest.importorskip('psycopg2')
+
+from flask import Flask  # noqa: E402
+
+import response_layer  # noqa: E402
+import utils  # noqa: E402
+from models import Verification  # noqa: E402
+
+
+def api_json(payload):
+    """What a client receives: the dict through the app's JSON provider and back"""
+    app = Flask(__name__)
+    response_layer.init_app(app)
+    with app.app_context():
+        return json.loads(app.json.dumps(payload))
+
+
+@pytest.mark.parametrize('verified_at', [
+    datetime(2026, 10, 17, 11, 32, 27, 123456),
+    datetime(2026, 10, 17, 11, 32, 27),            # zero microseconds
+])
+def test_signed_row_verifies_from_api_output(verified_at):
+    public_hex, _, private_enc = utils.generate_keypair()
+    row = {'verification_id': 1, 'anchor_id': 7, 'platform_name': 'GitHub',
+           'profile_url': 'https://github.com/octocat', 'verified_at': verified_at}
+
+    signature = utils.sign_verification_claim(private_enc, Verification.claim_for(row))
+
+    # Verification.create returns verified_at in its signed form
+    returned = api_json({**row, 'verified_at': utils.claim_timestamp(row['verified_at']), 'signature': signature})
+    claim    = utils.build_verification_claim(
+        returned['anchor_id'], returned['platform_name'], returned['profile_url'], returned['verified_at']
+    )
+    assert utils.verify_signature(public_hex, claim, returned['signature'])
+
+
+def test_claim_timestamp_matches_sql_format():
+    # to_char(ts, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"') as used by the list, details and export queries
+    assert utils.claim_timestamp(datetime(2026, 1, 2, 3, 4, 5)) == '2026-01-02T03:04:05.000000Z'
+    assert utils.claim_timestamp(datetime(2026, 1, 2, 3, 4, 5, 60, tzinfo=timezone.utc)) == '2026-01-02T03:04:05.000060Z'
+    assert utils.claim_timestamp('2026-01-02T03:04:05.000000Z') == '2026-01-02T03:04:05.000000Z'
+    assert 'to_char(v.verified_at' in Verification.LIST_FIELDS['verified_at']
@@ -0,0 +1,41 @@
+"""exporter.prefetch: failures surface before the streamed response starts."""
+
+import pytest
+
+pytest.importorskip('psycopg2')
+
+import exporter  # noqa: E402
+
+
+def test_prefetch_raises_before_streaming():
+    def failing():
+        raise RuntimeError('no connection')
+        yield b''
+
+    with pytest.raises(RuntimeError):
+        exporter.prefetch(failing())
+
+
+def test_prefetch_yields_every_chunk():
+    assert list(exporter.prefetch(iter_chunks([b'a', b'b', b'c']))) == [b'a', b'b', b'c']
+    assert list(exporter.prefetch(iter_chunks([]))) == []
+
+
+def test_closing_early_closes_the_source():
+    closed = []
+
+    def source():
+        try:
+            yield b'a'
+            yield b'b'
+        finally:
+            closed.append(True)
+
+    chunks = exporter.prefetch(source())
+    assert next(chunks) == b'a'
+    chunks.close()
+    assert closed == [True]
+
+
+def iter_chunks(chunks):
+    yield from chunks
@@ -0,0 +1,51 @@
+"""The shared in-process LRU: recency, bounds, TTL and per-entry expiry."""
+
+import time
+
+from memory_cache import LRUCache
+
+
+def test_get_and_put_refresh_recency():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)            # evicts b, the least recently used
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    cache.put('a', 10)           # re-putting moves a to the front as well
+    cache.put('d', 4)
+    assert cache.get('c') is None
+    assert cache.get('a') == 10
+    assert len(cache) == 2
+
+
+def test_hits_and_misses():
+    cache = LRUCache(4)
+    cache.put('a', 1)
+    cache.get('a')
+    cache.get('missing')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ttl_expires_entries():
+    cache = LRUCache(4, ttl=0.05)
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+    time.sleep(0.06)
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_per_entry_expiry_and_prune():
+    cache = LRUCache(4)
+    cache.put('expired', 1, expires_at=time.time() - 1)
+    cache.put('valid', 2, expires_at=time.time() + 60)
+    cache.put('forever', 3)
+    assert cache.get('expired') is None
+    cache.put('expired', 1, expires_at=time.time() - 1)
+    cache.prune()
+    assert len(cache) == 2
+    assert cache.get('valid') == 2
+    assert cache.get('forever') == 3
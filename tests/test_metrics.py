@@ -0,0 +1,35 @@
+"""/api/metrics exists only when METRICS_ENABLED is on."""
+
+import pytest
+
+pytest.importorskip('flask')
+
+from flask import Flask  # noqa: E402
+
+import metrics  # noqa: E402
+import tracing  # noqa: E402
+
+
+@pytest.fixture
+def make_app(monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, 'METRICS_DIR', str(tmp_path / 'metrics'))
+    monkeypatch.setattr(tracing, '_listeners', [])
+
+    def make(enabled):
+        monkeypatch.setattr(metrics, 'METRICS_ENABLED', enabled)
+        app = Flask(__name__)
+        metrics.init_app(app)
+        return app
+    return make
+
+
+def test_disabled_metrics_are_not_served(make_app, tmp_path):
+    app = make_app(False)
+    assert app.test_client().get('/api/metrics').status_code == 404
+    assert not (tmp_path / 'metrics').exists()
+    assert tracing._listeners == []
+
+
+def test_enabled_metrics_route(make_app):
+    app = make_app(True)
+    assert [rule.rule for rule in app.url_map.iter_rules() if rule.endpoint == 'metrics'] == ['/api/metrics']
@@ -0,0 +1,58 @@
+"""Connecting an OAuth account to a user who already has an identity anchor."""
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('cryptography')
+pytest.importorskip('flask')
+pytest.importorskip('psycopg2')
+pytest.importorskip('requests')
+
+import oauth    # noqa: E402
+import signing  # noqa: E402
+import utils    # noqa: E402
+
+ANCHOR_ID   = 7
+PROFILE_URL = 'https://github.com/octocat'
+VERIFIED_AT = datetime(2026, 10, 17, 11, 32, 27, 123456)
+
+
+@pytest.fixture
+def anchored_user(fake_db):
+    public_hex, _, private_enc = utils.generate_keypair()
+    signing.forget()
+
+    fake_db.on("SELECT id FROM oauth_verifications", [])
+    fake_db.on("SELECT anchor_id FROM identity_anchors WHERE user_id", [{'anchor_id': ANCHOR_ID}])
+    fake_db.on("INSERT INTO oauth_verifications", [{
+        'id': 1, 'platform': 'GitHub', 'platform_username': 'octocat',
+        'profile_url': PROFILE_URL, 'connected_at': VERIFIED_AT,
+    }])
+    fake_db.on("INSERT INTO platform_verifications", [{
+        'verification_id': 11, 'anchor_id': ANCHOR_ID, 'platform_name': 'GitHub',
+        'profile_url': PROFILE_URL, 'verified_at': VERIFIED_AT,
+    }])
+    fake_db.on("SELECT private_key_encrypted FROM identity_anchors", [{'private_key_encrypted': private_enc}])
+    fake_db.on("UPDATE platform_verifications v SET signature",
+               [{'verification_id': 11, 'signature': 'x', 'signed_at': VERIFIED_AT}])
+    yield public_hex
+    signing.forget()
+
+
+def test_connect_signs_the_new_verification(fake_db, anchored_user):
+    result, error = oauth.save_oauth_verification(
+        user_id=3, platform='GitHub', platform_user_id=583231, username='octocat',
+        profile_url=PROFILE_URL, access_token='gho_token'
+    )
+
+    assert error is None
+    assert result['id'] == 1
+    assert fake_db.commits == 1
+
+    # One signature stored, for the inserted row, over the claim the API returns
+    assert len(fake_db.values) == 1
+    verification_id, signature = fake_db.values[0]
+    assert verification_id == 11
+    claim = utils.build_verification_claim(ANCHOR_ID, 'GitHub', PROFILE_URL, utils.claim_timestamp(VERIFIED_AT))
+    assert utils.verify_signature(anchored_user, claim, signature)
@@ -0,0 +1,38 @@
+"""Keyset pages never hand out a cursor they can't read back."""
+
+from datetime import datetime
+
+from pagination import build_page_query, decode_cursor, encode_cursor, finish_page
+
+
+FIELDS = {'event_id': 'event_id', 'time_stamp': 'time_stamp'}
+
+
+def page(after=None, limit=2):
+    return {'limit': limit, 'after': after, 'fields': list(FIELDS)}
+
+
+def test_cursor_round_trip():
+    ts = datetime(2026, 10, 17, 11, 32, 27, 123456)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+
+def test_rows_without_timestamp_are_excluded():
+    query, params = build_page_query('reputation_events', FIELDS, 'time_stamp', 'event_id', page(),
+                                     ['anchor_id = %s'], [7])
+    assert 'WHERE anchor_id = %s AND time_stamp IS NOT NULL ORDER BY' in query
+    assert params == [7, 3]
+
+    after = (datetime(2026, 1, 1), 9)
+    query, params = build_page_query('reputation_events', FIELDS, 'time_stamp', 'event_id', page(after))
+    assert 'WHERE time_stamp IS NOT NULL AND (time_stamp, event_id) < (%s, %s)' in query
+    assert params == [after[0], 9, 3]
+
+
+def test_next_cursor_points_past_last_row():
+    rows = [{'event_id': i, 'time_stamp': datetime(2026, 1, i), '_cursor_ts': datetime(2026, 1, i), '_cursor_id': i}
+            for i in (3, 2, 1)]
+    rows, cursor = finish_page(rows, page())
+    assert [row['event_id'] for row in rows] == [3, 2]
+    assert '_cursor_ts' not in rows[0]
+    assert decode_cursor(cursor) == (datetime(2026, 1, 2), 2)
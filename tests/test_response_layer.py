@@ -0,0 +1,85 @@
+"""Static frontend assets get the response layer's Cache-Control."""
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('cryptography')
+
+import re  # noqa: E402
+from datetime import date, datetime, timedelta, timezone  # noqa: E402
+
+from flask import Flask, jsonify, send_from_directory  # noqa: E402
+
+import response_layer  # noqa: E402
+from config import STATIC_MAX_AGE  # noqa: E402
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / 'app.js').write_text('console.log("hi");\n')
+    (tmp_path / 'style.css').write_text('body { margin: 0; }\n')
+    (tmp_path / 'index.html').write_text(
+        '<!doctype html><link rel="stylesheet" href="style.css">'
+        '<script src="app.js"></script><script src="https://cdn.example/x.js"></script>\n'
+    )
+
+    app = Flask(__name__)
+
+    @app.route('/')
+    def serve_index():
+        return response_layer.send_html(tmp_path, 'index.html')
+
+    @app.route('/<path:path>')
+    def serve_static(path):
+        return send_from_directory(tmp_path, path)
+
+    response_layer.init_app(app)
+    return app.test_client()
+
+
+@pytest.mark.parametrize('path', ['app.js', 'style.css'])
+def test_versioned_assets_are_cacheable(client, path):
+    response = client.get(f'/{path}?v=abc')
+    assert response.status_code == 200
+    assert f'max-age={STATIC_MAX_AGE}' in response.headers['Cache-Control']
+    assert 'no-cache' not in response.headers['Cache-Control']
+
+
+@pytest.mark.parametrize('path', ['app.js', 'index.html'])
+def test_unversioned_files_revalidate(client, path):
+    response = client.get(f'/{path}')
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert client.get(f'/{path}', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_page_asset_urls_follow_content(client, tmp_path):
+    def asset_urls():
+        response = client.get('/')
+        assert response.headers['Cache-Control'] == 'no-cache'
+        return re.findall(r'(?:src|href)="([^"]+)"', response.get_data(as_text=True))
+
+    css, js, external = asset_urls()
+    assert css.startswith('style.css?v=') and js.startswith('app.js?v=')
+    assert external == 'https://cdn.example/x.js'
+
+    (tmp_path / 'app.js').write_text('console.log("changed");\n')
+    new_css, new_js, _ = asset_urls()
+    assert new_css == css
+    assert new_js.startswith('app.js?v=') and new_js != js
+
+
+def test_jsonify_writes_iso_timestamps(client):
+    app = client.application
+
+    @app.route('/api/stamp')
+    def stamp():
+        return jsonify(naive=datetime(2026, 1, 2, 3, 4, 5),
+                       aware=datetime(2026, 1, 2, 4, 4, 5, 60, tzinfo=timezone(timedelta(hours=1))),
+                       day=date(2026, 1, 2))
+
+    # Same form as to_char(ts, CLAIM_TIMESTAMP_SQL) in the SQL-built payloads
+    assert client.get('/api/stamp').get_json() == {
+        'naive': '2026-01-02T03:04:05.000000Z',
+        'aware': '2026-01-02T03:04:05.000060Z',
+        'day':   '2026-01-02',
+    }
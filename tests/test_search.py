@@ -0,0 +1,23 @@
+"""Search routes numeric terms to the primary key and nothing else."""
+
+import pytest
+
+pytest.importorskip('psycopg2')
+
+from search import search_identities  # noqa: E402
+
+
+@pytest.mark.parametrize('term', ['²', '١٢', '12²'])
+def test_non_ascii_digits_are_not_anchor_ids(fake_db, term):
+    rows, error = search_identities(term)
+    assert (rows, error) == ([], None)
+    assert fake_db.statements == []
+
+
+def test_numeric_term_looks_up_anchor_id(fake_db):
+    fake_db.on('SELECT anchor_id, user_pub_key, trust_score, created_at FROM identity_anchors WHERE anchor_id',
+               [{'anchor_id': 12, 'user_pub_key': 'ab', 'trust_score': 0, 'created_at': None}])
+    rows, error = search_identities('12')
+    assert error is None
+    assert [(row['anchor_id'], row['match']) for row in rows][0] == (12, 'anchor_id')
+    assert fake_db.executed('SELECT anchor_id, user_pub_key, trust_score, created_at FROM identity_anchors WHERE anchor_id') == [(12,)]
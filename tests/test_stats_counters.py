@@ -0,0 +1,48 @@
+"""stats_counters.bump spreads writers over shards of each counter."""
+
+import threading
+
+import pytest
+
+pytest.importorskip('psycopg2')
+
+import stats_counters  # noqa: E402
+from config import STATS_COUNTER_SHARDS  # noqa: E402
+
+
+def bumped(fake_db):
+    """(name, shard, delta) rows of every bump so far"""
+    rows = []
+    for params in fake_db.executed('INSERT INTO stats_counters'):
+        rows += [tuple(params[i:i + 3]) for i in range(0, len(params), 3)]
+    return rows
+
+
+def test_bump_writes_one_shard_per_thread(fake_db):
+    stats_counters.bump(verifications=1, identities=2)
+    stats_counters.bump(identities=1)
+
+    rows = bumped(fake_db)
+    assert [(name, delta) for name, _, delta in rows] == [('identities', 2), ('verifications', 1), ('identities', 1)]
+    shards = {shard for _, shard, _ in rows}
+    assert len(shards) == 1 and 0 <= shards.pop() < STATS_COUNTER_SHARDS
+
+
+def test_threads_spread_over_shards(fake_db):
+    barrier = threading.Barrier(32)   # all alive at once, so no thread id is reused
+
+    def bump():
+        barrier.wait()
+        stats_counters.bump(verifications=1)
+
+    threads = [threading.Thread(target=bump) for _ in range(32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({shard for _, shard, _ in bumped(fake_db)}) > 1
+
+
+def test_unknown_counter_is_rejected(fake_db):
+    assert stats_counters.bump(nope=1) == (None, 'Unknown counter(s): nope')
+    assert fake_db.statements == []
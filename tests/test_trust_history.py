@@ -0,0 +1,33 @@
+"""parse_time: the ?from= / ?to= parser of the trust history endpoint."""
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('psycopg2')
+
+from trust_history import parse_time  # noqa: E402
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2026',                      datetime(2026, 1, 1)),
+    ('2026-03',                   datetime(2026, 3, 1)),
+    ('2026-03-05',                datetime(2026, 3, 5)),
+    ('2026-03-05T10:00:00Z',      datetime(2026, 3, 5, 10)),
+    ('2026-03-05T12:00:00+02:00', datetime(2026, 3, 5, 10)),
+    ('1772704800',                datetime(2026, 3, 5, 10)),
+    ('1772704800.5',              datetime(2026, 3, 5, 10, 0, 0, 500000)),
+])
+def test_parses(value, expected):
+    assert parse_time(value) == expected
+
+
+@pytest.mark.parametrize('value', [None, ''])
+def test_empty_passes_through(value):
+    assert parse_time(value) is None
+
+
+@pytest.mark.parametrize('value', ['1e20', 'inf', '-inf', 'nan', '2026-13', 'yesterday', '0001-01-01T00:00:00+01:00'])
+def test_rejects_with_value_error(value):
+    with pytest.raises(ValueError):
+        parse_time(value)